@@ -1,10 +1,15 @@
 use warp::Filter;
 use std::sync::Arc;
-use crate::state::AppState;
+use std::sync::atomic::Ordering;
+use crate::state::{AppState, SensorData};
 use crate::db::DbClient;
 use crate::file_io;
 use serde::{Deserialize, Serialize};
 use futures::{StreamExt, SinkExt};
+use tokio::sync::broadcast;
+
+// Max samples packed into one WebSocket frame in batch/binary mode
+const WS_MAX_BATCH: usize = 256;
 
 #[derive(Deserialize)]
 struct ConnectSerialReq {
@@ -28,6 +33,36 @@ struct SimParamsReq {
     operation: crate::sim::Operation,
 }
 
+#[derive(Deserialize)]
+struct PageQuery {
+    offset: Option<usize>,
+    limit: Option<usize>,
+    since: Option<u64>, // only samples with ts > since (device clock, ms)
+}
+
+#[derive(Deserialize)]
+struct WsQuery {
+    format: Option<String>,
+    device: Option<String>, // only stream samples from this unit
+}
+
+#[derive(Clone, Copy, PartialEq)]
+enum WsFormat {
+    Json,   // one JSON object per frame (default)
+    Batch,  // JSON array of all samples queued since the last frame
+    Binary, // f64 base clock, then the batch as little-endian f32 in struct order, clock as offset from base
+}
+
+impl WsFormat {
+    fn from_query(q: &WsQuery) -> Self {
+        match q.format.as_deref() {
+            Some("batch") => WsFormat::Batch,
+            Some("binary") => WsFormat::Binary,
+            _ => WsFormat::Json,
+        }
+    }
+}
+
 #[derive(Serialize)]
 struct ApiResponse {
     success: bool,
@@ -84,10 +119,11 @@ pub async fn run_api_server(port: u16, state: Arc<AppState>, db: DbClient) {
             }
             
             // Clear buffer
-            {
-                let mut buffer = state.session_buffer.lock().unwrap();
-                buffer.clear();
-            }
+            state.clear_session();
+
+            // Stream samples to disk as they arrive
+            state.stop_recording();
+            state.start_recording(&sample_id);
 
             // Send command to Arduino
             let _ = state.cmd_tx.send("START_SAMPLING".to_string());
@@ -110,6 +146,9 @@ pub async fn run_api_server(port: u16, state: Arc<AppState>, db: DbClient) {
             // Send command to Arduino
             let _ = state.cmd_tx.send("STOP_SAMPLING".to_string());
 
+            // Finalize the streamed recording in place
+            state.stop_recording();
+
             state.log("[INFO] ⏹️ Stopped sampling".to_string());
             warp::reply::json(&ApiResponse { success: true, message: "Stopped".to_string() })
         });
@@ -157,10 +196,7 @@ pub async fn run_api_server(port: u16, state: Arc<AppState>, db: DbClient) {
         .and(warp::path("reset"))
         .and(state_filter.clone())
         .map(|state: Arc<AppState>| {
-            {
-                let mut buffer = state.session_buffer.lock().unwrap();
-                buffer.clear();
-            }
+            state.clear_session();
             state.log("[INFO] 🔄 System Reset".to_string());
             warp::reply::json(&ApiResponse { success: true, message: "Reset".to_string() })
         });
@@ -185,12 +221,36 @@ pub async fn run_api_server(port: u16, state: Arc<AppState>, db: DbClient) {
         });
 
     // GET SESSION DATA (For Edge Impulse Upload)
+    // Optionally one page: ?offset=N&limit=M, and/or ?since=TS for samples newer
+    // than a device timestamp. X-Session-Total (buffer length) and
+    // X-Session-Epoch (changes when the buffer is cleared) let clients fetch
+    // only what they have not seen yet.
     let get_data_route = warp::get()
         .and(warp::path("session_data"))
+        .and(warp::query::<PageQuery>())
         .and(state_filter.clone())
-        .map(|state: Arc<AppState>| {
+        .map(|q: PageQuery, state: Arc<AppState>| {
             let buffer = state.session_buffer.lock().unwrap();
-            warp::reply::json(&*buffer)
+            let epoch = state.session_epoch.load(Ordering::SeqCst);
+            let total = buffer.len();
+            let start = q.offset.unwrap_or(0).min(total);
+            let limit = q.limit.unwrap_or(usize::MAX);
+            let page: Vec<&SensorData> = match q.since {
+                Some(ts) => buffer[start..].iter().filter(|d| d.ts > ts).take(limit).collect(),
+                None => buffer[start..].iter().take(limit).collect(),
+            };
+            let reply = warp::reply::json(&page);
+            let reply = warp::reply::with_header(reply, "X-Session-Total", total.to_string());
+            warp::reply::with_header(reply, "X-Session-Epoch", epoch.to_string())
+        });
+
+    // CONNECTED DEVICES
+    let devices_route = warp::get()
+        .and(warp::path("devices"))
+        .and(state_filter.clone())
+        .map(|state: Arc<AppState>| {
+            let devices = state.devices.lock().unwrap();
+            warp::reply::json(&*devices)
         });
 
     // --- WEBSOCKETS ---
@@ -198,9 +258,11 @@ pub async fn run_api_server(port: u16, state: Arc<AppState>, db: DbClient) {
     // DATA STREAM
     let ws_data_route = warp::path("ws")
         .and(warp::ws())
+        .and(warp::query::<WsQuery>())
         .and(state_filter.clone())
-        .map(|ws: warp::ws::Ws, state: Arc<AppState>| {
-            ws.on_upgrade(move |socket| handle_ws_data(socket, state))
+        .map(|ws: warp::ws::Ws, q: WsQuery, state: Arc<AppState>| {
+            let format = WsFormat::from_query(&q);
+            ws.on_upgrade(move |socket| handle_ws_data(socket, state, format, q.device))
         });
 
     // LOG STREAM
@@ -257,9 +319,11 @@ pub async fn run_api_server(port: u16, state: Arc<AppState>, db: DbClient) {
     let ws_sim_route = warp::path("sim")
         .and(warp::path("ws"))
         .and(warp::ws())
+        .and(warp::query::<WsQuery>())
         .and(state_filter.clone())
-        .map(|ws: warp::ws::Ws, state: Arc<AppState>| {
-            ws.on_upgrade(move |socket| handle_ws_sim(socket, state))
+        .map(|ws: warp::ws::Ws, q: WsQuery, state: Arc<AppState>| {
+            let format = WsFormat::from_query(&q);
+            ws.on_upgrade(move |socket| handle_ws_sim(socket, state, format))
         });
 
     let routes = list_ports_route
@@ -271,6 +335,7 @@ pub async fn run_api_server(port: u16, state: Arc<AppState>, db: DbClient) {
         .or(reset_route)
         .or(connect_influx_route)
         .or(get_data_route)
+        .or(devices_route)
         .or(ws_data_route)
         .or(ws_logs_route)
         .or(sim_start_route)
@@ -283,17 +348,10 @@ pub async fn run_api_server(port: u16, state: Arc<AppState>, db: DbClient) {
     warp::serve(routes).run(addr).await;
 }
 
-async fn handle_ws_data(ws: warp::ws::WebSocket, state: Arc<AppState>) {
-    let (mut tx, _) = ws.split();
-    let mut rx = state.data_tx.subscribe();
-
-    while let Ok(data) = rx.recv().await {
-        if let Ok(json) = serde_json::to_string(&data) {
-            if tx.send(warp::ws::Message::text(json)).await.is_err() {
-                break;
-            }
-        }
-    }
+async fn handle_ws_data(ws: warp::ws::WebSocket, state: Arc<AppState>, format: WsFormat, device: Option<String>) {
+    let rx = state.data_tx.subscribe();
+    let keep = move |d: &SensorData| device.is_none() || d.device == device;
+    stream_ws(ws, rx, format, keep, |d| d.ts as f64, |d, base| d.to_frame(base).to_vec()).await;
 }
 
 async fn handle_ws_logs(ws: warp::ws::WebSocket, state: Arc<AppState>) {
@@ -307,13 +365,59 @@ async fn handle_ws_logs(ws: warp::ws::WebSocket, state: Arc<AppState>) {
     }
 }
 
-async fn handle_ws_sim(ws: warp::ws::WebSocket, state: Arc<AppState>) {
+async fn handle_ws_sim(ws: warp::ws::WebSocket, state: Arc<AppState>, format: WsFormat) {
+    let rx = state.sim_tx.subscribe();
+    stream_ws(ws, rx, format, |_| true, |p| p.time, |p, base| p.to_frame(base).to_vec()).await;
+}
+
+// Forward a broadcast channel to a WebSocket, dropping items `keep` rejects. In
+// batch/binary mode every sample already queued behind the one just received
+// goes out in the same frame. `clock` is the first column at full precision;
+// binary frames carry the first item's clock once and per-row offsets.
+async fn stream_ws<T, K, C, F>(ws: warp::ws::WebSocket, mut rx: broadcast::Receiver<T>, format: WsFormat, keep: K, clock: C, to_frame: F)
+where
+    T: Serialize + Clone,
+    K: Fn(&T) -> bool,
+    C: Fn(&T) -> f64,
+    F: Fn(&T, f64) -> Vec<f32>,
+{
     let (mut tx, _) = ws.split();
-    let mut rx = state.sim_tx.subscribe();
 
-    while let Ok(data) = rx.recv().await {
-        if let Ok(json) = serde_json::to_string(&data) {
-            if tx.send(warp::ws::Message::text(json)).await.is_err() {
+    loop {
+        let first = match rx.recv().await {
+            Ok(data) if keep(&data) => data,
+            Ok(_) | Err(broadcast::error::RecvError::Lagged(_)) => continue,
+            Err(_) => break,
+        };
+
+        let mut batch = vec![first];
+        if format != WsFormat::Json {
+            while batch.len() < WS_MAX_BATCH {
+                match rx.try_recv() {
+                    Ok(data) if keep(&data) => batch.push(data),
+                    Ok(_) | Err(broadcast::error::TryRecvError::Lagged(_)) => continue,
+                    Err(_) => break,
+                }
+            }
+        }
+
+        let msg = match format {
+            WsFormat::Json => serde_json::to_string(&batch[0]).ok().map(warp::ws::Message::text),
+            WsFormat::Batch => serde_json::to_string(&batch).ok().map(warp::ws::Message::text),
+            WsFormat::Binary => {
+                let base = clock(&batch[0]);
+                let mut buf = base.to_le_bytes().to_vec();
+                for item in &batch {
+                    for v in to_frame(item, base) {
+                        buf.extend_from_slice(&v.to_le_bytes());
+                    }
+                }
+                Some(warp::ws::Message::binary(buf))
+            }
+        };
+
+        if let Some(msg) = msg {
+            if tx.send(msg).await.is_err() {
                 break;
             }
         }
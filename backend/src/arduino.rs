@@ -2,11 +2,11 @@ use tokio::net::TcpListener;
 use tokio::io::{AsyncBufReadExt, BufReader};
 use std::sync::Arc;
 use crate::state::{AppState, SensorData};
-use crate::db::DbClient;
+use crate::db::DbWriter;
 use serialport::SerialPort;
 use std::time::Duration;
 
-pub async fn run_tcp_server(port: u16, state: Arc<AppState>, db: DbClient) {
+pub async fn run_tcp_server(port: u16, state: Arc<AppState>, db: DbWriter) {
     let addr = format!("0.0.0.0:{}", port);
     let listener = match TcpListener::bind(&addr).await {
         Ok(l) => {
@@ -45,9 +45,16 @@ pub async fn run_tcp_server(port: u16, state: Arc<AppState>, db: DbClient) {
                     Ok(_) => {
                         // Parse JSON
                         match serde_json::from_str::<SensorData>(&line) {
-                            Ok(data) => {
+                            Ok(mut data) => {
+                                // Firmware reconnects per sample, so fall back to the peer IP (not port) as id
+                                if data.device.is_none() {
+                                    data.device = Some(addr.ip().to_string());
+                                }
+                                state.note_device(&data);
+
                                 // Log data received (Debug)
-                                state.log(format!("[DEBUG] 📥 Data received: State={}, CO={}", data.state, data.co_mics));
+                                state.log(format!("[DEBUG] 📥 Data received: Device={}, State={}, CO={}",
+                                    data.device.as_deref().unwrap_or(""), data.state, data.co_mics));
                                 
                                 // Broadcast to GUI
                                 let _ = state.data_tx.send(data.clone());
@@ -65,14 +72,23 @@ pub async fn run_tcp_server(port: u16, state: Arc<AppState>, db: DbClient) {
                                         buffer.push(data.clone());
                                     }
 
-                                    // Save to InfluxDB
+                                    // Append to the streaming recording
+                                    let record_err = {
+                                        let mut recorder = state.recorder.lock().unwrap();
+                                        recorder.as_mut().and_then(|rec| rec.append(&data).err().map(|e| e.to_string()))
+                                    };
+                                    if let Some(e) = record_err {
+                                        state.log(format!("[ERROR] Recording write failed: {}", e));
+                                    }
+
+                                    // Queue for InfluxDB; the writer task batches and sends it
                                     let sample_id = {
                                         let status = state.status.lock().unwrap();
                                         status.current_sample_id.clone().unwrap_or_default()
                                     };
                                     
-                                    if let Err(e) = db.write_data(&data, &sample_id).await {
-                                        state.log(format!("[ERROR] InfluxDB write failed: {}", e));
+                                    if let Err(e) = db.push(&data, &sample_id) {
+                                        state.log(format!("[ERROR] InfluxDB point rejected: {}", e));
                                     }
                                 }
                             },
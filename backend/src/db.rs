@@ -1,8 +1,17 @@
 use influxdb2::Client;
 use influxdb2::models::DataPoint;
-use crate::state::SensorData;
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::Arc;
+use std::time::Duration;
+use tokio::sync::mpsc;
+use tokio::time::MissedTickBehavior;
+use crate::state::{AppState, SensorData};
 use crate::settings::InfluxConfig;
 
+// Points waiting for the writer task; when full, new points are dropped
+// rather than stalling the TCP read loop
+const WRITE_QUEUE: usize = 100_000;
+
 #[derive(Clone)]
 pub struct DbClient {
     client: Client,
@@ -21,23 +30,32 @@ impl DbClient {
         }
     }
 
-    pub async fn write_data(&self, data: &SensorData, sample_id: &str) -> Result<(), Box<dyn std::error::Error>> {
-        let points = vec![
-            DataPoint::builder("sensors")
-                .tag("sample_id", sample_id)
-                .tag("state", &data.state)
-                .field("co_mics", data.co_mics as f64)
-                .field("eth_mics", data.eth_mics as f64)
-                .field("voc_mics", data.voc_mics as f64)
-                .field("no2_gm", data.no2_gm as f64)
-                .field("c2h5oh_gm", data.c2h5oh_gm as f64)
-                .field("voc_gm", data.voc_gm as f64)
-                .field("co_gm", data.co_gm as f64)
-                .field("motor_A", data.motor_a_duty as i64)
-                .field("motor_B", data.motor_b_duty as i64)
-                .build()?,
-        ];
+    // timestamp_ns is the receive time: without one, every point of a batched
+    // write gets the same server time and points of one series overwrite each other
+    pub fn point(data: &SensorData, sample_id: &str, timestamp_ns: i64) -> Result<DataPoint, Box<dyn std::error::Error>> {
+        let mut builder = DataPoint::builder("sensors")
+            .tag("sample_id", sample_id)
+            .tag("state", &data.state);
+        if let Some(device) = &data.device {
+            builder = builder.tag("device", device);
+        }
+        Ok(builder
+            .field("co_mics", data.co_mics as f64)
+            .field("eth_mics", data.eth_mics as f64)
+            .field("voc_mics", data.voc_mics as f64)
+            .field("no2_gm", data.no2_gm as f64)
+            .field("c2h5oh_gm", data.c2h5oh_gm as f64)
+            .field("voc_gm", data.voc_gm as f64)
+            .field("co_gm", data.co_gm as f64)
+            .field("motor_A", data.motor_a_duty as i64)
+            .field("motor_B", data.motor_b_duty as i64)
+            // Device clock, so readers can order and time samples without the write time
+            .field("ts", data.ts as i64)
+            .timestamp(timestamp_ns)
+            .build()?)
+    }
 
+    pub async fn write_points(&self, points: Vec<DataPoint>) -> Result<(), Box<dyn std::error::Error>> {
         self.client.write(&self.bucket, futures::stream::iter(points)).await?;
         Ok(())
     }
@@ -48,3 +66,71 @@ impl DbClient {
         Ok(())
     }
 }
+
+/// Buffered InfluxDB writes off the ingest path.
+///
+/// `push` only queues a point; a background task writes the queue in one
+/// request per `batch_size` points or every `flush_ms`, whichever comes
+/// first. `batch_size = 1` writes every point on its own (the old
+/// behaviour, but still without blocking the socket).
+#[derive(Clone)]
+pub struct DbWriter {
+    tx: mpsc::Sender<DataPoint>,
+    dropped: Arc<AtomicU64>,
+}
+
+impl DbWriter {
+    pub fn spawn(db: DbClient, state: Arc<AppState>, batch_size: usize, flush_ms: u64) -> Self {
+        let (tx, mut rx) = mpsc::channel::<DataPoint>(WRITE_QUEUE);
+        let dropped = Arc::new(AtomicU64::new(0));
+        let batch_size = batch_size.max(1);
+        let lost = dropped.clone();
+
+        tokio::spawn(async move {
+            let mut batch = Vec::with_capacity(batch_size);
+            let mut tick = tokio::time::interval(Duration::from_millis(flush_ms.max(1)));
+            tick.set_missed_tick_behavior(MissedTickBehavior::Delay);
+            loop {
+                let closed = tokio::select! {
+                    point = rx.recv() => match point {
+                        Some(p) => {
+                            batch.push(p);
+                            if batch.len() < batch_size {
+                                continue;
+                            }
+                            false
+                        }
+                        None => true,
+                    },
+                    _ = tick.tick() => false,
+                };
+
+                if !batch.is_empty() {
+                    let points = std::mem::replace(&mut batch, Vec::with_capacity(batch_size));
+                    let n = points.len();
+                    if let Err(e) = db.write_points(points).await {
+                        state.log(format!("[ERROR] InfluxDB write of {} points failed: {}", n, e));
+                    }
+                }
+                let n = lost.swap(0, Ordering::Relaxed);
+                if n > 0 {
+                    state.log(format!("[WARN] InfluxDB write queue full, dropped {} points", n));
+                }
+                if closed {
+                    break;
+                }
+            }
+        });
+
+        Self { tx, dropped }
+    }
+
+    pub fn push(&self, data: &SensorData, sample_id: &str) -> Result<(), Box<dyn std::error::Error>> {
+        let now = chrono::Utc::now().timestamp_nanos_opt().ok_or("receive time out of range")?;
+        let point = DbClient::point(data, sample_id, now)?;
+        if self.tx.try_send(point).is_err() {
+            self.dropped.fetch_add(1, Ordering::Relaxed);
+        }
+        Ok(())
+    }
+}
@@ -1,5 +1,5 @@
 use std::fs::File;
-use std::io::Write;
+use std::io::{BufWriter, Write};
 use crate::state::SensorData;
 use csv::Writer;
 
@@ -18,8 +18,43 @@ pub fn save_csv(path: &str, data: &[SensorData]) -> Result<(), Box<dyn std::erro
 }
 
 pub fn save_json(path: &str, data: &[SensorData]) -> Result<(), Box<dyn std::error::Error>> {
-    let json = serde_json::to_string_pretty(data)?;
-    let mut file = File::create(path)?;
-    file.write_all(json.as_bytes())?;
+    // Stream one compact object per line instead of building a pretty-printed string
+    let mut wtr = BufWriter::new(File::create(path)?);
+    wtr.write_all(b"[")?;
+    for (i, record) in data.iter().enumerate() {
+        wtr.write_all(if i == 0 { &b"\n"[..] } else { &b",\n"[..] })?;
+        serde_json::to_writer(&mut wtr, record)?;
+    }
+    wtr.write_all(b"\n]\n")?;
+    wtr.flush()?;
     Ok(())
 }
+
+// Append-only JSON Lines recording of a sampling session, written as samples arrive
+pub struct SessionRecorder {
+    wtr: BufWriter<File>,
+    pub path: String,
+    pub rows: usize,
+}
+
+impl SessionRecorder {
+    pub fn create(path: &str) -> Result<Self, Box<dyn std::error::Error>> {
+        Ok(Self {
+            wtr: BufWriter::new(File::create(path)?),
+            path: path.to_string(),
+            rows: 0,
+        })
+    }
+
+    pub fn append(&mut self, record: &SensorData) -> Result<(), Box<dyn std::error::Error>> {
+        serde_json::to_writer(&mut self.wtr, record)?;
+        self.wtr.write_all(b"\n")?;
+        self.rows += 1;
+        Ok(())
+    }
+
+    pub fn finish(mut self) -> Result<(String, usize), Box<dyn std::error::Error>> {
+        self.wtr.flush()?;
+        Ok((self.path, self.rows))
+    }
+}
@@ -9,7 +9,7 @@ mod sim;
 use std::sync::Arc;
 use crate::settings::Settings;
 use crate::state::AppState;
-use crate::db::DbClient;
+use crate::db::{DbClient, DbWriter};
 
 #[tokio::main]
 async fn main() {
@@ -38,9 +38,10 @@ async fn main() {
     // Initialize DB
     let db = DbClient::new(settings.influxdb.clone());
 
-    // Spawn Arduino TCP Server
+    // Spawn Arduino TCP Server; its InfluxDB writes go through a batching queue
     let tcp_state = state.clone();
-    let tcp_db = db.clone();
+    let tcp_db = DbWriter::spawn(db.clone(), state.clone(), settings.influxdb.batch_size,
+                                 settings.influxdb.flush_ms);
     tokio::spawn(async move {
         arduino::run_tcp_server(settings.server.arduino_port, tcp_state, tcp_db).await;
     });
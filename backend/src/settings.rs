@@ -14,6 +14,9 @@ pub struct ServerConfig {
     pub host: String,
     pub port: u16,
     pub arduino_port: u16,
+    // Directory for streaming <sample_id>.jsonl recordings; disabled when unset
+    #[serde(default)]
+    pub record_dir: Option<String>,
 }
 
 #[derive(Debug, Deserialize, Clone)]
@@ -22,6 +25,20 @@ pub struct InfluxConfig {
     pub org: String,
     pub bucket: String,
     pub token: String,
+    // Points per write request (1 = write every sample on its own)...
+    #[serde(default = "default_batch_size")]
+    pub batch_size: usize,
+    // ...or whatever is queued after this many milliseconds
+    #[serde(default = "default_flush_ms")]
+    pub flush_ms: u64,
+}
+
+fn default_batch_size() -> usize {
+    500
+}
+
+fn default_flush_ms() -> u64 {
+    1000
 }
 
 #[allow(dead_code)]
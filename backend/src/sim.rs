@@ -52,6 +52,12 @@ pub struct SimDataPoint {
     pub y: f64,
 }
 
+impl SimDataPoint {
+    pub fn to_frame(&self, base: f64) -> [f32; 4] {
+        [(self.time - base) as f32, self.x1 as f32, self.x2 as f32, self.y as f32]
+    }
+}
+
 pub struct SimEngine {
     pub config: SimConfig,
     pub start_time: std::time::Instant,
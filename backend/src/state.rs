@@ -1,8 +1,11 @@
 use serde::{Deserialize, Serialize};
 use tokio::sync::broadcast;
+use std::collections::BTreeMap;
+use std::sync::atomic::{AtomicU64, Ordering};
 use std::sync::{Arc, Mutex};
 use crate::settings::Settings;
 use crate::sim::{SimEngine, SimDataPoint};
+use crate::file_io::SessionRecorder;
 
 #[derive(Debug, Clone, Serialize, Deserialize)]
 pub struct SensorData {
@@ -26,6 +29,53 @@ pub struct SensorData {
     pub co_gm: f32,
     #[serde(rename = "currentLevel")]
     pub current_level: i32,
+    // Unit id: the firmware "device" key, or the TCP peer IP. Exported as the
+    // last column/key so sessions with several units stay separable.
+    #[serde(default)]
+    pub device: Option<String>,
+}
+
+#[derive(Debug, Clone, Serialize)]
+pub struct DeviceInfo {
+    pub samples: u64,
+    pub last_ts: u64,
+    pub last_seen: i64, // unix seconds
+}
+
+// FSM states in firmware enum order (index is the binary wire code)
+pub const STATE_NAMES: [&str; 7] = ["IDLE", "PRE_COND", "RAMP_UP", "HOLD", "PURGE", "RECOVERY", "DONE"];
+
+// Number of f32 values per sample in the binary WebSocket format
+pub const SENSOR_FRAME_LEN: usize = 17;
+
+impl SensorData {
+    pub fn state_code(&self) -> f32 {
+        STATE_NAMES.iter().position(|s| *s == self.state).map(|i| i as f32).unwrap_or(-1.0)
+    }
+
+    // Field order matches the struct (and the CSV export). ts goes out as an
+    // offset from the frame's f64 base: millis() outgrows f32 precision after ~4.7 h
+    pub fn to_frame(&self, base: f64) -> [f32; SENSOR_FRAME_LEN] {
+        [
+            (self.ts as f64 - base) as f32,
+            self.state_code(),
+            self.motor_a_duty as f32,
+            self.motor_b_duty as f32,
+            self.gmxxx_ch1 as f32,
+            self.gmxxx_ch2 as f32,
+            self.gmxxx_ch3 as f32,
+            self.gmxxx_ch4 as f32,
+            self.mics5524_raw as f32,
+            self.co_mics,
+            self.eth_mics,
+            self.voc_mics,
+            self.no2_gm,
+            self.c2h5oh_gm,
+            self.voc_gm,
+            self.co_gm,
+            self.current_level as f32,
+        ]
+    }
 }
 
 #[allow(dead_code)]
@@ -45,14 +95,19 @@ pub struct AppState {
     pub cmd_tx: broadcast::Sender<String>, // To send commands to Serial thread
     pub sim_tx: broadcast::Sender<SimDataPoint>, // NEW: Sim Data Channel
     pub session_buffer: Arc<Mutex<Vec<SensorData>>>,
+    // Bumped whenever session_buffer is cleared, so paging clients can tell
+    // "more samples" from "a different session"
+    pub session_epoch: AtomicU64,
     pub sim_engine: Arc<Mutex<SimEngine>>, 
-    #[allow(dead_code)]
+    pub recorder: Arc<Mutex<Option<SessionRecorder>>>,
+    pub devices: Arc<Mutex<BTreeMap<String, DeviceInfo>>>,
     pub settings: Settings,
 }
 
 impl AppState {
     pub fn new(settings: Settings) -> Self {
-        let (data_tx, _) = broadcast::channel(100);
+        // Shared by every connected unit, so sized for several devices at full rate
+        let (data_tx, _) = broadcast::channel(1024);
         let (log_tx, _) = broadcast::channel(100);
         let (cmd_tx, _) = broadcast::channel(100);
         let (sim_tx, _) = broadcast::channel(100); // NEW
@@ -70,11 +125,58 @@ impl AppState {
             cmd_tx,
             sim_tx,
             session_buffer: Arc::new(Mutex::new(Vec::new())),
+            session_epoch: AtomicU64::new(0),
             sim_engine: Arc::new(Mutex::new(SimEngine::new())), 
+            recorder: Arc::new(Mutex::new(None)),
+            devices: Arc::new(Mutex::new(BTreeMap::new())),
             settings,
         }
     }
 
+    pub fn start_recording(&self, sample_id: &str) {
+        let dir = match &self.settings.server.record_dir {
+            Some(dir) => dir,
+            None => return,
+        };
+        let path = std::path::Path::new(dir).join(format!("{}.jsonl", sample_id));
+        let path = path.to_string_lossy().to_string();
+        let result = std::fs::create_dir_all(dir)
+            .map_err(|e| e.to_string())
+            .and_then(|_| SessionRecorder::create(&path).map_err(|e| e.to_string()));
+        match result {
+            Ok(rec) => {
+                self.log(format!("[INFO] ⏺️ Recording to {}", path));
+                *self.recorder.lock().unwrap() = Some(rec);
+            },
+            Err(e) => self.log(format!("[ERROR] Failed to start recording {}: {}", path, e)),
+        }
+    }
+
+    pub fn stop_recording(&self) {
+        let rec = self.recorder.lock().unwrap().take();
+        if let Some(rec) = rec {
+            match rec.finish() {
+                Ok((path, rows)) => self.log(format!("[INFO] 💾 Recorded {} samples to {}", rows, path)),
+                Err(e) => self.log(format!("[ERROR] Failed to finalize recording: {}", e)),
+            }
+        }
+    }
+
+    pub fn clear_session(&self) {
+        let mut buffer = self.session_buffer.lock().unwrap();
+        buffer.clear();
+        self.session_epoch.fetch_add(1, Ordering::SeqCst);
+    }
+
+    pub fn note_device(&self, data: &SensorData) {
+        let id = data.device.clone().unwrap_or_default();
+        let mut devices = self.devices.lock().unwrap();
+        let info = devices.entry(id).or_insert(DeviceInfo { samples: 0, last_ts: 0, last_seen: 0 });
+        info.samples += 1;
+        info.last_ts = data.ts;
+        info.last_seen = chrono::Utc::now().timestamp();
+    }
+
     pub fn log(&self, message: String) {
         // Print to terminal
         println!("{}", message);
@@ -11,6 +11,7 @@ const char* ssid = "HUPOMONE";
 const char* pass = "beranak7";  
 const char* RUST_IP = "192.168.100.173";  // IP PC Anda (Fixed)
 const int   RUST_PORT = 8081;           // Port Backend (Fixed)
+const char* DEVICE_ID = "enose-1";      // Unik per alat (multi-device)
 WiFiClient client;
 
 // ==================== SENSOR ====================
@@ -216,6 +217,7 @@ void sendSensorData() {
   String stateNames[] = {"IDLE","PRE_COND","RAMP_UP","HOLD","PURGE","RECOVERY","DONE"};
   
   String json = "{";
+  json += "\"device\":\"" + String(DEVICE_ID) + "\",";
   json += "\"ts\":" + String(millis()) + ",";
   json += "\"state\":\"" + stateNames[currentState] + "\",";
   json += "\"motor_A_duty\":" + String(motor_a_duty) + ",";
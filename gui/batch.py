@@ -0,0 +1,108 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataset import cache_paths, find_sessions, label_from_path, load_session, session_kind
+from features import FEATURE_VERSION, feature_names, session_features
+
+
+def _feature_cache_path(path):
+    cache_dir, _, _ = cache_paths(path)
+    return cache_dir, os.path.join(cache_dir, os.path.basename(path) + ".features.json")
+
+
+def _cached_features(path):
+    _, cache_file = _feature_cache_path(path)
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    st = os.stat(path)
+    if (cached.get("version") == FEATURE_VERSION and cached.get("mtime_ns") == st.st_mtime_ns
+            and cached.get("size") == st.st_size):
+        return cached["features"]
+    return None
+
+
+def _store_features(path, features):
+    cache_dir, cache_file = _feature_cache_path(path)
+    st = os.stat(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({"version": FEATURE_VERSION, "mtime_ns": st.st_mtime_ns,
+                       "size": st.st_size, "features": features}, f)
+    except OSError:
+        pass
+
+
+def process_file(path, use_cache=True):
+    """Worker: returns (status, features) with status "cached", "done" or "skipped"."""
+    if use_cache:
+        features = _cached_features(path)
+        if features is not None:
+            return "cached", features
+    data = load_session(path)
+    if session_kind(data) != "sensor":
+        return "skipped", None
+    features = session_features(data).tolist()
+    if use_cache:
+        _store_features(path, features)
+    return "done", features
+
+
+def collect_paths(inputs, extensions=(".csv",)):
+    paths = []
+    for target in inputs:
+        paths.extend(find_sessions(target, extensions) if os.path.isdir(target) else [target])
+    return paths
+
+
+def run_batch(paths, output, workers=None, use_cache=True, log=print):
+    """Featurize paths on a process pool, streaming rows into output as they finish.
+
+    Returns a dict of counters; failed files are reported and left out of the table.
+    """
+    counts = {"done": 0, "cached": 0, "skipped": 0, "failed": 0}
+    t0 = time.perf_counter()
+    with open(output, 'w', newline='', encoding='utf-8') as f, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = csv.writer(f)
+        writer.writerow(["file", "label"] + feature_names())
+        futures = {pool.submit(process_file, p, use_cache): p for p in paths}
+        for i, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            name = os.path.basename(path)
+            try:
+                status, features = future.result()
+            except Exception as e:
+                counts["failed"] += 1
+                log(f"[{i}/{len(paths)}] FAILED {name}: {e}")
+                continue
+            counts[status] += 1
+            if features is not None:
+                writer.writerow([name, label_from_path(path)] + [f"{v:.6g}" for v in features])
+            log(f"[{i}/{len(paths)}] {status:7s} {name}")
+    counts["seconds"] = time.perf_counter() - t0
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Featurize a recording corpus in parallel")
+    parser.add_argument("inputs", nargs="*", help="session files or directories (default: gui/)")
+    parser.add_argument("-o", "--output", default="features.csv")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--ext", action="append", help="file extensions to scan in directories (default: .csv)")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every file")
+    args = parser.parse_args()
+
+    paths = collect_paths(args.inputs or [os.path.dirname(os.path.abspath(__file__))],
+                          tuple(args.ext) if args.ext else (".csv",))
+    counts = run_batch(paths, args.output, args.jobs, not args.no_cache)
+    print(f"{len(paths)} files in {counts['seconds']:.2f} s: {counts['done']} processed, "
+          f"{counts['cached']} cached, {counts['skipped']} skipped, {counts['failed']} failed -> {args.output}")
+    sys.exit(1 if counts["failed"] else 0)
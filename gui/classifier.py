@@ -0,0 +1,322 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+from dataset import CACHE_DIR, find_sessions, label_from_path, load_session, session_kind
+from sensor_frame import GAS_CHANNELS, SENSOR_INDEX
+from resample import resample_session
+from windowing import inside_states, session_windows
+
+# Sliding windows over the seven gas channels: 40 samples = 10 s at the
+# firmware's 250 ms cadence, a new prediction every 4 samples (1 s)
+WINDOW = 40
+HOP = 4
+# Training only uses windows that lie entirely inside a response phase
+TRAIN_STATES = ("PRE_COND", "RAMP_UP", "HOLD", "PURGE", "RECOVERY")
+TRAIN_HOP = 8
+
+PCA_COMPONENTS = 12
+K_NEIGHBORS = 7
+# Training windows kept per class (evenly subsampled) to bound kNN cost per prediction
+MAX_PER_CLASS = 4000
+
+# The same teas were recorded under English and Indonesian names
+LABEL_ALIASES = {"black_tea": "teh_hitam", "teh_melati": "melati"}
+
+# Bump when window features or the model layout change so cached models are retrained
+MODEL_VERSION = 2
+MODEL_FILE = "aroma_model.npz"
+
+_EPS = 1e-6
+
+
+def feature_names(channels=GAS_CHANNELS):
+    names = []
+    for feat in ("log_level", "range"):
+        names.extend(f"{feat}.{ch}" for ch in channels)
+    return names
+
+
+def window_features(windows):
+    """Features of a stack of windows shaped (n, window, n_channels), e.g. from session_windows.
+
+    Per channel: log mean level and peak-to-peak range relative to that
+    level. Leave-one-session-out on the gui/ corpus: slope and coefficient
+    of variation only added noise on top of these.
+    """
+    level = windows.mean(axis=-2, dtype=np.float64)
+    scale = np.abs(level) + _EPS
+    return np.concatenate((np.log(scale), np.ptp(windows, axis=-2) / scale), axis=-1)
+
+
+def window_rows(data, window=WINDOW, hop=TRAIN_HOP, states=TRAIN_STATES):
+    """Feature rows for the windows of one sensor session inside the given FSM states."""
+    views, _ = session_windows(data, window, hop)
+    return window_features(views)[inside_states(data, states, window, hop)]
+
+
+def corpus_paths(directory=None):
+    """Sensor recordings (.csv) of the corpus, by default the gui/ folder."""
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    return [p for p in find_sessions(directory, (".csv",)) if session_kind(load_session(p)) == "sensor"]
+
+
+def session_label(path):
+    label = label_from_path(path)
+    return LABEL_ALIASES.get(label, label)
+
+
+class AromaModel:
+    """Standardize -> PCA -> LDA -> distance-weighted kNN, in plain NumPy.
+
+    PCA drops near-collinear directions so the LDA within-class scatter is
+    well conditioned; kNN then votes in the (n_classes - 1)-dim LDA space,
+    where a prediction is one small matrix product plus a distance scan.
+    """
+
+    def __init__(self, k=K_NEIGHBORS, n_components=PCA_COMPONENTS):
+        self.k = k
+        self.n_components = n_components
+        self.classes = None
+
+    def fit(self, X, y):
+        y = np.asarray(y)
+        ok = np.isfinite(X).all(axis=1)
+        X, y = X[ok], y[ok]
+        self.classes, codes = np.unique(y, return_inverse=True)
+        self.mean = X.mean(axis=0)
+        self.std = X.std(axis=0) + _EPS
+        Z = (X - self.mean) / self.std
+
+        _, _, vt = np.linalg.svd(Z, full_matrices=False)
+        pca = vt[:min(self.n_components, len(vt))].T
+        P = Z @ pca
+
+        centroids = np.array([P[codes == c].mean(axis=0) for c in range(len(self.classes))])
+        within = sum(np.cov(P[codes == c], rowvar=False) * (np.sum(codes == c) - 1)
+                     for c in range(len(self.classes))) / len(P)
+        between = np.cov(centroids, rowvar=False)
+        evals, evecs = np.linalg.eig(np.linalg.solve(within + _EPS * np.eye(len(within)), between))
+        order = np.argsort(-evals.real)[:max(len(self.classes) - 1, 1)]
+        self.projection = pca @ evecs[:, order].real
+
+        # Evenly thin over-represented classes; neighbours then come from every session
+        keep = np.concatenate([np.flatnonzero(codes == c)[np.linspace(0, np.sum(codes == c) - 1,
+                               min(np.sum(codes == c), MAX_PER_CLASS)).astype(int)]
+                               for c in range(len(self.classes))])
+        self.points = (Z[keep] @ self.projection)
+        self.codes = codes[keep]
+        return self
+
+    def transform(self, X):
+        return ((X - self.mean) / self.std) @ self.projection
+
+    def predict_proba(self, X):
+        """(n, n_classes) neighbour vote shares."""
+        Q = self.transform(np.atleast_2d(X))
+        d2 = (Q * Q).sum(axis=1)[:, None] - 2 * Q @ self.points.T + (self.points * self.points).sum(axis=1)
+        k = min(self.k, len(self.points))
+        nearest = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        weights = 1.0 / (np.sqrt(np.maximum(np.take_along_axis(d2, nearest, axis=1), 0)) + _EPS)
+        votes = np.zeros((len(Q), len(self.classes)))
+        np.add.at(votes, (np.arange(len(Q))[:, None], self.codes[nearest]), weights)
+        return votes / votes.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        proba = self.predict_proba(X)
+        best = proba.argmax(axis=1)
+        return self.classes[best], proba[np.arange(len(best)), best]
+
+    def save(self, path, **meta):
+        np.savez(path, classes=self.classes, mean=self.mean, std=self.std, projection=self.projection,
+                 points=self.points, codes=self.codes, k=self.k, n_components=self.n_components,
+                 meta=json.dumps(meta))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            model = cls(int(f["k"]), int(f["n_components"]))
+            model.classes = f["classes"]
+            model.mean, model.std, model.projection = f["mean"], f["std"], f["projection"]
+            model.points, model.codes = f["points"], f["codes"]
+            model.meta = json.loads(str(f["meta"]))
+        return model
+
+
+def corpus_key(paths):
+    """Fingerprint of the training files (names, sizes, mtimes), features and model settings."""
+    h = hashlib.sha1(f"{MODEL_VERSION}:{WINDOW}:{TRAIN_HOP}:{K_NEIGHBORS}:{PCA_COMPONENTS}:"
+                     f"{','.join(feature_names())}".encode("utf-8"))
+    for p in sorted(paths):
+        st = os.stat(p)
+        h.update(f"{os.path.basename(p)}:{st.st_size}:{st.st_mtime_ns}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def corpus_dataset(paths, window=WINDOW, hop=TRAIN_HOP):
+    """Stacked window features, labels and a per-row session index.
+
+    Sessions are resampled onto the device-ts grid first, as the live stream is.
+    """
+    blocks, labels, groups = [], [], []
+    for i, p in enumerate(paths):
+        F = window_rows(resample_session(load_session(p))[0], window, hop)
+        blocks.append(F)
+        labels += [session_label(p)] * len(F)
+        groups.append(np.full(len(F), i))
+    return np.vstack(blocks), np.array(labels), np.concatenate(groups)
+
+
+def train_model(paths=None, use_cache=True, log=print):
+    """Train on the corpus, or load the cached model while the corpus is unchanged."""
+    paths = corpus_paths() if paths is None else paths
+    if not paths:
+        raise ValueError("No sensor recordings to train on")
+    key = corpus_key(paths)
+    cache_path = os.path.join(os.path.dirname(os.path.abspath(paths[0])), CACHE_DIR, MODEL_FILE)
+    if use_cache and os.path.exists(cache_path):
+        try:
+            model = AromaModel.load(cache_path)
+            if model.meta.get("key") == key:
+                log(f"[INFO] Aroma model loaded: {', '.join(model.classes)}")
+                return model
+        except (OSError, ValueError, KeyError):
+            pass
+
+    t0 = time.perf_counter()
+    X, y, _ = corpus_dataset(paths)
+    model = AromaModel().fit(X, y)
+    log(f"[INFO] Aroma model trained on {len(X)} windows from {len(paths)} sessions "
+        f"in {time.perf_counter() - t0:.2f} s: {', '.join(model.classes)}")
+    if use_cache:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            model.save(cache_path, key=key, sessions=[os.path.basename(p) for p in paths])
+        except OSError:
+            pass
+    model.meta = {"key": key}
+    return model
+
+
+def evaluate(paths=None, log=print):
+    """Leave-one-session-out accuracy, per window and per session (majority vote)."""
+    paths = corpus_paths() if paths is None else paths
+    X, y, groups = corpus_dataset(paths)
+    correct = windows = sessions_ok = 0
+    for i, p in enumerate(paths):
+        test = groups == i
+        if not test.any() or np.sum(y[~test] == y[test][0]) == 0:
+            log(f"{os.path.basename(p):28s} skipped (no other session of '{session_label(p)}')")
+            continue
+        model = AromaModel().fit(X[~test], y[~test])
+        pred, _ = model.predict(X[test])
+        hits = int(np.sum(pred == y[test]))
+        values, counts = np.unique(pred, return_counts=True)
+        vote = values[counts.argmax()]
+        correct += hits
+        windows += len(pred)
+        sessions_ok += vote == y[test][0]
+        log(f"{os.path.basename(p):28s} {y[test][0]:12s} -> {vote:12s} {100 * hits / len(pred):5.1f}% of {len(pred)} windows")
+    return correct / max(windows, 1), sessions_ok
+
+
+class LiveClassifier:
+    """Scores the newest WINDOW samples of a live stream every HOP samples.
+
+    push() takes the (n, len(SENSOR_FIELDS)) blocks the tabs receive and
+    keeps only the last window of gas channels, so each prediction costs one
+    window's features and one kNN query regardless of session length.
+    """
+
+    def __init__(self, model, window=WINDOW, hop=HOP):
+        self.model = model
+        self.window = window
+        self.hop = hop
+        self.cols = [SENSOR_INDEX[ch] for ch in GAS_CHANNELS]
+        self.buf = np.zeros((window, len(self.cols)))
+        self.filled = 0
+        self.pending = 0
+        self.last = None
+
+    def reset(self):
+        self.filled = 0
+        self.pending = 0
+        self.last = None
+
+    def push(self, block):
+        """Append samples; returns (label, confidence, latency_ms) when a new window was scored, else None."""
+        if not len(block):
+            return None
+        x = block[-self.window:, self.cols]
+        n = len(x)
+        self.buf = np.roll(self.buf, -n, axis=0)
+        self.buf[-n:] = x
+        self.filled = min(self.filled + len(block), self.window)
+        self.pending += len(block)
+        if self.filled < self.window or self.pending < self.hop:
+            return None
+        self.pending = 0
+        t0 = time.perf_counter()
+        labels, conf = self.model.predict(window_features(self.buf[None]))
+        self.last = (str(labels[0]), float(conf[0]), (time.perf_counter() - t0) * 1000)
+        return self.last
+
+
+class TrainWorker(QThread):
+    """Loads or trains the aroma model off the UI thread."""
+    log_received = Signal(str)
+    model_ready = Signal(object)
+
+    def __init__(self, paths=None, use_cache=True):
+        super().__init__()
+        self.paths = paths
+        self.use_cache = use_cache
+
+    def run(self):
+        try:
+            model = train_model(self.paths, self.use_cache, log=self.log_received.emit)
+        except Exception as e:
+            self.log_received.emit(f"[ERROR] Aroma model training failed: {e}")
+            model = None
+        self.model_ready.emit(model)
+
+
+def benchmark(model, paths, repeat=3):
+    """Per-window latency of LiveClassifier over recorded sessions fed one sample at a time."""
+    from dataset import session_frames
+    times = []
+    for p in paths:
+        frames = session_frames(load_session(p))
+        for _ in range(repeat):
+            live = LiveClassifier(model)
+            for i in range(len(frames)):
+                out = live.push(frames[i:i + 1])
+                if out is not None:
+                    times.append(out[2])
+    return np.array(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and evaluate the live tea-aroma classifier")
+    parser.add_argument("cmd", choices=("train", "eval", "bench"))
+    parser.add_argument("inputs", nargs="*", help="session files or directories (default: gui/*.csv)")
+    parser.add_argument("--no-cache", action="store_true", help="retrain even if the corpus is unchanged")
+    args = parser.parse_args()
+
+    paths = []
+    for target in args.inputs or [os.path.dirname(os.path.abspath(__file__))]:
+        paths.extend(corpus_paths(target) if os.path.isdir(target) else [target])
+
+    if args.cmd == "train":
+        model = train_model(paths, not args.no_cache)
+    elif args.cmd == "eval":
+        acc, ok = evaluate(paths)
+        print(f"leave-one-session-out: {100 * acc:.1f}% of windows, {ok}/{len(paths)} sessions by majority vote")
+    else:
+        model = train_model(paths, not args.no_cache)
+        t = benchmark(model, paths[:3], repeat=1)
+        p50, p99 = np.percentile(t, (50, 99))
+        print(f"{len(t)} windows: p50 {p50:.3f} ms, p99 {p99:.3f} ms, max {t.max():.3f} ms per window")
@@ -0,0 +1,121 @@
+import asyncio
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from PySide6.QtCore import QObject, Signal, Slot
+
+# Default (connect, read) timeouts in seconds
+TIMEOUT = (2.0, 10.0)
+RETRIES = {"GET": 2, "POST": 1}
+BACKOFF_S = 0.25
+BACKOFF_MAX_S = 4.0
+POOL_SIZE = 8
+
+
+class ControlClient(QObject):
+    """Non-blocking HTTP client for the backend control API.
+
+    Requests run on a private asyncio loop thread and go through one pooled
+    keep-alive requests.Session (the blocking call itself runs in a small
+    executor). Each call returns a concurrent.futures.Future immediately;
+    on_done(response) / on_error(exception) are invoked on the Qt thread that
+    owns the client, so they may touch widgets.
+
+    Connection failures and timeouts are retried with jittered exponential
+    backoff. GETs are also retried on 5xx responses. POSTs are only retried
+    when the connection could not be established, so an action is never
+    sent twice.
+    """
+    _finished = Signal(object, object, object)
+
+    def __init__(self, base_url, timeout=TIMEOUT, pool_size=POOL_SIZE, parent=None):
+        super().__init__(parent)
+        self.base_url = base_url.rstrip("/") + "/"
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="control-http")
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="control-client", daemon=True)
+        self.thread.start()
+        self._finished.connect(self._deliver)
+
+    def url(self, path):
+        return path if "://" in path else urljoin(self.base_url, path.lstrip("/"))
+
+    def request(self, method, path, on_done=None, on_error=None, retries=None, timeout=None, **kwargs):
+        method = method.upper()
+        retries = RETRIES.get(method, 0) if retries is None else retries
+        coro = self._request(method, self.url(path), retries, timeout or self.timeout, kwargs)
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if on_done is not None or on_error is not None:
+            future.add_done_callback(lambda f: self._finished.emit(f, on_done, on_error))
+        return future
+
+    def get(self, path, on_done=None, on_error=None, **kwargs):
+        return self.request("GET", path, on_done, on_error, **kwargs)
+
+    def post(self, path, on_done=None, on_error=None, **kwargs):
+        return self.request("POST", path, on_done, on_error, **kwargs)
+
+    async def _request(self, method, url, retries, timeout, kwargs):
+        loop = asyncio.get_running_loop()
+        total = (timeout[0] + timeout[1]) if isinstance(timeout, tuple) else timeout
+        attempt = 0
+        while True:
+            call = lambda: self.session.request(method, url, timeout=timeout, **kwargs)
+            try:
+                res = await asyncio.wait_for(loop.run_in_executor(self.executor, call), total + 1.0)
+                if method == "GET" and res.status_code >= 500 and attempt < retries:
+                    raise requests.HTTPError(f"HTTP {res.status_code}", response=res)
+                return res
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError, asyncio.TimeoutError) as e:
+                if attempt >= retries or (method != "GET" and not _not_sent(e)):
+                    if isinstance(e, requests.HTTPError) and e.response is not None:
+                        return e.response
+                    raise
+            attempt += 1
+            delay = min(BACKOFF_S * 2 ** (attempt - 1), BACKOFF_MAX_S)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    @Slot(object, object, object)
+    def _deliver(self, future, on_done, on_error):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            if on_error is not None:
+                on_error(error)
+        elif on_done is not None:
+            on_done(future.result())
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+def _not_sent(error):
+    # The connection was never established (refused, unreachable, connect timeout)
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError) and not isinstance(error, requests.ReadTimeout):
+        text = str(error)
+        return any(s in text for s in ("NewConnectionError", "Connection refused", "Failed to establish"))
+    return False
+
+
+_clients = {}
+
+
+def get_client(base_url):
+    """Shared client per backend URL; create it from the Qt thread that will use it."""
+    client = _clients.get(base_url)
+    if client is None:
+        client = _clients[base_url] = ControlClient(base_url)
+    return client
@@ -0,0 +1,252 @@
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import numpy as np
+from sensor_frame import GAS_CHANNELS, SENSOR_FIELDS, SENSOR_INDEX, UNKNOWN_STATE, state_code
+
+# Backend SensorData export (save_csv / save_json)
+SENSOR_DTYPE = np.dtype([
+    ("ts", "<i8"), ("state", "i1"),
+    ("motor_A_duty", "<i2"), ("motor_B_duty", "<i2"),
+    ("gmxxx_ch1", "<i4"), ("gmxxx_ch2", "<i4"), ("gmxxx_ch3", "<i4"), ("gmxxx_ch4", "<i4"),
+    ("mics5524_raw", "<i4"),
+    ("co_mics", "<f4"), ("eth_mics", "<f4"), ("voc_mics", "<f4"),
+    ("no2_gm", "<f4"), ("c2h5oh_gm", "<f4"), ("voc_gm", "<f4"), ("co_gm", "<f4"),
+    ("currentLevel", "i1"),
+])
+
+# ENouseTab.save_gnuplot .dat: relative time + the seven plotted channels
+DAT_DTYPE = np.dtype([("time", "<f8")] + [(key, "<f4") for key in GAS_CHANNELS])
+
+# SimulationTab save_csv / save_json
+SIM_DTYPE = np.dtype([("time", "<f8"), ("signal1", "<f8"), ("signal2", "<f8"), ("result", "<f8")])
+SIM_CSV_HEADER = ("Time", "Signal1", "Signal2", "Result")
+
+SESSION_EXTENSIONS = (".csv", ".json", ".jsonl", ".dat", ".ens")
+
+CACHE_DIR = ".enouse_cache"
+CACHE_VERSION = 1
+
+# Firmware send interval (ms)
+NOMINAL_INTERVAL_MS = 250
+
+
+def session_kind(data):
+    """Return "sensor", "dat" or "sim" for an array returned by load_session."""
+    if data.dtype == SENSOR_DTYPE:
+        return "sensor"
+    if data.dtype == DAT_DTYPE:
+        return "dat"
+    return "sim"
+
+
+def _columns_to_struct(columns, dtype):
+    out = np.empty(len(columns[0]) if columns else 0, dtype=dtype)
+    for name, col in zip(dtype.names, columns):
+        if name == "state":
+            out[name] = [state_code(v) for v in col]
+        else:
+            out[name] = np.asarray(col, dtype=np.float64)
+    return out
+
+
+def _parse_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    return _records_to_struct(records)
+
+
+def _parse_jsonl(path):
+    # StreamRecorder / backend recordings: one object per line
+    with open(path, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return _records_to_struct(records)
+
+
+def _records_to_struct(records):
+    if records and "signal1" in records[0]:
+        dtype, keys = SIM_DTYPE, SIM_DTYPE.names
+    else:
+        dtype, keys = SENSOR_DTYPE, SENSOR_DTYPE.names
+    columns = [[r.get(k, 0) for r in records] for k in keys]
+    return _columns_to_struct(columns, dtype)
+
+
+def _parse_csv(path):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = [row for row in reader if row]
+    if tuple(header) == SIM_CSV_HEADER:
+        dtype, keys = SIM_DTYPE, SIM_CSV_HEADER
+    else:
+        dtype, keys = SENSOR_DTYPE, SENSOR_DTYPE.names
+    index = {name: i for i, name in enumerate(header)}
+    missing = [k for k in keys if k not in index]
+    if missing:
+        raise ValueError(f"{path}: missing columns {missing}")
+    columns = list(zip(*rows)) if rows else [()] * len(header)
+    return _columns_to_struct([columns[index[k]] for k in keys], dtype)
+
+
+def _parse_dat(path):
+    table = np.loadtxt(path, comments="#", ndmin=2)
+    if table.size == 0:
+        return np.empty(0, dtype=DAT_DTYPE)
+    return _columns_to_struct(list(table.T), DAT_DTYPE)
+
+
+def parse_session(path):
+    """Parse a recording (.csv, .json, .jsonl, .dat or .ens) into a structured array without touching the cache."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".ens":
+        from session_format import read_session
+        return read_session(path)
+    if ext == ".json":
+        return _parse_json(path)
+    if ext == ".jsonl":
+        return _parse_jsonl(path)
+    if ext == ".csv":
+        return _parse_csv(path)
+    if ext == ".dat":
+        return _parse_dat(path)
+    raise ValueError(f"Unsupported session format: {path}")
+
+
+def file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_paths(path):
+    path = os.path.abspath(path)
+    cache_dir = os.path.join(os.path.dirname(path), CACHE_DIR)
+    base = os.path.basename(path)
+    return cache_dir, os.path.join(cache_dir, base + ".npy"), os.path.join(cache_dir, base + ".meta.json")
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(data, cache_dir, npy_path, meta_path, meta):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = npy_path + ".tmp"
+        with open(tmp, 'wb') as f:
+            np.save(f, data)
+        os.replace(tmp, npy_path)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    except OSError:
+        # Read-only corpus: loading still works, it just is not cached
+        pass
+
+
+def load_session(path, use_cache=True, mmap=True):
+    """Load a recording as a columnar structured array.
+
+    The first load parses the text file and writes <dir>/.enouse_cache/<name>.npy.
+    Later loads reuse it while the source mtime/size match, or, if those changed,
+    while the SHA-1 of the source is still the same. With mmap=True the cached
+    array is memory-mapped read-only.
+    """
+    if not use_cache or path.lower().endswith(".ens"):
+        # .ens is already a binary columnar file, there is nothing to cache
+        return parse_session(path)
+
+    st = os.stat(path)
+    cache_dir, npy_path, meta_path = cache_paths(path)
+    meta = _read_meta(meta_path)
+    if meta and meta.get("version") == CACHE_VERSION and os.path.exists(npy_path):
+        fresh = meta.get("mtime_ns") == st.st_mtime_ns and meta.get("size") == st.st_size
+        if not fresh:
+            sha1 = file_sha1(path)
+            fresh = meta.get("sha1") == sha1
+            if fresh:
+                meta.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+                _write_cache(np.load(npy_path), cache_dir, npy_path, meta_path, meta)
+        if fresh:
+            return np.load(npy_path, mmap_mode='r' if mmap else None)
+
+    data = parse_session(path)
+    meta = {"version": CACHE_VERSION, "mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha1": file_sha1(path)}
+    _write_cache(data, cache_dir, npy_path, meta_path, meta)
+    return data
+
+
+def session_frames(data):
+    """Convert a sensor or .dat session into an (n, len(SENSOR_FIELDS)) float64 array.
+
+    .dat exports only carry relative time and the gas channels; ts is rebuilt
+    from the time column and the remaining fields are left at zero.
+    """
+    kind = session_kind(data)
+    if kind == "sim":
+        raise ValueError("simulation recordings have no SensorData fields")
+    out = np.zeros((len(data), len(SENSOR_FIELDS)), dtype=np.float64)
+    if kind == "sensor":
+        for j, name in enumerate(SENSOR_FIELDS):
+            out[:, j] = data[name]
+    else:
+        out[:, SENSOR_INDEX["ts"]] = np.round(data["time"] * 1000.0)
+        out[:, SENSOR_INDEX["state"]] = UNKNOWN_STATE
+        for key in GAS_CHANNELS:
+            out[:, SENSOR_INDEX[key]] = data[key]
+    return out
+
+
+def session_clock(ts_ms, nominal_ms=NOMINAL_INTERVAL_MS):
+    """Seconds since the first sample, following device ts.
+
+    Recordings spliced from several runs restart ts; a backwards step is
+    replaced by one nominal interval so the clock stays monotonic.
+    """
+    ts_ms = np.asarray(ts_ms, dtype=np.float64)
+    if not len(ts_ms):
+        return ts_ms
+    dt = np.diff(ts_ms, prepend=ts_ms[0])
+    dt[dt < 0] = nominal_ms
+    return np.cumsum(dt) / 1000.0
+
+
+def label_from_path(path):
+    """Class label from a recording name, e.g. Teh_Hijau_2_2Motor.csv -> teh_hijau."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r"(_\d+)?(_2motor)?$", "", stem, flags=re.IGNORECASE).lower()
+
+
+def find_sessions(directory, extensions=SESSION_EXTENSIONS):
+    """Sorted list of recording files directly under directory."""
+    paths = []
+    for name in sorted(os.listdir(directory)):
+        if os.path.splitext(name)[1].lower() in extensions:
+            paths.append(os.path.join(directory, name))
+    return paths
+
+
+if __name__ == "__main__":
+    # python dataset.py [dir-or-files...]  -- load and report parse vs cached timings
+    targets = sys.argv[1:] or [os.path.dirname(os.path.abspath(__file__))]
+    paths = []
+    for target in targets:
+        paths.extend(find_sessions(target) if os.path.isdir(target) else [target])
+    for path in paths:
+        t0 = time.perf_counter()
+        data = load_session(path)
+        t1 = time.perf_counter()
+        load_session(path)
+        t2 = time.perf_counter()
+        print(f"{os.path.basename(path):32s} {session_kind(data):6s} {len(data):7d} rows  "
+              f"first {1000 * (t1 - t0):8.2f} ms  cached {1000 * (t2 - t1):6.2f} ms")
@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+# Headless by default; set QT_QPA_PLATFORM yourself to watch the plots
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QApplication
+from dataset import load_session, session_frames
+from mock_backend import MockSensorServer
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else 0.0
+
+
+def drain(app, tab, quiet_s=0.2, timeout_s=2.0):
+    """Process events until no device has received anything for quiet_s; returns samples per device."""
+    counts = {d: v.samples for d, v in tab.devices.items()}
+    deadline = time.perf_counter() + timeout_s
+    quiet_since = time.perf_counter()
+    while time.perf_counter() - quiet_since < quiet_s and time.perf_counter() < deadline:
+        app.processEvents()
+        tab.scheduler.tick()
+        time.sleep(0.005)
+        now = {d: v.samples for d, v in tab.devices.items()}
+        if now != counts:
+            counts, quiet_since = now, time.perf_counter()
+    return counts
+
+
+def run_once(app, frames, n_devices, rate, frame_rate, seconds):
+    from main import DevicesTab
+
+    server = MockSensorServer(frames, rate, frame_rate).start()
+    tab = DevicesTab()
+    tab.resize(1400, 900)
+    tab.show()
+
+    render_ms = []
+    render = tab.render_batch
+
+    def timed_render(items):
+        t0 = time.perf_counter()
+        render(items)
+        render_ms.append((time.perf_counter() - t0) * 1000)
+    tab.scheduler.render_fn = timed_render
+
+    # GUI responsiveness: how late a 10 ms timer fires while ingesting
+    lateness_ms = []
+    probe = QTimer()
+    last = [time.perf_counter()]
+
+    def on_probe():
+        now = time.perf_counter()
+        lateness_ms.append(max((now - last[0]) * 1000 - 10, 0))
+        last[0] = now
+    probe.timeout.connect(on_probe)
+
+    for i in range(n_devices):
+        tab.add_device(f"dev{i}", f"{server.url}?format=binary&device=dev{i}")
+
+    # Let every socket connect before measuring
+    deadline = time.perf_counter() + 5
+    while time.perf_counter() < deadline and not all(v.connected for v in tab.devices.values()):
+        app.processEvents()
+        time.sleep(0.01)
+
+    # Hold the senders and drain what is in flight, so both baselines count
+    # the same samples; a frame still queued would count as received but not sent
+    server.paused = True
+    base_received = drain(app, tab)
+    with server.lock:
+        base_sent = dict(server.sent)
+    server.paused = False
+    last[0] = time.perf_counter()
+    probe.start(10)
+    cpu0 = time.process_time()
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        app.processEvents()
+        time.sleep(0.001)
+    wall = time.perf_counter() - t0
+    cpu = time.process_time() - cpu0
+    probe.stop()
+
+    # Stop the senders, drain what is still in flight, then count both ends
+    server.running = False
+    final_received = drain(app, tab)
+    with server.lock:
+        sent = sum(server.sent.get(d, 0) - base_sent.get(d, 0) for d in tab.devices)
+    received = sum(final_received[d] - base_received[d] for d in tab.devices)
+    stats = tab.scheduler.stats()
+
+    tab.stop()
+    tab.close()
+    server.stop()
+
+    return {
+        "devices": n_devices,
+        "rate_hz": rate,
+        "seconds": round(wall, 3),
+        "sent": sent,
+        "received": received,
+        "throughput_sps": round(received / wall, 1),
+        "render_ms_p50": round(percentile(render_ms, 50), 3),
+        "render_ms_p95": round(percentile(render_ms, 95), 3),
+        "render_ms_max": round(max(render_ms, default=0.0), 3),
+        "frames": len(render_ms),
+        "dropped_frames": stats["dropped_frames"],
+        "timer_late_ms_p95": round(percentile(lateness_ms, 95), 3),
+        "timer_late_ms_max": round(max(lateness_ms, default=0.0), 3),
+        "cpu_pct": round(100 * cpu / wall, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark DevicesTab + DeviceHub against a local mock backend")
+    parser.add_argument("--devices", default="1,2,4,8,16", help="comma-separated device counts")
+    parser.add_argument("--rate", type=float, default=50.0, help="samples per second per device")
+    parser.add_argument("--frame-rate", type=float, default=20.0, help="WebSocket frames per second per device")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--session", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                          "Teh_Hijau_1_2Motor.csv"))
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    frames = session_frames(load_session(args.session))
+    results = []
+    print(f"{'dev':>4s} {'recv/sent':>13s} {'samples/s':>10s} {'render p50/p95/max ms':>22s} "
+          f"{'late p95/max ms':>16s} {'drop':>5s} {'cpu%':>6s}")
+    for n in (int(x) for x in args.devices.split(",")):
+        r = run_once(app, frames, n, args.rate, args.frame_rate, args.seconds)
+        results.append(r)
+        print(f"{n:4d} {r['received']:6d}/{r['sent']:<6d} {r['throughput_sps']:10.1f} "
+              f"{r['render_ms_p50']:7.2f}/{r['render_ms_p95']:6.2f}/{r['render_ms_max']:7.2f} "
+              f"{r['timer_late_ms_p95']:7.2f}/{r['timer_late_ms_max']:7.2f} {r['dropped_frames']:5d} {r['cpu_pct']:6.1f}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
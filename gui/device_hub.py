@@ -0,0 +1,165 @@
+import queue
+import selectors
+import ssl
+import threading
+import time
+import websocket
+from PySide6.QtCore import QThread, Signal
+from sensor_frame import SENSOR_FIELDS, decode_message
+
+RECONNECT_MIN_S = 1.0
+RECONNECT_MAX_S = 10.0
+CONNECT_TIMEOUT_S = 2.0
+
+
+class DeviceHub(QThread):
+    """One network thread for any number of device WebSockets.
+
+    Sockets are multiplexed with a selector instead of running one
+    WebSocketWorker (and QThread) per connection. Connecting happens on
+    short-lived helper threads and sockets are read non-blocking, so an
+    unreachable device or a half-received frame never stalls the others.
+    Every decoded frame is emitted as batch_received(device_id,
+    (n, len(fields)) array). Devices can be added and removed while
+    running; dropped connections are retried with exponential backoff.
+    """
+    batch_received = Signal(str, object)
+    status_changed = Signal(str, bool)
+    log_received = Signal(str)
+
+    def __init__(self, fields=SENSOR_FIELDS, poll_s=0.05, max_frames=64):
+        super().__init__()
+        self.fields = fields
+        self.poll_s = poll_s
+        # Frames read from one socket per wakeup, so a flooding device cannot starve the rest
+        self.max_frames = max_frames
+        self.commands = queue.Queue()
+        self.running = True
+
+    def add_device(self, device_id, url):
+        self.commands.put(("add", device_id, url))
+
+    def remove_device(self, device_id):
+        self.commands.put(("remove", device_id, None))
+
+    def stop(self):
+        self.running = False
+
+    def _connect(self, device_id, url, token):
+        # Helper thread: the handshake may block for the whole timeout
+        try:
+            ws = websocket.create_connection(url, timeout=CONNECT_TIMEOUT_S)
+            ws.sock.setblocking(False)
+            self.commands.put(("connected", device_id, (token, ws)))
+        except Exception as e:
+            self.commands.put(("failed", device_id, (token, str(e) or type(e).__name__)))
+
+    def run(self):
+        sel = selectors.DefaultSelector()
+        # device_id -> {"url", "ws", "connecting", "retry_at", "backoff"}
+        devices = {}
+
+        def close(ws):
+            try:
+                ws.close(timeout=0.5)
+            except Exception:
+                pass
+
+        def retry_later(dev):
+            dev["retry_at"] = time.monotonic() + dev["backoff"]
+            dev["backoff"] = min(dev["backoff"] * 2, RECONNECT_MAX_S)
+
+        def disconnect(device_id, reason=None):
+            dev = devices[device_id]
+            dev["connecting"] = None
+            if dev["ws"] is None:
+                return
+            try:
+                sel.unregister(dev["ws"].sock)
+            except (KeyError, ValueError):
+                pass
+            close(dev["ws"])
+            dev["ws"] = None
+            retry_later(dev)
+            self.status_changed.emit(device_id, False)
+            if reason:
+                self.log_received.emit(f"[WARN] Device {device_id} disconnected: {reason}")
+
+        def handle(cmd, device_id, arg):
+            dev = devices.get(device_id)
+            if cmd in ("connected", "failed"):
+                token, result = arg
+                if dev is None or dev["connecting"] is not token:
+                    # Removed or re-added while connecting
+                    if cmd == "connected":
+                        close(result)
+                    return
+                dev["connecting"] = None
+                if cmd == "failed":
+                    if dev["backoff"] == RECONNECT_MIN_S:
+                        self.log_received.emit(f"[WARN] Device {device_id} unreachable: {result}")
+                    retry_later(dev)
+                    return
+                dev["ws"] = result
+                dev["backoff"] = RECONNECT_MIN_S
+                sel.register(result.sock, selectors.EVENT_READ, device_id)
+                self.status_changed.emit(device_id, True)
+                return
+            if dev is not None:
+                disconnect(device_id)
+                del devices[device_id]
+            if cmd == "add":
+                devices[device_id] = {"url": arg, "ws": None, "connecting": None, "retry_at": 0.0,
+                                      "backoff": RECONNECT_MIN_S}
+
+        def read(device_id, ws):
+            """Returns True if max_frames were read and more may be waiting."""
+            # Only whole frames come out of recv(); a partial one stays buffered in ws until more arrives
+            for _ in range(self.max_frames):
+                try:
+                    message = ws.recv()
+                except (BlockingIOError, ssl.SSLWantReadError):
+                    return False
+                except Exception as e:
+                    disconnect(device_id, str(e) or type(e).__name__)
+                    return False
+                if not message:
+                    continue
+                try:
+                    batch = decode_message(message, self.fields)
+                except Exception:
+                    continue
+                if len(batch):
+                    self.batch_received.emit(device_id, batch)
+            return True
+
+        # Devices cut off by max_frames: read again without waiting (TLS may
+        # hold decrypted data the selector cannot see)
+        backlog = set()
+        while self.running:
+            while True:
+                try:
+                    handle(*self.commands.get_nowait())
+                except queue.Empty:
+                    break
+
+            now = time.monotonic()
+            for device_id, dev in devices.items():
+                if dev["ws"] is None and dev["connecting"] is None and now >= dev["retry_at"]:
+                    dev["connecting"] = token = object()
+                    threading.Thread(target=self._connect, args=(device_id, dev["url"], token), daemon=True).start()
+
+            if not sel.get_map():
+                self.msleep(int(self.poll_s * 1000))
+                continue
+
+            ready = backlog | {key.data for key, _ in sel.select(0 if backlog else self.poll_s)}
+            backlog = set()
+            for device_id in ready:
+                dev = devices.get(device_id)
+                if dev is not None and dev["ws"] is not None and read(device_id, dev["ws"]):
+                    backlog.add(device_id)
+
+        for device_id in list(devices):
+            disconnect(device_id)
+        sel.close()
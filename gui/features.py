@@ -0,0 +1,142 @@
+import argparse
+import csv
+import os
+import warnings
+import numpy as np
+from dataset import find_sessions, label_from_path, load_session, session_clock, session_kind
+from sensor_frame import GAS_CHANNELS, STATE_CODES
+
+# FSM phases that carry a response; IDLE/DONE segments are ignored
+PHASES = ("PRE_COND", "RAMP_UP", "HOLD", "PURGE", "RECOVERY")
+PHASE_FEATURES = ("level", "peak", "rise_time", "auc", "slope", "recovery")
+
+# Bump when feature definitions change so cached batch outputs are recomputed
+FEATURE_VERSION = 1
+
+
+def feature_names(channels=GAS_CHANNELS):
+    names = [f"baseline.{ch}" for ch in channels]
+    for phase in PHASES:
+        for feat in PHASE_FEATURES:
+            names.extend(f"{phase}.{feat}.{ch}" for ch in channels)
+    return names
+
+
+def phase_segments(states):
+    """Split a state column into runs: returns (starts, ends, state codes)."""
+    states = np.asarray(states)
+    if not len(states):
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, empty
+    change = np.flatnonzero(states[1:] != states[:-1]) + 1
+    starts = np.concatenate(([0], change))
+    ends = np.concatenate((change, [len(states)]))
+    return starts, ends, states[starts]
+
+
+def _safe_div(num, den):
+    out = np.full(np.broadcast(num, den).shape, np.nan)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+def segment_features(t, x, starts, ends, baseline):
+    """Per-segment features, each of shape (n_segments, n_channels).
+
+    t is time in seconds, x has shape (n, n_channels). Every reduction is a
+    reduceat/cumsum over the whole session, so the cost does not depend on
+    the number of segments.
+    """
+    lengths = (ends - starts)[:, None]
+    rel = x - baseline
+
+    level = np.add.reduceat(x, starts, axis=0) / lengths
+    seg_max = np.maximum.reduceat(x, starts, axis=0)
+    peak = seg_max - baseline
+
+    # Rise time: first sample reaching 90% of the way from the segment start to its max
+    x0 = x[starts]
+    threshold = np.repeat(x0 + 0.9 * (seg_max - x0), ends - starts, axis=0)
+    idx = np.where(x >= threshold, np.arange(len(x))[:, None], len(x) - 1)
+    first = np.minimum.reduceat(idx, starts, axis=0)
+    rise_time = t[first] - t[starts][:, None]
+
+    # Trapezoid area of the baseline-corrected response, only within each segment
+    inc = 0.5 * (rel[1:] + rel[:-1]) * np.diff(t)[:, None]
+    cum = np.concatenate((np.zeros((1, x.shape[1])), np.cumsum(inc, axis=0)))
+    auc = cum[ends - 1] - cum[starts]
+
+    # Least-squares slope, time centred per segment for precision
+    tc = t - np.repeat(t[starts], ends - starts)
+    s_t = np.add.reduceat(tc, starts)[:, None]
+    s_tt = np.add.reduceat(tc * tc, starts)[:, None]
+    s_y = np.add.reduceat(x, starts, axis=0)
+    s_ty = np.add.reduceat(tc[:, None] * x, starts, axis=0)
+    slope = _safe_div(lengths * s_ty - s_t * s_y, lengths * s_tt - s_t * s_t)
+
+    # Fraction of the excursion above baseline recovered by the end of the segment
+    recovery = _safe_div(x0 - x[ends - 1], x0 - baseline)
+
+    return np.stack((level, peak, rise_time, auc, slope, recovery), axis=1)
+
+
+def session_features(data, channels=GAS_CHANNELS):
+    """Feature vector (see feature_names) for one sensor session array."""
+    n_ch = len(channels)
+    out = np.full(n_ch + len(PHASES) * len(PHASE_FEATURES) * n_ch, np.nan)
+    if not len(data):
+        return out
+
+    states = np.asarray(data["state"])
+    t = session_clock(data["ts"])
+    x = np.column_stack([np.asarray(data[ch], dtype=np.float64) for ch in channels])
+
+    pre = states == STATE_CODES["PRE_COND"]
+    baseline = x[pre].mean(axis=0) if pre.any() else x[0]
+    out[:n_ch] = baseline
+
+    starts, ends, codes = phase_segments(states)
+    feats = segment_features(t, x, starts, ends, baseline)
+
+    # Average the repeated cycles of each phase (one per motor level)
+    block = out[n_ch:].reshape(len(PHASES), len(PHASE_FEATURES), n_ch)
+    for p, phase in enumerate(PHASES):
+        mask = codes == STATE_CODES[phase]
+        if mask.any():
+            with warnings.catch_warnings():
+                # All-NaN columns (e.g. recovery with a flat start) stay NaN
+                warnings.simplefilter("ignore", RuntimeWarning)
+                block[p] = np.nanmean(feats[mask], axis=0)
+    return out
+
+
+def feature_matrix(paths, channels=GAS_CHANNELS):
+    """Load and featurize sessions: returns (X, labels, names)."""
+    X = np.vstack([session_features(load_session(p), channels) for p in paths]) if paths else \
+        np.empty((0, len(feature_names(channels))))
+    labels = [label_from_path(p) for p in paths]
+    return X, labels, feature_names(channels)
+
+
+def write_feature_csv(path, X, labels, names, sources):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["file", "label"] + names)
+        for src, label, row in zip(sources, labels, X):
+            writer.writerow([os.path.basename(src), label] + [f"{v:.6g}" for v in row])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-phase e-nose features for recorded sessions")
+    parser.add_argument("inputs", nargs="*", help="session files or directories (default: gui/*.csv)")
+    parser.add_argument("-o", "--output", default="features.csv")
+    args = parser.parse_args()
+
+    paths = []
+    for target in args.inputs or [os.path.dirname(os.path.abspath(__file__))]:
+        paths.extend(find_sessions(target, (".csv",)) if os.path.isdir(target) else [target])
+    paths = [p for p in paths if session_kind(load_session(p)) == "sensor"]
+
+    X, labels, names = feature_matrix(paths)
+    write_feature_csv(args.output, X, labels, names, paths)
+    print(f"Wrote {X.shape[0]} sessions x {X.shape[1]} features to {args.output}")
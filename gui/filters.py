@@ -0,0 +1,285 @@
+import argparse
+import os
+import numpy as np
+from sensor_frame import GAS_CHANNELS
+
+# Streaming filters for (n, n_channels) sample blocks. Every filter keeps its
+# own per-channel state between process() calls and initializes it from the
+# first sample it sees, so a chunked stream gives the same output as one call
+# over the whole session.
+
+
+class LinearFilter:
+    """IIR/FIR filter b/a evaluated blockwise in state-space form.
+
+    For a block of L samples, y = O·s + T·x and s' = A^L·s + K·x, where O, T
+    and K are precomputed from the transposed direct form II realization.
+    Each block is therefore a few small matrix products across all channels
+    instead of a per-sample loop.
+    """
+
+    def __init__(self, b, a, block=64):
+        b = np.atleast_1d(np.asarray(b, dtype=np.float64))
+        a = np.atleast_1d(np.asarray(a, dtype=np.float64))
+        b, a = b / a[0], a / a[0]
+        order = max(len(a), len(b)) - 1
+        b = np.pad(b, (0, order + 1 - len(b)))
+        a = np.pad(a, (0, order + 1 - len(a)))
+        self.b, self.a = b, a
+        self.order = order
+        self.block = block
+
+        A = np.zeros((order, order))
+        A[:, 0] = -a[1:]
+        A[np.arange(order - 1), np.arange(1, order)] = 1.0
+        B = b[1:] - a[1:] * b[0]
+        C = np.zeros(order)
+        if order:
+            C[0] = 1.0
+
+        powers = [np.eye(order)]
+        for _ in range(block):
+            powers.append(A @ powers[-1])
+        self.powers = powers
+        self.obs = np.array([C @ powers[k] for k in range(block)]).reshape(block, order)
+        h = np.concatenate(([b[0]], [C @ powers[k] @ B for k in range(block - 1)]))
+        k = np.arange(block)
+        lag = k[:, None] - k[None, :]
+        self.toeplitz = np.where(lag >= 0, h[np.clip(lag, 0, None)], 0.0)
+        self.ctrl = np.array([powers[block - 1 - j] @ B for j in range(block)]).reshape(block, order).T
+        # State reached after a long run of constant unit input
+        self.steady = np.linalg.solve(np.eye(order) - A, B) if order else np.zeros(0)
+        self.state = None
+
+    def reset(self):
+        self.state = None
+
+    def process(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        if not len(x):
+            return x.copy()
+        if self.state is None:
+            self.state = np.outer(self.steady, x[0])
+        y = np.empty_like(x)
+        L = self.block
+        for i in range(0, len(x), L):
+            xb = x[i:i + L]
+            m = len(xb)
+            y[i:i + m] = self.obs[:m] @ self.state + self.toeplitz[:m, :m] @ xb
+            self.state = self.powers[m] @ self.state + self.ctrl[:, L - m:] @ xb
+        return y
+
+
+def butterworth(order, cutoff, sample_rate, kind="lowpass"):
+    """Digital Butterworth (b, a) by bilinear transform with frequency prewarping."""
+    nyquist = sample_rate / 2
+    if not 0 < cutoff < nyquist:
+        raise ValueError(f"Cutoff {cutoff} Hz must be between 0 and Nyquist ({nyquist} Hz)")
+    fs2 = 2.0 * sample_rate
+    warped = fs2 * np.tan(np.pi * cutoff / sample_rate)
+    proto = np.exp(1j * np.pi * (2 * np.arange(order) + order + 1) / (2 * order))
+    if kind == "lowpass":
+        poles, zero, ref = warped * proto, -1.0, 1.0
+    elif kind == "highpass":
+        poles, zero, ref = warped / proto, 1.0, -1.0
+    else:
+        raise ValueError(f"Unknown filter kind: {kind}")
+    z_poles = (fs2 + poles) / (fs2 - poles)
+    b = np.real(np.poly(np.full(order, zero)))
+    a = np.real(np.poly(z_poles))
+    # Unit gain at DC (lowpass) or Nyquist (highpass)
+    powers = ref ** np.arange(order + 1)
+    b *= np.sum(a * powers) / np.sum(b * powers)
+    return b, a
+
+
+class Butterworth(LinearFilter):
+    def __init__(self, order, cutoff, sample_rate, kind="lowpass"):
+        super().__init__(*butterworth(order, cutoff, sample_rate, kind))
+
+
+class _WindowFilter:
+    """Base for filters over the last `width` samples; keeps width - 1 rows of history."""
+
+    def __init__(self, width):
+        if width < 1:
+            raise ValueError("Window width must be at least 1")
+        self.width = int(width)
+        self.tail = None
+
+    def reset(self):
+        self.tail = None
+
+    def windows(self, x):
+        # (n, n_channels, width) views, oldest sample first in each window
+        if self.tail is None:
+            self.tail = np.repeat(x[:1], self.width - 1, axis=0)
+        data = np.concatenate((self.tail, x))
+        self.tail = data[len(data) - (self.width - 1):]
+        return np.lib.stride_tricks.sliding_window_view(data, self.width, axis=0)
+
+    def process(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        if not len(x):
+            return x.copy()
+        return self.reduce(self.windows(x))
+
+
+class MovingMedian(_WindowFilter):
+    """Causal running median; removes spikes without smearing steps."""
+
+    def reduce(self, windows):
+        return np.median(windows, axis=-1)
+
+
+class FIRFilter(_WindowFilter):
+    """Direct-form FIR, taps[0] applied to the newest sample."""
+
+    def __init__(self, taps):
+        super().__init__(len(taps))
+        self.taps = np.asarray(taps, dtype=np.float64)
+
+    def reduce(self, windows):
+        return windows @ self.taps[::-1]
+
+
+def savgol_taps(width, order):
+    """Savitzky–Golay smoothing taps evaluated at the newest sample of the window (no lag)."""
+    if order >= width:
+        raise ValueError("Polynomial order must be less than the window width")
+    t = -np.arange(width, dtype=np.float64)
+    vander = np.vander(t, order + 1, increasing=True)
+    return np.linalg.pinv(vander)[0]
+
+
+class SavitzkyGolay(FIRFilter):
+    def __init__(self, width, order):
+        super().__init__(savgol_taps(width, order))
+
+
+class BaselineTracker:
+    """Subtracts an exponentially tracked baseline from each channel.
+
+    The baseline follows the signal with time constant tau seconds. With
+    fall_tau set, it follows drops below the baseline faster, so after a purge
+    it settles back onto the clean-air level instead of lagging above it.
+    """
+
+    def __init__(self, tau, sample_rate, fall_tau=None):
+        self.alpha = 1 - np.exp(-1.0 / (tau * sample_rate))
+        self.fall_alpha = None if fall_tau is None else 1 - np.exp(-1.0 / (fall_tau * sample_rate))
+        self.ema = LinearFilter([self.alpha], [1.0, self.alpha - 1.0]) if fall_tau is None else None
+        # Blocks short enough that the decay product over one block stays far from underflow
+        self.block = int(np.clip(300 * min(tau, fall_tau or tau) * sample_rate, 1, 64))
+        self.baseline = None
+
+    def reset(self):
+        self.baseline = None
+        if self.ema is not None:
+            self.ema.reset()
+
+    def _track(self, x, base):
+        """Baselines before each row of x and after the last, for one block.
+
+        With the gain of every sample fixed, b[n+1] = (1 - g[n])·b[n] + g[n]·x[n]
+        is linear and has a closed form through cumulative products. The
+        gains depend on the baseline, so they are guessed, the baseline is
+        recomputed and the gains re-derived until they agree; each pass
+        settles at least the first mismatching sample, usually all of them.
+        """
+        fall = np.less(x, base)
+        for _ in range(len(x) + 1):
+            gain = np.where(fall, self.fall_alpha, self.alpha)
+            decay = np.cumprod(np.concatenate((np.ones((1,) + x.shape[1:]), 1 - gain)), axis=0)
+            b = decay * (base + np.concatenate((np.zeros((1,) + x.shape[1:]),
+                                                np.cumsum(gain * x / decay[1:], axis=0))))
+            guess = x < b[:-1]
+            if np.array_equal(guess, fall):
+                break
+            fall = guess
+        return b
+
+    def process(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        if not len(x):
+            return x.copy()
+        if self.ema is not None:
+            # y[n] = x[n] - b[n-1]: the EMA output delayed by one sample
+            b = self.ema.process(x)
+            prev = b[0] if self.baseline is None else self.baseline
+            self.baseline = b[-1].copy()
+            return x - np.concatenate((prev[None], b[:-1]))
+
+        if self.baseline is None:
+            self.baseline = x[0].copy()
+        out = np.empty_like(x)
+        for i in range(0, len(x), self.block):
+            xb = x[i:i + self.block]
+            b = self._track(xb, self.baseline)
+            out[i:i + len(xb)] = xb - b[:-1]
+            self.baseline = b[-1]
+        return out
+
+
+class FilterChain:
+    """Filters applied in order; an empty chain passes samples through."""
+
+    def __init__(self, filters=()):
+        self.filters = list(filters)
+
+    def reset(self):
+        for f in self.filters:
+            f.reset()
+
+    def process(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        for f in self.filters:
+            x = f.process(x)
+        return x
+
+    def run(self, x):
+        """Offline: filter a whole recording from a fresh state."""
+        self.reset()
+        return self.process(x)
+
+
+# UI presets: name -> factory(sample_rate) returning a FilterChain
+FILTER_PRESETS = {
+    "Raw": lambda fs: FilterChain(),
+    "Baseline (EMA)": lambda fs: FilterChain([BaselineTracker(60.0, fs, fall_tau=5.0)]),
+    "Low-pass 0.5 Hz": lambda fs: FilterChain([Butterworth(2, 0.5, fs)]),
+    "Median 5": lambda fs: FilterChain([MovingMedian(5)]),
+    "Savitzky–Golay 11/2": lambda fs: FilterChain([SavitzkyGolay(11, 2)]),
+    "Denoise + baseline": lambda fs: FilterChain([MovingMedian(5), Butterworth(2, 0.5, fs),
+                                                  BaselineTracker(60.0, fs, fall_tau=5.0)]),
+}
+DEFAULT_PRESET = "Baseline (EMA)"
+
+
+def filter_session(data, chain, channels=GAS_CHANNELS):
+    """Copy of a sensor/dat session array with the chain applied to the gas channels."""
+    out = data.copy()
+    x = np.column_stack([np.asarray(data[ch], dtype=np.float64) for ch in channels])
+    y = chain.run(x)
+    for i, ch in enumerate(channels):
+        out[ch] = y[:, i]
+    return out
+
+
+if __name__ == "__main__":
+    from dataset import NOMINAL_INTERVAL_MS, load_session
+    from session_format import export_session
+
+    parser = argparse.ArgumentParser(description="Apply a filter preset to recorded sessions")
+    parser.add_argument("inputs", nargs="+")
+    parser.add_argument("-p", "--preset", default=DEFAULT_PRESET, choices=list(FILTER_PRESETS))
+    parser.add_argument("-o", "--output-dir", default=".")
+    parser.add_argument("--ext", default=".csv", help="output format (.csv, .json, .jsonl, .dat, .ens)")
+    args = parser.parse_args()
+
+    chain = FILTER_PRESETS[args.preset](1000 / NOMINAL_INTERVAL_MS)
+    for path in args.inputs:
+        data = filter_session(load_session(path), chain)
+        out = os.path.join(args.output_dir, os.path.splitext(os.path.basename(path))[0] + "_filtered" + args.ext)
+        export_session(data, out)
+        print(f"{path}: {len(data)} samples -> {out}")
@@ -0,0 +1,279 @@
+import argparse
+import os
+import time
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+from dataset import load_session, session_clock, session_kind
+from sensor_frame import GAS_CHANNELS, SENSOR_CHANNELS
+
+# .dat layout written by ENouseTab.save_gnuplot: time + the seven gas channels
+DAT_HEADER = "# " + "_".join(["Time"] + [short for _, _, short, _ in SENSOR_CHANNELS]).replace(" ", "_") + "\n"
+DAT_FORMAT = "%.4f"
+CHUNK_ROWS = 16384
+
+# One color per session in overlay plots
+OVERLAY_COLORS = ("#4FC3F7", "#FF5252", "#69F0AE", "#FFEB3B", "#E040FB", "#FFAB40", "#FFFFFF",
+                  "#8D6E63", "#26A69A", "#7986CB")
+
+
+def format_block(table, fmt=DAT_FORMAT):
+    """Format an (n, m) float table as text lines with one % operation per block.
+
+    Equivalent to np.savetxt(f, table, fmt) but without its per-row Python loop.
+    """
+    n, m = table.shape
+    if not n:
+        return ""
+    row = " ".join([fmt] * m) + "\n"
+    return (row * n) % tuple(table.ravel().tolist())
+
+
+def session_table(data):
+    """(n, 8) float table of relative time (s) + gas channels for a sensor or .dat session."""
+    kind = session_kind(data)
+    if kind == "sim":
+        raise ValueError("GNUplot export needs sensor channels; this is a simulation recording")
+    t = data["time"] if kind == "dat" else session_clock(data["ts"])
+    table = np.empty((len(data), 1 + len(GAS_CHANNELS)))
+    table[:, 0] = t
+    for j, key in enumerate(GAS_CHANNELS):
+        table[:, j + 1] = data[key]
+    return table
+
+
+def write_dat(path, table, header=DAT_HEADER, fmt=DAT_FORMAT, chunk_rows=CHUNK_ROWS, progress=None, cancelled=None):
+    """Write table to path in chunks; progress(rows_done, rows_total) after each chunk.
+
+    Returns the number of rows written, or None when cancelled() turned true
+    (the partial file is removed).
+    """
+    total = len(table)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(header)
+        for start in range(0, total, chunk_rows):
+            if cancelled is not None and cancelled():
+                break
+            f.write(format_block(table[start:start + chunk_rows], fmt))
+            if progress is not None:
+                progress(min(start + chunk_rows, total), total)
+        else:
+            return total
+    os.remove(path)
+    return None
+
+
+def _quote(text):
+    return text.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def gp_script(dat_file, title):
+    """Plot every channel of one .dat file (the classic save_gnuplot layout)."""
+    name = _quote(os.path.basename(dat_file))
+    plots = [f'"{name}" using 1:{i + 2} with lines title "{_quote(short)}" noenhanced lc rgb "{color}" lw 2'
+             for i, (_, _, short, color) in enumerate(SENSOR_CHANNELS)]
+    plot_cmd = ", \\\n     ".join(plots)
+    return f"""
+set title "E-Nouse Data: {_quote(title)}" noenhanced
+set xlabel "Time (s)"
+set ylabel "Sensor Value"
+set grid
+set key outside
+set term wxt size 1000,600 persist
+plot {plot_cmd}
+pause mouse close
+"""
+
+
+def overlay_script(dat_files, titles=None, columns=2, base_dir=None):
+    """Overlay several sessions: one panel per channel, one colored curve per session.
+
+    Data files are referenced relative to base_dir (where the script will be
+    saved), or by bare name when base_dir is None.
+    """
+    titles = titles or [os.path.splitext(os.path.basename(p))[0] for p in dat_files]
+    names = [os.path.relpath(p, base_dir).replace(os.sep, "/") if base_dir else os.path.basename(p)
+             for p in dat_files]
+    rows = -(-len(SENSOR_CHANNELS) // columns)
+    lines = [
+        "",
+        'set xlabel "Time (s)"',
+        "set grid",
+        'set key top right font ",8"',
+        f"set term wxt size {600 * columns},{300 * rows} persist",
+        f'set multiplot layout {rows},{columns} title "E-Nouse overlay: {len(dat_files)} sessions"',
+    ]
+    for i, (_, label, _, _) in enumerate(SENSOR_CHANNELS):
+        lines.append(f'set title "{_quote(label.strip())}" noenhanced')
+        plots = [f'"{_quote(name)}" using 1:{i + 2} with lines title "{_quote(t)}" noenhanced '
+                 f'lc rgb "{OVERLAY_COLORS[k % len(OVERLAY_COLORS)]}" lw 1.5'
+                 for k, (name, t) in enumerate(zip(names, titles))]
+        lines.append("plot " + ", \\\n     ".join(plots))
+    lines += ["unset multiplot", "pause mouse close", ""]
+    return "\n".join(lines)
+
+
+def write_gp(path, script):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(script)
+
+
+def output_paths(sources, out_dir=None):
+    """.dat path for each recording: <stem>_<ext>.dat in out_dir (default: next to the source).
+
+    Keeping the extension separates X.csv from X.json, and a recording never
+    maps onto itself; names still repeated in one batch get _2, _3, ...
+    """
+    paths, taken = [], set()
+    for src in sources:
+        stem, ext = os.path.splitext(os.path.basename(src))
+        base = os.path.join(out_dir or os.path.dirname(os.path.abspath(src)), f"{stem}_{ext.lstrip('.').lower()}")
+        path, n = base + ".dat", 1
+        while os.path.abspath(path) in taken:
+            n += 1
+            path = f"{base}_{n}.dat"
+        taken.add(os.path.abspath(path))
+        paths.append(path)
+    return paths
+
+
+def existing_outputs(dat_paths, overlay_path=None):
+    """Files among the .dat/.gp pairs (and the overlay) that an export would overwrite."""
+    targets = [p for d in dat_paths for p in (d, os.path.splitext(d)[0] + ".gp")]
+    return [p for p in targets + ([overlay_path] if overlay_path else []) if os.path.exists(p)]
+
+
+def export_session_file(src, out_dir=None, progress=None, cancelled=None, dat_path=None, force=False):
+    """Export one recording (any format load_session reads) to a .dat + .gp pair.
+
+    dat_path defaults to output_paths([src], out_dir)[0]. Existing files
+    raise FileExistsError unless force is set.
+    Returns (dat_path, gp_path, rows), or None when cancelled.
+    """
+    base = os.path.splitext(os.path.basename(src))[0]
+    dat_path = dat_path or output_paths([src], out_dir)[0]
+    gp_path = os.path.splitext(dat_path)[0] + ".gp"
+    existing = existing_outputs([dat_path])
+    if existing and not force:
+        raise FileExistsError(f"{', '.join(existing)} already exists (use force to overwrite)")
+    table = session_table(load_session(src))
+    rows = write_dat(dat_path, table, progress=progress, cancelled=cancelled)
+    if rows is None:
+        return None
+    write_gp(gp_path, gp_script(dat_path, base))
+    return dat_path, gp_path, rows
+
+
+class ExportWorker(QThread):
+    """Writes GNUplot exports off the UI thread.
+
+    jobs is a list of (source, dat_path): source is a recording path or an
+    (n, 8) table (e.g. the live window). Each job gets a .gp next to its
+    .dat; with overlay_path set, a multi-session overlay script is written
+    there too. progress(rows_done, rows_total) covers all jobs together.
+    """
+    progress = Signal(int, int)
+    log_received = Signal(str)
+    export_finished = Signal(object)
+
+    def __init__(self, jobs, overlay_path=None):
+        super().__init__()
+        self.jobs = jobs
+        self.overlay_path = overlay_path
+        self.running = True
+
+    def cancel(self):
+        self.running = False
+
+    def run(self):
+        outputs = []
+        try:
+            jobs = []
+            for source, dat_path in self.jobs:
+                if isinstance(source, np.ndarray):
+                    jobs.append((source, source, dat_path))
+                    continue
+                data = load_session(source)
+                if session_kind(data) == "sim":
+                    self.log_received.emit(f"[WARN] Skipped {os.path.basename(source)}: simulation recording")
+                    continue
+                jobs.append((session_table(data), source, dat_path))
+            total = sum(len(table) for table, _, _ in jobs)
+            done = 0
+            t0 = time.perf_counter()
+            for table, source, dat_path in jobs:
+                offset = done
+                rows = write_dat(dat_path, table, cancelled=lambda: not self.running,
+                                 progress=lambda n, _: self.progress.emit(offset + n, total))
+                if rows is None:
+                    self.log_received.emit("[WARN] GNUplot export cancelled")
+                    break
+                done += rows
+                gp_path = os.path.splitext(dat_path)[0] + ".gp"
+                title = os.path.splitext(os.path.basename(source if isinstance(source, str) else dat_path))[0]
+                write_gp(gp_path, gp_script(dat_path, title))
+                outputs += [dat_path, gp_path]
+            else:
+                if self.overlay_path and len(jobs) > 1:
+                    script = overlay_script([d for _, _, d in jobs],
+                                            base_dir=os.path.dirname(os.path.abspath(self.overlay_path)))
+                    write_gp(self.overlay_path, script)
+                    outputs.append(self.overlay_path)
+                self.log_received.emit(f"[INFO] 💾 GNUplot export: {done} rows in {len(jobs)} file(s), "
+                                       f"{time.perf_counter() - t0:.2f} s")
+        except Exception as e:
+            self.log_received.emit(f"[ERROR] GNUplot export failed: {e}")
+            self.export_finished.emit({"outputs": outputs, "error": str(e)})
+            return
+        self.export_finished.emit({"outputs": outputs, "error": None})
+
+
+def benchmark(paths, repeat=3):
+    """Compare np.savetxt against format_block on the same tables (best of repeat)."""
+    import io
+    rows = []
+    for path in paths:
+        data = load_session(path)
+        if session_kind(data) == "sim":
+            continue
+        table = session_table(data)
+
+        def best(fn):
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - t0)
+            return min(times)
+
+        t_savetxt = best(lambda: np.savetxt(io.StringIO(), table, fmt=DAT_FORMAT))
+        t_block = best(lambda: format_block(table))
+        rows.append((os.path.basename(path), len(table), t_savetxt, t_block))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export recordings as GNUplot .dat/.gp files")
+    parser.add_argument("inputs", nargs="+", help="recordings (.csv, .json, .jsonl, .dat, .ens)")
+    parser.add_argument("-o", "--out-dir", help="default: next to each input")
+    parser.add_argument("--overlay", help="also write a multi-session overlay script to this .gp path")
+    parser.add_argument("-f", "--force", action="store_true", help="overwrite existing .dat/.gp files")
+    parser.add_argument("--bench", action="store_true", help="time np.savetxt vs the block formatter instead")
+    args = parser.parse_args()
+
+    if args.bench:
+        print(f"{'file':32s} {'rows':>7s} {'savetxt ms':>11s} {'block ms':>9s} {'speedup':>8s}")
+        for name, n, a, b in benchmark(args.inputs):
+            print(f"{name:32s} {n:7d} {a * 1000:11.2f} {b * 1000:9.2f} {a / b:7.1f}x")
+    else:
+        if args.out_dir:
+            os.makedirs(args.out_dir, exist_ok=True)
+        dats = output_paths(args.inputs, args.out_dir)
+        existing = existing_outputs(dats, args.overlay)
+        if existing and not args.force:
+            parser.error("would overwrite " + ", ".join(existing) + " (use --force)")
+        for path, dat in zip(args.inputs, dats):
+            dat_path, gp_path, rows = export_session_file(path, dat_path=dat, force=True)
+            print(f"{path}: {rows} rows -> {dat_path}, {gp_path}")
+        if args.overlay:
+            write_gp(args.overlay, overlay_script(dats, base_dir=os.path.dirname(os.path.abspath(args.overlay))))
+            print(f"overlay -> {args.overlay}")
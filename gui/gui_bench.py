@@ -0,0 +1,419 @@
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+# Headless by default; set QT_QPA_PLATFORM yourself to watch the plots
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import PySide6
+import pyqtgraph as pg
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QApplication, QFileDialog, QMessageBox
+from dataset import load_session, session_frames
+from device_bench import percentile
+from mock_backend import MockSensorServer
+from sensor_frame import SENSOR_FIELDS, SENSOR_INDEX, SIM_FIELDS, STATE_CODES, array_to_records
+from sim_engine import SimEngine
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Scenario name -> what it drives
+SCENARIOS = {
+    "enouse-json": "ENouseTab.update_graph, one dict per sample",
+    "enouse-batch": "ENouseTab.update_batch, one array per WebSocket frame",
+    "sim-json": "SimulationTab.update_graph, one dict per sample",
+    "sim-batch": "SimulationTab.update_batch, one array per WebSocket frame",
+    "websocket-json": "WebSocketWorker <- mock backend, one JSON object per sample",
+    "websocket-binary": "WebSocketWorker <- mock backend, packed float32 frames",
+    "gnuplot": "ENouseTab.save_gnuplot on a full plot buffer, until ExportWorker finishes",
+}
+DEFAULT_RATES = "50,200,1000,5000,20000,50000"
+
+
+def rss_mb():
+    """Resident memory of this process in MB, or None where it cannot be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def synthetic_frames(n=4000, seed=0):
+    """Random-walk gas readings in the (n, 17) SensorData layout, 4 Hz ts."""
+    rng = np.random.default_rng(seed)
+    out = np.zeros((n, len(SENSOR_FIELDS)))
+    out[:, SENSOR_INDEX["ts"]] = np.arange(n) * 250.0
+    out[:, SENSOR_INDEX["state"]] = STATE_CODES["HOLD"]
+    for j in range(SENSOR_INDEX["co_mics"], SENSOR_INDEX["co_gm"] + 1):
+        out[:, j] = np.abs(np.cumsum(rng.normal(0, 0.05, n)) + rng.uniform(1, 5))
+    return out
+
+
+def recorded_frames(pattern=os.path.join(HERE, "*.json")):
+    """Every recorded JSON session in gui/, concatenated."""
+    blocks = []
+    for path in sorted(glob.glob(pattern)):
+        try:
+            blocks.append(session_frames(load_session(path)))
+        except (OSError, ValueError, KeyError):
+            continue
+    return np.concatenate(blocks) if blocks else synthetic_frames()
+
+
+def sim_frames(n=4000):
+    return SimEngine().generate(n)
+
+
+def summarize(name, source, rate, wall, fed, done, latency_ms, frame_ms, late_ms, rss0, rss1, max_latency_ms):
+    latency_p95 = percentile(latency_ms, 95)
+    return {
+        "scenario": name,
+        "source": source,
+        "rate_sps": rate,
+        "seconds": round(wall, 3),
+        "fed": fed,
+        "processed": done,
+        "throughput_sps": round(done / wall, 1) if wall else 0.0,
+        "latency_ms_p50": round(percentile(latency_ms, 50), 3),
+        "latency_ms_p95": round(latency_p95, 3),
+        "latency_ms_p99": round(percentile(latency_ms, 99), 3),
+        "latency_ms_max": round(float(np.max(latency_ms)) if len(latency_ms) else 0.0, 3),
+        "frames": len(frame_ms),
+        "frame_ms_p50": round(percentile(frame_ms, 50), 3),
+        "frame_ms_p95": round(percentile(frame_ms, 95), 3),
+        "frame_ms_max": round(max(frame_ms, default=0.0), 3),
+        "timer_late_ms_p95": round(percentile(late_ms, 95), 3),
+        "rss_mb": round(rss1, 1) if rss1 is not None else None,
+        "rss_growth_mb": round(rss1 - rss0, 2) if rss0 is not None and rss1 is not None else None,
+        # Kept up: everything fed was processed, in time
+        "sustained": bool(done >= 0.98 * fed and fed > 0 and latency_p95 <= max_latency_ms),
+    }
+
+
+class LatencyProbe:
+    """Times a tab's RenderScheduler: arrival -> end of the frame that drew it, per sample.
+
+    Arrival is when the sample was due (set `due` before submitting), so a
+    feeder that falls behind shows up as latency too; otherwise submit time.
+    """
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.due = None
+        self.stamps = []
+        self.latency = []
+        self.frame_ms = []
+        self.rendered = 0
+        submit, render = scheduler.submit, scheduler.render_fn
+
+        def timed_submit(item, count=1):
+            self.stamps.append((self.due if self.due is not None else time.perf_counter(), count))
+            submit(item, count)
+
+        def timed_render(items):
+            t0 = time.perf_counter()
+            render(items)
+            t1 = time.perf_counter()
+            self.frame_ms.append((t1 - t0) * 1000)
+            stamps = np.array(self.stamps)
+            self.stamps = []
+            if len(stamps):
+                counts = stamps[:, 1].astype(int)
+                self.latency.append(np.repeat((t1 - stamps[:, 0]) * 1000, counts))
+                self.rendered += int(counts.sum())
+
+        scheduler.submit = timed_submit
+        scheduler.render_fn = timed_render
+
+    def latency_ms(self):
+        return np.concatenate(self.latency) if self.latency else np.empty(0)
+
+
+class LatenessProbe:
+    """How late a 10 ms timer fires: a proxy for GUI responsiveness."""
+
+    def __init__(self):
+        self.late_ms = []
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.tick)
+        self.last = None
+
+    def tick(self):
+        now = time.perf_counter()
+        if self.last is not None:
+            self.late_ms.append(max((now - self.last) * 1000 - 10, 0))
+        self.last = now
+
+    def start(self):
+        self.timer.start(10)
+
+    def stop(self):
+        self.timer.stop()
+
+
+def pump(app, seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def run_tab(app, name, source, frames, rate, seconds, frame_rate, max_latency_ms):
+    """Feed a tab at `rate` samples/s from the GUI thread, like queued WebSocket signals would."""
+    from main import ENouseTab, SimulationTab
+
+    tab = ENouseTab() if name.startswith("enouse") else SimulationTab()
+    tab.resize(1400, 900)
+    tab.show()
+    per_sample = name.endswith("-json")
+    fields = SIM_FIELDS if name.startswith("sim") else SENSOR_FIELDS
+    records = array_to_records(frames, fields) if per_sample else None
+    probe = LatencyProbe(tab.scheduler)
+    late = LatenessProbe()
+    pump(app, 0.2)
+
+    gc.collect()
+    rss0 = rss_mb()
+    late.start()
+    fed = 0
+    last_feed = 0.0
+    t0 = time.perf_counter()
+    while True:
+        now = time.perf_counter() - t0
+        if now >= seconds:
+            break
+        # Per-sample mode delivers as samples fall due; batch mode once per frame
+        if per_sample or now - last_feed >= 1.0 / frame_rate:
+            n = int(now * rate) - fed
+            if n > 0:
+                idx = (fed + np.arange(n)) % len(frames)
+                if per_sample:
+                    for k, i in enumerate(idx):
+                        probe.due = t0 + (fed + k + 1) / rate
+                        tab.update_graph(records[i])
+                else:
+                    probe.due = t0 + (fed + n) / rate
+                    tab.update_batch(frames[idx])
+                fed += n
+            last_feed = now
+        app.processEvents()
+        time.sleep(0.0005)
+    wall = time.perf_counter() - t0
+    late.stop()
+    tab.scheduler.tick()
+    gc.collect()
+    rss1 = rss_mb()
+
+    tab.scheduler.stop()
+    tab.close()
+    tab.deleteLater()
+    pump(app, 0.05)
+    return summarize(name, source, rate, wall, fed, probe.rendered, probe.latency_ms(), probe.frame_ms,
+                     late.late_ms, rss0, rss1, max_latency_ms)
+
+
+def run_websocket(app, name, source, frames, rate, seconds, frame_rate, max_latency_ms):
+    """WebSocketWorker against the mock backend; latency from server send to slot delivery."""
+    from main import WebSocketWorker
+
+    fmt = name.split("-")[1]
+    server = MockSensorServer(frames, rate, frame_rate, stamp=True).start()
+    url = f"{server.url}?format={fmt}"
+    worker = WebSocketWorker(url, fields=SENSOR_FIELDS if fmt == "binary" else None)
+    latency = []
+    received = [0]
+
+    def on_batch(batch):
+        now_ms = (time.perf_counter() - server.t0) * 1000
+        latency.append(now_ms - batch[:, SENSOR_INDEX["ts"]])
+        received[0] += len(batch)
+
+    def on_data(data):
+        latency.append([(time.perf_counter() - server.t0) * 1000 - data["ts"]])
+        received[0] += 1
+
+    worker.batch_received.connect(on_batch)
+    worker.data_received.connect(on_data)
+    late = LatenessProbe()
+    worker.start()
+
+    deadline = time.perf_counter() + 5
+    while not received[0] and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    gc.collect()
+    rss0 = rss_mb()
+    latency.clear()
+    base_received = received[0]
+    with server.lock:
+        base_sent = sum(server.sent.values())
+    late.start()
+    t0 = time.perf_counter()
+    pump(app, seconds)
+    wall = time.perf_counter() - t0
+    late.stop()
+
+    # Stop the sender, let the rest arrive, then count both ends
+    server.running = False
+    pump(app, 0.5)
+    with server.lock:
+        sent = sum(server.sent.values()) - base_sent
+    done = received[0] - base_received
+    gc.collect()
+    rss1 = rss_mb()
+    worker.stop()
+    server.stop()
+    worker.wait(3000)
+
+    lat = np.concatenate([np.asarray(x, dtype=float) for x in latency]) if latency else np.empty(0)
+    return summarize(name, source, rate, wall, sent, done, lat, [], late.late_ms, rss0, rss1, max_latency_ms)
+
+
+def run_gnuplot(app, source, frames, repeats=5, timeout_s=60.0):
+    """save_gnuplot on a full ENouseTab buffer, dialogs answered automatically.
+
+    The export runs on ExportWorker, so each repeat is timed from the click
+    until export_finished has been handled on the GUI thread.
+    """
+    from main import ENouseTab, MAX_POINTS
+
+    tab = ENouseTab()
+    block = frames[np.arange(MAX_POINTS) % len(frames)]
+    # One item per sample so the buffer gets a 4 Hz time axis
+    tab.render_batch([(i * 0.25, block[i:i + 1]) for i in range(len(block))])
+    tmp = tempfile.mkdtemp(prefix="enouse_bench_")
+    path = os.path.join(tmp, "bench.dat")
+    errors = []
+    patched = (QFileDialog.getSaveFileName, QMessageBox.information, QMessageBox.warning, QMessageBox.critical)
+    QFileDialog.getSaveFileName = staticmethod(lambda *a, **k: (path, ""))
+    QMessageBox.information = staticmethod(lambda *a, **k: None)
+    # A busy or failed export must not leave a modal dialog waiting offscreen
+    QMessageBox.warning = QMessageBox.critical = staticmethod(lambda parent, title, text, *a, **k: errors.append(text))
+    gc.collect()
+    rss0 = rss_mb()
+    times = []
+    try:
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            tab.save_gnuplot()
+            deadline = t0 + timeout_s
+            while tab.export_worker is not None and time.perf_counter() < deadline:
+                app.processEvents()
+                time.sleep(0.001)
+            if tab.export_worker is not None or errors:
+                raise RuntimeError(f"GNUplot export did not finish: {errors[-1] if errors else 'timed out'}")
+            times.append((time.perf_counter() - t0) * 1000)
+    finally:
+        (QFileDialog.getSaveFileName, QMessageBox.information, QMessageBox.warning,
+         QMessageBox.critical) = patched
+    rss1 = rss_mb()
+    rows = len(tab.buffer)
+    size_kb = os.path.getsize(path) / 1024
+    tab.scheduler.stop()
+    tab.close()
+    tab.deleteLater()
+    for name in os.listdir(tmp):
+        os.remove(os.path.join(tmp, name))
+    os.rmdir(tmp)
+    best = min(times)
+    return {
+        "scenario": "gnuplot",
+        "source": source,
+        "rows": rows,
+        "file_kb": round(size_kb, 1),
+        "ms_p50": round(percentile(times, 50), 3),
+        "ms_min": round(best, 3),
+        "throughput_sps": round(rows / (best / 1000), 1),
+        "rss_growth_mb": round(rss1 - rss0, 2) if rss0 is not None and rss1 is not None else None,
+    }
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pyside6": PySide6.__version__,
+        "pyqtgraph": pg.__version__,
+        "qpa": os.environ.get("QT_QPA_PLATFORM"),
+    }
+
+
+def run(app, scenarios, sources, rates, seconds, frame_rate, max_latency_ms, log=print):
+    results = []
+    max_sustained = {}
+    for name in scenarios:
+        # The simulation stream has its own shape; recorded sessions do not apply
+        for source in (["synthetic"] if name.startswith("sim") else sources):
+            if name.startswith("sim"):
+                frames = sim_frames()
+            else:
+                frames = synthetic_frames() if source == "synthetic" else recorded_frames()
+            if name == "gnuplot":
+                r = run_gnuplot(app, source, frames)
+                results.append(r)
+                log(f"{name:17s} {source:9s} {r['rows']:7d} rows  {r['ms_p50']:8.2f} ms  "
+                    f"{r['throughput_sps']:12.0f} rows/s")
+                continue
+            runner = run_websocket if name.startswith("websocket") else run_tab
+            best = 0.0
+            for rate in rates:
+                r = runner(app, name, source, frames, rate, seconds, frame_rate, max_latency_ms)
+                results.append(r)
+                log(f"{name:17s} {source:9s} {rate:7.0f}/s -> {r['throughput_sps']:9.1f}/s  "
+                    f"lat p50/p95 {r['latency_ms_p50']:7.2f}/{r['latency_ms_p95']:8.2f} ms  "
+                    f"frame p95 {r['frame_ms_p95']:6.2f} ms  late p95 {r['timer_late_ms_p95']:6.2f} ms  "
+                    f"rss +{r['rss_growth_mb'] or 0:.1f} MB  {'ok' if r['sustained'] else 'BEHIND'}")
+                if not r["sustained"]:
+                    break
+                best = rate
+            max_sustained[f"{name}/{source}"] = best
+    return {"meta": metadata(), "max_sustainable_sps": max_sustained, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the GUI data path")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--source", choices=("synthetic", "recorded", "both"), default="both")
+    parser.add_argument("--rates", default=DEFAULT_RATES, help="samples per second, ramped until one falls behind")
+    parser.add_argument("--seconds", type=float, default=3.0, help="per rate")
+    parser.add_argument("--frame-rate", type=float, default=20.0, help="WebSocket frames per second in batch modes")
+    parser.add_argument("--max-latency-ms", type=float, default=250.0, help="p95 latency that still counts as keeping up")
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    sources = ["synthetic", "recorded"] if args.source == "both" else [args.source]
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    report = run(app, scenarios, sources, [float(r) for r in args.rates.split(",")], args.seconds,
+                 args.frame_rate, args.max_latency_ms)
+    print("max sustainable samples/s: " + ", ".join(f"{k}={v:g}" for k, v in report["max_sustainable_sps"].items()))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
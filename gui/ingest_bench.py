@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import platform
+import socket
+import threading
+import time
+import numpy as np
+import requests
+from dataset import SENSOR_DTYPE, load_session, session_frames
+from mock_influx import MockInfluxServer
+from sensor_frame import SENSOR_FIELDS, state_name
+
+# Backend ingestion benchmark: replay a recording to the firmware TCP port
+# (JSON lines, as arduino::run_tcp_server reads them) while the backend
+# writes to a MockInfluxServer, then compare what was sent with what
+# reached the "database". Every sample carries a unique ts, which the
+# backend stores as the ts field, so per-sample latency is exact.
+#
+#   1. point [influxdb] url in backend/config.toml at http://localhost:8086
+#   2. cargo run (in backend/), once with batch_size = 1 and once batched
+#   3. python ingest_bench.py --rate 0 --samples 5000
+
+TCP_PORT = 8081
+API_URL = "http://localhost:3000"
+_INT_FIELDS = {name for name in SENSOR_FIELDS if SENSOR_DTYPE[name].kind in "iu"}
+
+
+def sample_records(frames, device=None):
+    """SensorData JSON objects for the firmware protocol (integers where the backend expects them)."""
+    records = []
+    for row in frames:
+        rec = {}
+        for name, value in zip(SENSOR_FIELDS, row.tolist()):
+            if name == "state":
+                rec[name] = state_name(value)
+            else:
+                rec[name] = int(value) if name in _INT_FIELDS else value
+        if device:
+            rec["device"] = device
+        records.append(rec)
+    return records
+
+
+class LoadGenerator:
+    """Sends samples to the backend TCP port from `devices` parallel connections.
+
+    rate is the total samples per second (0: as fast as the sockets take
+    them). With reconnect every sample opens its own connection, like the
+    firmware does. Samples get ts = ts_base, ts_base + 1, ...; sent maps
+    each ts to its send time (perf_counter).
+    """
+
+    def __init__(self, frames, host="127.0.0.1", port=TCP_PORT, rate=0.0, devices=1, reconnect=False, ts_base=1):
+        self.records = [sample_records(frames, f"loadgen{d}" if devices > 1 else None) for d in range(devices)]
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.devices = devices
+        self.reconnect = reconnect
+        self.ts_base = ts_base
+        self.sent = {}
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def _device(self, d, count, t_start):
+        records = self.records[d]
+        interval = self.devices / self.rate if self.rate else 0.0
+        sock = None
+        sent = {}
+        try:
+            for i in range(count):
+                ts = self.ts_base + i * self.devices + d
+                rec = dict(records[i % len(records)], ts=ts)
+                line = (json.dumps(rec) + "\n").encode("utf-8")
+                if interval:
+                    delay = t_start + i * interval - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                try:
+                    if sock is None:
+                        sock = socket.create_connection((self.host, self.port), timeout=5)
+                    sent[ts] = time.perf_counter()
+                    sock.sendall(line)
+                    if self.reconnect:
+                        sock.close()
+                        sock = None
+                except OSError:
+                    sent.pop(ts, None)
+                    with self.lock:
+                        self.errors += 1
+                    if sock is not None:
+                        sock.close()
+                    sock = None
+        finally:
+            if sock is not None:
+                sock.close()
+            with self.lock:
+                self.sent.update(sent)
+
+    def run(self, samples):
+        """Send `samples` in total; returns the seconds it took."""
+        per_device = [samples // self.devices + (d < samples % self.devices) for d in range(self.devices)]
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=self._device, args=(d, n, t0), daemon=True)
+                   for d, n in enumerate(per_device)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return time.perf_counter() - t0
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else 0.0
+
+
+def measure(influx, gen, samples, drain_s):
+    """Run the generator against the backend and collect throughput/latency from the mock."""
+    influx.reset()
+    send_s = gen.run(samples)
+    deadline = time.perf_counter() + drain_s
+    while time.perf_counter() < deadline:
+        with influx.lock:
+            if influx.stats.get("points", 0) >= len(gen.sent):
+                break
+        time.sleep(0.05)
+    with influx.lock:
+        points = list(influx.points.values())
+        stats = dict(influx.stats)
+
+    # A sample overwritten by another point of its series (same tags and
+    # timestamp) is gone, so it counts as lost
+    latency = [(p[0] - gen.sent[p[4]["ts"]]) * 1000 for p in points if p[4].get("ts") in gen.sent]
+    t_first = min(gen.sent.values()) if gen.sent else 0.0
+    t_last = max((p[0] for p in points), default=t_first)
+    writes = stats.get("writes", 0)
+    return {
+        "sent": len(gen.sent),
+        "send_errors": gen.errors,
+        "send_rate": len(gen.sent) / max(send_s, 1e-9),
+        "stored": len(latency),
+        "lost": len(gen.sent) - len(latency),
+        "ingest_rate": len(latency) / max(t_last - t_first, 1e-9),
+        "overwritten": stats.get("overwritten", 0),
+        "writes": writes,
+        "points_per_write": stats.get("points", 0) / max(writes, 1),
+        "latency_ms": {"p50": percentile(latency, 50), "p95": percentile(latency, 95),
+                       "p99": percentile(latency, 99), "max": max(latency, default=0.0)},
+    }
+
+
+def metadata():
+    return {"date": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure backend TCP -> InfluxDB ingestion against a mock InfluxDB")
+    parser.add_argument("--session", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                          "Teh_Hijau_1_2Motor.csv"))
+    parser.add_argument("--host", default="127.0.0.1", help="backend host")
+    parser.add_argument("--tcp-port", type=int, default=TCP_PORT)
+    parser.add_argument("--api", default=API_URL)
+    parser.add_argument("--influx-port", type=int, default=8086, help="port of the mock InfluxDB")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="mock seconds per write request")
+    parser.add_argument("--rate", default="50,200,0", help="comma-separated total samples/s (0 = unthrottled)")
+    parser.add_argument("--samples", type=int, default=2000, help="samples per run")
+    parser.add_argument("--devices", type=int, default=1, help="parallel connections")
+    parser.add_argument("--reconnect", action="store_true", help="one connection per sample, like the firmware")
+    parser.add_argument("--drain", type=float, default=10.0, help="seconds to wait for writes after sending")
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    frames = session_frames(load_session(args.session))
+    influx = MockInfluxServer(latency=args.db_latency, host="0.0.0.0", port=args.influx_port).start()
+    res = requests.post(f"{args.api}/start", json={"label": "ingest_bench"}, timeout=5)
+    res.raise_for_status()
+    results = []
+    try:
+        print(f"{'rate':>6s} {'sent':>6s} {'send/s':>8s} {'stored':>7s} {'ingest/s':>9s} {'lost':>5s} "
+              f"{'writes':>6s} {'pts/write':>9s} {'p50 ms':>8s} {'p99 ms':>8s}")
+        for k, rate in enumerate(float(r) for r in args.rate.split(",")):
+            # Disjoint ts per run, so late writes from a previous run are not matched
+            gen = LoadGenerator(frames, args.host, args.tcp_port, rate, args.devices, args.reconnect,
+                                ts_base=1 + k * 10 ** 9)
+            r = measure(influx, gen, args.samples, args.drain)
+            r["rate"] = rate
+            results.append(r)
+            lat = r["latency_ms"]
+            print(f"{rate or float('inf'):6.0f} {r['sent']:6d} {r['send_rate']:8.1f} {r['stored']:7d} "
+                  f"{r['ingest_rate']:9.1f} {r['lost']:5d} {r['writes']:6d} {r['points_per_write']:9.1f} "
+                  f"{lat['p50']:8.1f} {lat['p99']:8.1f}")
+    finally:
+        requests.post(f"{args.api}/stop", timeout=5)
+        influx.stop()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"meta": dict(metadata(), db_latency=args.db_latency, devices=args.devices,
+                                    reconnect=args.reconnect, session=os.path.basename(args.session)),
+                       "results": results}, f, indent=2)
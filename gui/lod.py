@@ -0,0 +1,133 @@
+import numpy as np
+
+
+class _Level:
+    def __init__(self, n_channels, capacity):
+        self.mins = np.empty((n_channels, capacity))
+        self.maxs = np.empty((n_channels, capacity))
+        self.size = 0
+
+    def reserve(self, need):
+        if need > self.mins.shape[1]:
+            cap = max(need, 2 * self.mins.shape[1])
+            self.mins = _grow(self.mins, cap, self.size)
+            self.maxs = _grow(self.maxs, cap, self.size)
+
+
+def _grow(arr, capacity, used):
+    out = np.empty(arr.shape[:-1] + (capacity,), dtype=arr.dtype)
+    out[..., :used] = arr[..., :used]
+    return out
+
+
+class MinMaxPyramid:
+    """Append-only sample history with a min/max bucket pyramid for level-of-detail plotting.
+
+    Level 0 is the raw data; level k keeps per-channel min/max over buckets of
+    factor**k samples. New samples only touch the buckets they complete, so
+    both extend() and query() cost is independent of the history length.
+    """
+
+    def __init__(self, n_channels, factor=4, initial_capacity=4096):
+        self.n_channels = n_channels
+        self.factor = factor
+        self._times = np.empty(initial_capacity)
+        self._data = np.empty((n_channels, initial_capacity))
+        self._size = 0
+        self._levels = []
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        self._size = 0
+        self._levels = []
+
+    def times(self):
+        return self._times[:self._size]
+
+    def values(self):
+        return self._data[:, :self._size]
+
+    def extend(self, times, block):
+        """Append k samples; times must be non-decreasing, block has shape (k, n_channels)."""
+        times = np.asarray(times, dtype=np.float64)
+        block = np.asarray(block, dtype=np.float64).reshape(len(times), self.n_channels)
+        k = len(times)
+        if k == 0:
+            return
+
+        need = self._size + k
+        if need > len(self._times):
+            cap = max(need, 2 * len(self._times))
+            self._times = _grow(self._times, cap, self._size)
+            self._data = _grow(self._data, cap, self._size)
+        self._times[self._size:need] = times
+        self._data[:, self._size:need] = block.T
+        self._size = need
+        self._update_levels()
+
+    def _update_levels(self):
+        f = self.factor
+        src_min = src_max = self._data
+        src_size = self._size
+        depth = 0
+        while src_size >= f:
+            n_buckets = src_size // f
+            if depth == len(self._levels):
+                self._levels.append(_Level(self.n_channels, max(n_buckets, 64)))
+            level = self._levels[depth]
+            if n_buckets > level.size:
+                level.reserve(n_buckets)
+                done = level.size
+                seg = slice(done * f, n_buckets * f)
+                level.mins[:, done:n_buckets] = src_min[:, seg].reshape(self.n_channels, -1, f).min(axis=2)
+                level.maxs[:, done:n_buckets] = src_max[:, seg].reshape(self.n_channels, -1, f).max(axis=2)
+                level.size = n_buckets
+            src_min, src_max, src_size = level.mins, level.maxs, level.size
+            depth += 1
+
+    def query(self, t0, t1, max_points):
+        """Return (x, y) covering [t0, t1] with y of shape (n_channels, m).
+
+        Ranges with at most 2 * max_points samples come back at full resolution
+        (as views); longer ranges are reduced to interleaved min/max pairs from
+        the coarsest level that still gives about max_points buckets.
+        """
+        times = self._times[:self._size]
+        i0 = max(int(np.searchsorted(times, t0, 'left')) - 1, 0)
+        i1 = min(int(np.searchsorted(times, t1, 'right')) + 1, self._size)
+        n = i1 - i0
+        if n <= 2 * max_points or not self._levels:
+            return times[i0:i1], self._data[:, i0:i1]
+
+        depth = 0
+        bucket = 1
+        while depth < len(self._levels) and n // bucket > max_points:
+            depth += 1
+            bucket *= self.factor
+        level = self._levels[depth - 1]
+
+        b0 = -(-i0 // bucket)
+        b1 = max(min(i1 // bucket, level.size), b0)
+        xs = [times[b0 * bucket:b1 * bucket:bucket]]
+        mins = [level.mins[:, b0:b1]]
+        maxs = [level.maxs[:, b0:b1]]
+
+        # Partial buckets at either edge are reduced straight from the raw data
+        head_end = min(b0 * bucket, i1)
+        if head_end > i0:
+            xs.insert(0, times[i0:i0 + 1])
+            mins.insert(0, self._data[:, i0:head_end].min(axis=1, keepdims=True))
+            maxs.insert(0, self._data[:, i0:head_end].max(axis=1, keepdims=True))
+        tail_start = max(b1 * bucket, head_end)
+        if i1 > tail_start:
+            xs.append(times[tail_start:tail_start + 1])
+            mins.append(self._data[:, tail_start:i1].min(axis=1, keepdims=True))
+            maxs.append(self._data[:, tail_start:i1].max(axis=1, keepdims=True))
+
+        x = np.repeat(np.concatenate(xs), 2)
+        y = np.empty((self.n_channels, len(x)))
+        y[:, 0::2] = np.concatenate(mins, axis=1)
+        y[:, 1::2] = np.concatenate(maxs, axis=1)
+        return x, y
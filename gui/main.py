@@ -1,5 +1,5 @@
 import sys
-import requests
+import numpy as np
 import pyqtgraph as pg
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QLabel, QLineEdit, QPushButton,
@@ -10,25 +10,76 @@ from PySide6.QtGui import QTextCursor
 import websocket
 import json
 import threading
+import time
+from urllib.parse import quote, urlparse
 from datetime import datetime
+from ring_buffer import RingBuffer
+from lod import MinMaxPyramid
+from replay import REPLAY_SPEEDS, ReplayWorker
+from recorder import SIM_CSV_COLUMNS, SIM_JSON_COLUMNS, StreamRecorder
+from render_scheduler import RenderScheduler
+from device_hub import DeviceHub
+from control_client import get_client
+from uploader import UploadWorker
+from probes import PROBES, FrameProbe, ProbeOverlay
+from gnuplot_export import ExportWorker, existing_outputs, output_paths
+from classifier import LiveClassifier, TrainWorker
+from sim_engine import DEFAULT_SAMPLE_RATE, OPERATIONS, SimEngine
+from spectrum_panel import SpectrumPanel
+from filters import DEFAULT_PRESET, FILTER_PRESETS
+from dataset import NOMINAL_INTERVAL_MS, SESSION_EXTENSIONS
+from resample import StreamResampler
+from sensor_frame import (SENSOR_CHANNELS, SENSOR_FIELDS, SENSOR_INDEX, SIM_FIELDS, decode_message,
+                          records_to_array, state_name)
 
 API_URL = "http://localhost:3000"
 WS_URL = "ws://localhost:3000/ws"
 WS_LOG_URL = "ws://localhost:3000/logs"
 WS_SIM_URL = "ws://localhost:3000/sim/ws"
 
+# Batched wire mode: "batch" (JSON arrays) or "binary" (packed float32 blocks)
+WS_FORMAT = "binary"
+
+# File dialog filter for everything load_session reads
+RECORDING_FILTER = "Recordings (" + " ".join(f"*{ext}" for ext in SESSION_EXTENSIONS) + ")"
+
+# Live plot window (samples per channel)
+MAX_POINTS = 10000
+SIM_MAX_POINTS = 500
+# Local simulation keeps this many seconds on screen (500 points at the backend's 20 Hz)
+SIM_WINDOW_SECONDS = 25
+
+# Redraw cap for the live plots (frames per second)
+RENDER_FPS = 30
+
+# Spectrum view: nominal sample rates of the two streams (backend sim loop ticks every 50 ms)
+ENOSE_SAMPLE_RATE = 1000 / NOMINAL_INTERVAL_MS
+SIM_BACKEND_RATE = 20.0
+
+# Multi-device view: samples kept per device and plot grid width
+DEVICE_MAX_POINTS = 2000
+DEVICE_COLUMNS = 2
+# The grid repaints every plot per frame, so it refreshes slower than the main views
+DEVICE_RENDER_FPS = 15
+
 # Edge Impulse Configuration
 EDGE_IMPULSE_API_KEY = "ei_22521a805fc50af48c92c34c52aadac76507b2728ee7a0e2"
 EDGE_IMPULSE_URL = "https://ingestion.edgeimpulse.com/api/training/data"
 
 class WebSocketWorker(QThread):
     data_received = Signal(dict)
+    batch_received = Signal(object)
     log_received = Signal(str)
     
-    def __init__(self, url, is_log=False):
+    def __init__(self, url, is_log=False, fields=None, probe=None):
         super().__init__()
         self.url = url
         self.is_log = is_log
+        # When fields is set, every frame is decoded into one (n, len(fields)) array
+        self.fields = fields
+        # Channel name for the timing probes (None: not instrumented)
+        self.probe = probe
+        self.last_recv = None
         self.running = True
         self.ws = None
 
@@ -44,24 +95,53 @@ class WebSocketWorker(QThread):
                 QThread.sleep(1)
 
     def on_message(self, ws, message):
+        t_recv = time.perf_counter() if PROBES.enabled and self.probe else None
         if self.is_log:
             self.log_received.emit(message)
+        elif self.fields:
+            try:
+                batch = decode_message(message, self.fields)
+                if len(batch):
+                    if t_recv is not None:
+                        self.probe_frame(t_recv, len(batch))
+                    self.batch_received.emit(batch)
+            except:
+                pass
         else:
             try:
                 data = json.loads(message)
+                if t_recv is not None:
+                    self.probe_frame(t_recv, 1)
                 self.data_received.emit(data)
             except:
                 pass
 
+    def probe_frame(self, t_recv, samples):
+        PROBES.record(f"{self.probe}.decode_ms", (time.perf_counter() - t_recv) * 1000)
+        PROBES.record(f"{self.probe}.frame_samples", samples, "samples")
+        if self.last_recv is not None:
+            PROBES.record(f"{self.probe}.ws_gap_ms", (t_recv - self.last_recv) * 1000)
+        self.last_recv = t_recv
+        PROBES.emitted(self.probe, t_recv)
+
     def on_error(self, ws, error):
         pass
 
+    def set_url(self, url):
+        # Takes effect on the reconnect that closing the socket triggers
+        self.url = url
+        if self.ws:
+            self.ws.close()
+
     def stop(self):
         self.running = False
         if self.ws:
             self.ws.close()
 
 class ENouseTab(QWidget):
+    # URL of the live data stream changed (device filter)
+    stream_url_changed = Signal(str)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.layout = QVBoxLayout(self)
@@ -77,6 +157,18 @@ class ENouseTab(QWidget):
         self.state_label.setStyleSheet("font-size: 16px; font-weight: bold;")
         info_layout.addWidget(self.state_label)
         info_layout.addStretch()
+        self.aroma_label = QLabel("🧠 Aroma: —")
+        self.aroma_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #69F0AE;")
+        self.aroma_label.setVisible(False)
+        info_layout.addWidget(self.aroma_label)
+        self.btn_classify = QPushButton("🧠 Classify")
+        self.btn_classify.setCheckable(True)
+        self.btn_classify.setToolTip("Predict the tea aroma live from a model trained on the recorded sessions")
+        self.btn_classify.toggled.connect(self.toggle_classifier)
+        info_layout.addWidget(self.btn_classify)
+        self.aroma_model = None
+        self.live_classifier = None
+        self.train_worker = None
         self.layout.addLayout(info_layout)
 
         # --- Graph Controls ---
@@ -101,6 +193,32 @@ class ENouseTab(QWidget):
         self.spin_gain.setSingleStep(0.1)
         self.spin_gain.setStyleSheet("background: #1e1e2e; color: #69F0AE; font-weight: bold;")
         graph_ctrl_layout.addWidget(self.spin_gain)
+
+        graph_ctrl_layout.addWidget(QLabel("🧹 Filter:"))
+        self.filter_combo = QComboBox()
+        self.filter_combo.addItems(list(FILTER_PRESETS))
+        self.filter_combo.setCurrentText(DEFAULT_PRESET)
+        self.filter_combo.currentTextChanged.connect(self.change_filter)
+        graph_ctrl_layout.addWidget(self.filter_combo)
+
+        self.btn_spectrum = QPushButton("📊 Spectrum")
+        self.btn_spectrum.setCheckable(True)
+        self.btn_spectrum.toggled.connect(self.toggle_spectrum)
+        graph_ctrl_layout.addWidget(self.btn_spectrum)
+
+        self.chk_device_clock = QCheckBox("⏱ Device clock")
+        self.chk_device_clock.setChecked(True)
+        self.chk_device_clock.setToolTip("Plot on the sensor ts, resampled to a uniform "
+                                         f"{NOMINAL_INTERVAL_MS} ms grid (off: PC arrival time)")
+        self.chk_device_clock.toggled.connect(self.clear_plot)
+        graph_ctrl_layout.addWidget(self.chk_device_clock)
+
+        # The device clock only makes sense for one unit: with several, their ts interleave
+        graph_ctrl_layout.addWidget(QLabel("📟 Device:"))
+        self.device_combo = QComboBox()
+        self.device_combo.addItem("All devices", None)
+        self.device_combo.currentIndexChanged.connect(self.change_device)
+        graph_ctrl_layout.addWidget(self.device_combo)
         graph_ctrl_layout.addStretch()
         self.layout.addLayout(graph_ctrl_layout)
 
@@ -110,29 +228,34 @@ class ENouseTab(QWidget):
         self.plot_widget.showGrid(x=True, y=True, alpha=0.3)
         self.plot_widget.addLegend()
         self.layout.addWidget(self.plot_widget)
+        self.plot_widget.getViewBox().sigXRangeChanged.connect(self.on_view_changed)
+        self.frame_probe = FrameProbe("enouse", self.plot_widget)
 
         # --- Data Structures ---
         self.curves = {}
-        self.data_buffer = {
-            "co_mics": [], "eth_mics": [], "voc_mics": [],
-            "no2_gm": [], "c2h5oh_gm": [], "voc_gm": [], "co_gm": []
-        }
-        self.timestamps = []
         self.start_time = 0
-        self.channels = [
-            ("co_mics", "CO (MiCS)", "CO (M)", "#FF5252"),
-            ("eth_mics", "Ethanol (MiCS)", "Eth (M)", "#448AFF"),
-            ("voc_mics", "VOC (MiCS)", "VOC (M)", "#69F0AE"),
-            ("no2_gm", " NO₂ (GM)", "NO₂ (G)", "#FFEB3B"),
-            ("c2h5oh_gm", "Ethanol (GM)", "Eth (G)", "#E040FB"),
-            ("voc_gm", "VOC (GM)", "VOC (G)", "#FFAB40"),
-            ("co_gm", "CO (GM)", "CO (G)", "#FFFFFF")
-        ]
+        self.channels = SENSOR_CHANNELS
 
         for i, (key, label, short_label, color) in enumerate(self.channels):
             curve = self.plot_widget.plot(pen=pg.mkPen(color, width=2), name=label)
             self.curves[key] = curve
 
+        self.channel_cols = [SENSOR_INDEX[key] for key, _, _, _ in self.channels]
+
+        self.spectrum_panel = SpectrumPanel([(short, color) for _, _, short, color in self.channels],
+                                            ENOSE_SAMPLE_RATE, nfft=64)
+        self.spectrum_panel.setVisible(False)
+        self.layout.addWidget(self.spectrum_panel)
+        # Live window (exports, spectrum) + full raw session history, and the
+        # filtered history that is actually plotted (LOD)
+        self.buffer = RingBuffer(MAX_POINTS, len(self.channels))
+        self.history = MinMaxPyramid(len(self.channels))
+        self.display = MinMaxPyramid(len(self.channels))
+        self.filter_chain = FILTER_PRESETS[DEFAULT_PRESET](ENOSE_SAMPLE_RATE)
+        self.resampler = StreamResampler()
+        self.stream_device = None
+        self.scheduler = RenderScheduler(self.render_batch, RENDER_FPS, self)
+
         # --- Controls ---
         ctrl_layout = QHBoxLayout()
         ctrl_layout.addWidget(QLabel("📡 Serial:"))
@@ -177,9 +300,9 @@ class ENouseTab(QWidget):
         btn_save_json.clicked.connect(self.save_json)
         file_layout.addWidget(btn_save_json)
 
-        btn_upload = QPushButton("☁️ Upload Edge Impulse")
-        btn_upload.clicked.connect(self.upload_edge_impulse)
-        file_layout.addWidget(btn_upload)
+        self.btn_upload = QPushButton("☁️ Upload Edge Impulse")
+        self.btn_upload.clicked.connect(self.upload_edge_impulse)
+        file_layout.addWidget(self.btn_upload)
 
         btn_influx = QPushButton("🗄️ Connect InfluxDB")
         btn_influx.clicked.connect(self.connect_influx)
@@ -190,6 +313,28 @@ class ENouseTab(QWidget):
         btn_gnuplot.setStyleSheet("background: #FF9800; color: black;")
         file_layout.addWidget(btn_gnuplot)
 
+        btn_gnuplot_files = QPushButton("📂 Sessions → GNUplot")
+        btn_gnuplot_files.setToolTip("Export recorded sessions as .dat/.gp, with an overlay script for several")
+        btn_gnuplot_files.clicked.connect(self.export_sessions_gnuplot)
+        btn_gnuplot_files.setStyleSheet("background: #FF9800; color: black;")
+        file_layout.addWidget(btn_gnuplot_files)
+        self.export_worker = None
+
+        self.replay_speed = QComboBox()
+        for text, speed in REPLAY_SPEEDS:
+            self.replay_speed.addItem(text, speed)
+        file_layout.addWidget(self.replay_speed)
+
+        self.btn_replay = QPushButton("📼 Replay")
+        self.btn_replay.clicked.connect(self.toggle_replay)
+        file_layout.addWidget(self.btn_replay)
+        self.replay_worker = None
+
+        self.btn_record = QPushButton("⏺️ Record")
+        self.btn_record.clicked.connect(self.toggle_record)
+        file_layout.addWidget(self.btn_record)
+        self.recorder = None
+
         file_layout.addStretch()
         self.layout.addLayout(file_layout)
 
@@ -201,14 +346,20 @@ class ENouseTab(QWidget):
         self.log_display.setStyleSheet("font-family: Consolas; font-size: 11px; background: #0a0a14;")
         self.layout.addWidget(self.log_display)
 
+        # Non-blocking backend calls; callbacks run back on this thread
+        self.api = get_client(API_URL)
+        self.uploader = None
+
         # Initial refresh
         QTimer.singleShot(1000, self.refresh_ports)
 
     # ... (Keep all methods: refresh_ports, connect_serial, start_sampling, etc.)
     
+    def show_error(self, e):
+        QMessageBox.critical(self, "Error", str(e))
+
     def refresh_ports(self):
-        try:
-            res = requests.get(f"{API_URL}/list_serial_ports")
+        def done(res):
             if res.status_code == 200:
                 ports = res.json().get('ports', [])
                 self.serial_combo.clear()
@@ -216,61 +367,67 @@ class ENouseTab(QWidget):
                     self.serial_combo.addItems(ports)
                 else:
                     self.serial_combo.addItem("-- No Ports --")
-        except:
-            pass
+        self.api.get("/list_serial_ports", on_done=done, on_error=lambda e: None)
+        self.refresh_devices()
+
+    def refresh_devices(self):
+        def done(res):
+            if res.status_code != 200: return
+            current = self.device_combo.currentData()
+            devices = [d for d in res.json() if d]
+            self.device_combo.blockSignals(True)
+            self.device_combo.clear()
+            self.device_combo.addItem("All devices", None)
+            for device_id in devices:
+                self.device_combo.addItem(device_id, device_id)
+            self.device_combo.blockSignals(False)
+            if current is None and len(devices) > 1 and self.chk_device_clock.isChecked():
+                # Interleaved ts from several units would look like constant restarts: follow the first
+                self.update_log(f"[INFO] {len(devices)} devices connected, showing {devices[0]}")
+                current = devices[0]
+            index = self.device_combo.findData(current)
+            self.device_combo.setCurrentIndex(max(index, 0))
+            self.change_device()
+        self.api.get("/devices", on_done=done, on_error=lambda e: None)
+
+    def change_device(self, _=None):
+        device_id = self.device_combo.currentData()
+        if device_id == self.stream_device: return
+        self.stream_device = device_id
+        self.clear_plot()
+        self.stream_url_changed.emit(self.stream_url())
+
+    def stream_url(self):
+        url = f"{WS_URL}?format={WS_FORMAT}"
+        return url if self.stream_device is None else f"{url}&device={quote(self.stream_device)}"
 
     def connect_serial(self):
         port = self.serial_combo.currentText()
         if "--" in port: return
-        try:
-            requests.post(f"{API_URL}/connect_serial", json={"port": port})
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        self.api.post("/connect_serial", json={"port": port}, on_error=self.show_error)
 
     def start_sampling(self):
         label = self.label_input.text() or "test"
-        try:
-            requests.post(f"{API_URL}/start", json={"label": label})
-            self.timestamps = []
-            for k in self.data_buffer: self.data_buffer[k] = []
-            for curve in self.curves.values(): curve.setData([], [])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        self.api.post("/start", json={"label": label}, on_done=lambda res: self.clear_plot(), on_error=self.show_error)
 
     def stop_sampling(self):
-        try:
-            requests.post(f"{API_URL}/stop")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        self.api.post("/stop", on_error=self.show_error)
 
     def reset_system(self):
-        try:
-            requests.post(f"{API_URL}/reset")
-            self.timestamps = []
-            for k in self.data_buffer: self.data_buffer[k] = []
-            for curve in self.curves.values(): curve.setData([], [])
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        self.api.post("/reset", on_done=lambda res: self.clear_plot(), on_error=self.show_error)
 
     def save_csv(self):
         path, _ = QFileDialog.getSaveFileName(self, "Save CSV", "", "CSV Files (*.csv)")
         if path:
-            try:
-                requests.post(f"{API_URL}/save_csv", json={"path": path})
-            except Exception as e:
-                QMessageBox.critical(self, "Error", str(e))
+            self.api.post("/save_csv", json={"path": path}, on_error=self.show_error)
 
     def save_json(self):
         path, _ = QFileDialog.getSaveFileName(self, "Save JSON", "", "JSON Files (*.json)")
         if path:
-            try:
-                requests.post(f"{API_URL}/save_json", json={"path": path})
-            except Exception as e:
-                QMessageBox.critical(self, "Error", str(e))
+            self.api.post("/save_json", json={"path": path}, on_error=self.show_error)
 
     def connect_influx(self):
-        try:
-            res = requests.post(f"{API_URL}/connect_influx")
+        def done(res):
             if res.status_code == 200:
                 data = res.json()
                 if data['success']:
@@ -279,180 +436,286 @@ class ENouseTab(QWidget):
                     QMessageBox.critical(self, "Error", data['message'])
             else:
                 QMessageBox.critical(self, "Error", f"HTTP {res.status_code}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        self.api.post("/connect_influx", on_done=done, on_error=self.show_error)
 
     def upload_edge_impulse(self):
-        try:
-            res = requests.get(f"{API_URL}/session_data")
-            if res.status_code != 200:
-                QMessageBox.warning(self, "Error", "Failed to fetch data from backend")
-                return
-            
-            data = res.json()
-            if not data:
-                QMessageBox.warning(self, "Empty", "No data to upload")
-                return
-
-            values = []
-            for row in data:
-                values.append([
-                    row.get('co_mics', 0),
-                    row.get('eth_mics', 0),
-                    row.get('voc_mics', 0),
-                    row.get('no2_gm', 0),
-                    row.get('c2h5oh_gm', 0),
-                    row.get('voc_gm', 0),
-                    row.get('co_gm', 0),
-                ])
-
-            payload = {
-                "protected": {
-                    "ver": "v1",
-                    "alg": "HS256",
-                    "iat": int(datetime.now().timestamp() * 1000)
-                },
-                "signature": "signature_placeholder",
-                "payload": {
-                    "device_name": "e-nouse",
-                    "device_type": "ENOSE",
-                    "interval_ms": 250,
-                    "sensors": [
-                        {"name": "co_mics", "units": "ppm"},
-                        {"name": "eth_mics", "units": "ppm"},
-                        {"name": "voc_mics", "units": "ppm"},
-                        {"name": "no2_gm", "units": "ppm"},
-                        {"name": "c2h5oh_gm", "units": "ppm"},
-                        {"name": "voc_gm", "units": "ppm"},
-                        {"name": "co_gm", "units": "ppm"}
-                    ],
-                    "values": values
-                }
-            }
-
-            filename = f"sample_{int(datetime.now().timestamp())}.json"
-            label = self.label_input.text() or "unknown"
-            
-            ei_res = requests.post(
-                EDGE_IMPULSE_URL,
-                headers={
-                    "Content-Type": "application/json",
-                    "x-api-key": EDGE_IMPULSE_API_KEY,
-                    "x-file-name": filename,
-                    "x-label": label
-                },
-                json=payload
-            )
-            
-            if ei_res.status_code == 200:
-                QMessageBox.information(self, "Success", f"Uploaded {len(values)} samples to Edge Impulse!")
-            else:
-                QMessageBox.critical(self, "Upload Failed", ei_res.text)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        if self.uploader is not None:
+            self.uploader.cancel()
+            self.btn_upload.setEnabled(False)
+            return
+        label = self.label_input.text() or "unknown"
+        self.uploader = UploadWorker(API_URL, EDGE_IMPULSE_URL, EDGE_IMPULSE_API_KEY, label)
+        self.uploader.log_received.connect(self.update_log)
+        self.uploader.progress.connect(self.upload_progress)
+        self.uploader.upload_finished.connect(self.upload_finished)
+        self.btn_upload.setText("⏹ Cancel Upload")
+        self.update_log(f"[INFO] Uploading session to Edge Impulse as '{label}'...")
+        self.uploader.start()
+
+    @Slot(object)
+    def upload_progress(self, stats):
+        self.btn_upload.setText(f"⏹ Cancel Upload ({stats['uploaded']}/{stats['windows']})")
+
+    @Slot(object)
+    def upload_finished(self, stats):
+        self.uploader.wait()
+        self.uploader = None
+        self.btn_upload.setText("☁️ Upload Edge Impulse")
+        self.btn_upload.setEnabled(True)
+        if "error" in stats:
+            QMessageBox.critical(self, "Upload Failed", stats["error"])
+        elif not stats["windows"]:
+            QMessageBox.warning(self, "Empty", "No data to upload")
+        elif stats["failed"]:
+            QMessageBox.warning(self, "Upload Incomplete",
+                                f"{stats['failed']} of {stats['windows']} samples failed. "
+                                "Upload again to resume where it stopped.")
+        else:
+            self.update_log(f"[INFO] Uploaded {stats['samples']} readings as {stats['uploaded']} samples "
+                            f"({stats['skipped']} already uploaded, {stats['retries']} retries) "
+                            f"in {stats['seconds']:.1f} s")
+            if stats["uploaded"] + stats["skipped"] == stats["windows"]:
+                QMessageBox.information(self, "Success", f"Uploaded {stats['windows']} samples to Edge Impulse!")
 
     def save_gnuplot(self):
-        if not self.timestamps:
+        if not len(self.buffer):
             QMessageBox.warning(self, "Warning", "No data to save!")
             return
 
         path, _ = QFileDialog.getSaveFileName(self, "Save GNUplot Data", "", "Data Files (*.dat)")
         if not path: return
 
-        try:
+        import os
+        dat_file = f"{os.path.splitext(path)[0]}.dat"
+        # Snapshot the live window; the worker formats and writes it
+        table = np.column_stack((self.buffer.times(), self.buffer.values().T))
+        self.start_export([(table, dat_file)])
+
+    def export_sessions_gnuplot(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Export Sessions to GNUplot", "", RECORDING_FILTER)
+        if not paths: return
+        out_dir = QFileDialog.getExistingDirectory(self, "Output Folder")
+        if not out_dir: return
+
+        import os
+        dat_files = output_paths(paths, out_dir)
+        overlay = os.path.join(out_dir, "overlay.gp") if len(paths) > 1 else None
+        existing = existing_outputs(dat_files, overlay)
+        if existing:
+            names = "\n".join(os.path.basename(p) for p in existing[:10]) + ("\n..." if len(existing) > 10 else "")
+            answer = QMessageBox.question(self, "Overwrite Files?",
+                                          f"{len(existing)} file(s) in the output folder will be replaced:\n{names}")
+            if answer != QMessageBox.Yes: return
+        self.start_export(list(zip(paths, dat_files)), overlay)
+
+    def start_export(self, jobs, overlay=None):
+        if self.export_worker is not None:
+            QMessageBox.warning(self, "Busy", "A GNUplot export is still running.")
+            return
+        self.export_worker = ExportWorker(jobs, overlay)
+        self.export_worker.log_received.connect(self.update_log)
+        self.export_worker.progress.connect(self.export_progress)
+        self.export_worker.export_finished.connect(self.export_finished)
+        self.export_worker.start()
+
+    @Slot(int, int)
+    def export_progress(self, done, total):
+        self.state_label.setText(f"💾 Exporting GNUplot: {100 * done // max(total, 1)}%")
+
+    @Slot(object)
+    def export_finished(self, result):
+        self.export_worker.wait()
+        self.export_worker = None
+        if result["error"]:
+            QMessageBox.critical(self, "Error", f"Failed to save GNUplot files: {result['error']}")
+        elif result["outputs"]:
             import os
-            base_name = os.path.splitext(path)[0]
-            dat_file = f"{base_name}.dat"
-            gp_file = f"{base_name}.gp"
-            
-            # 1. Save Data to .dat file
-            with open(dat_file, 'w', encoding='utf-8') as f:
-                # Header
-                headers = ["Time"] + [c[2] for c in self.channels] # Use short labels
-                f.write("# " + " ".join(headers).replace(" ", "_") + "\n")
-                
-                # Data
-                # Ensure all buffers have same length as timestamps
-                min_len = len(self.timestamps)
-                for k in self.data_buffer:
-                    min_len = min(min_len, len(self.data_buffer[k]))
-                
-                for i in range(min_len):
-                    row = [f"{self.timestamps[i]:.4f}"]
-                    for k, _, _, _ in self.channels:
-                        val = self.data_buffer[k][i] if i < len(self.data_buffer[k]) else 0
-                        row.append(f"{val:.4f}")
-                    f.write(" ".join(row) + "\n")
-            
-            # 2. Create GNUplot Script .gp
-            with open(gp_file, 'w', encoding='utf-8') as f:
-                plot_cmds = []
-                for i, (_, _, label, color) in enumerate(self.channels):
-                    # Column 1 is Time, so data starts at Column 2
-                    col_idx = i + 2
-                    plot_cmds.append(f'"{os.path.basename(dat_file)}" using 1:{col_idx} with lines title "{label}" lc rgb "{color}" lw 2')
-                
-                plot_cmd_str = ", \\\n     ".join(plot_cmds)
-
-                f.write(f"""
-set title "E-Nouse Data: {os.path.basename(base_name)}"
-set xlabel "Time (s)"
-set ylabel "Sensor Value"
-set grid
-set key outside
-set term wxt size 1000,600 persist
-plot {plot_cmd_str}
-pause mouse close
-""")
-            
-            QMessageBox.information(self, "Success", f"Saved:\n{dat_file}\n{gp_file}\n\nYou can run it with: gnuplot {os.path.basename(gp_file)}")
-            
+            scripts = [p for p in result["outputs"] if p.endswith(".gp")]
+            QMessageBox.information(self, "Success", "Saved:\n" + "\n".join(result["outputs"]) +
+                                    f"\n\nYou can run it with: gnuplot {os.path.basename(scripts[-1])}")
+
+    def toggle_classifier(self, checked):
+        self.aroma_label.setVisible(checked)
+        if not checked:
+            self.live_classifier = None
+            return
+        if self.aroma_model is not None:
+            self.live_classifier = LiveClassifier(self.aroma_model)
+            self.aroma_label.setText("🧠 Aroma: —")
+        elif self.train_worker is None:
+            # Loads the cached model, or trains one from the gui/ recordings
+            self.aroma_label.setText("🧠 Aroma: training...")
+            self.train_worker = TrainWorker()
+            self.train_worker.log_received.connect(self.update_log)
+            self.train_worker.model_ready.connect(self.on_model_ready)
+            self.train_worker.start()
+
+    @Slot(object)
+    def on_model_ready(self, model):
+        self.train_worker.wait()
+        self.train_worker = None
+        self.aroma_model = model
+        if model is None:
+            self.btn_classify.setChecked(False)
+            QMessageBox.critical(self, "Error", "Could not train the aroma model, see the log.")
+        elif self.btn_classify.isChecked():
+            self.toggle_classifier(True)
+
+    def clear_plot(self):
+        if self.live_classifier is not None:
+            self.live_classifier.reset()
+            self.aroma_label.setText("🧠 Aroma: —")
+        self.buffer.clear()
+        self.history.clear()
+        self.display.clear()
+        self.filter_chain.reset()
+        self.resampler.reset()
+        self.scheduler.clear()
+        self.spectrum_panel.reset()
+        for curve in self.curves.values(): curve.setData([], [])
+
+    def change_filter(self, name):
+        # Re-run the new chain offline over the raw history so the whole session is redrawn
+        self.filter_chain = FILTER_PRESETS[name](ENOSE_SAMPLE_RATE)
+        self.display.clear()
+        if len(self.history):
+            self.display.extend(self.history.times(), self.filter_chain.process(self.history.values().T))
+            self.redraw()
+
+    def toggle_spectrum(self, checked):
+        # Hidden panels are not fed; on show, prime them from the live window
+        self.spectrum_panel.setVisible(checked)
+        if checked:
+            self.spectrum_panel.reset()
+            self.spectrum_panel.extend(self.buffer.values().T)
+            self.spectrum_panel.refresh()
+
+    def toggle_replay(self):
+        if self.replay_worker is not None:
+            self.replay_worker.stop()
+            return
+
+        path, _ = QFileDialog.getOpenFileName(self, "Replay Session", "", RECORDING_FILTER)
+        if not path: return
+
+        self.clear_plot()
+        self.replay_worker = ReplayWorker(path, self.replay_speed.currentData())
+        self.replay_worker.batch_received.connect(self.update_batch)
+        self.replay_worker.log_received.connect(self.update_log)
+        self.replay_worker.finished.connect(self.on_replay_finished)
+        self.replay_worker.start()
+        self.btn_replay.setText("⏏️ Stop Replay")
+
+    def toggle_record(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.update_log(f"Recorded {self.recorder.rows} samples to {self.recorder.path}")
+            self.recorder = None
+            self.btn_record.setText("⏺️ Record")
+            return
+
+        path, _ = QFileDialog.getSaveFileName(self, "Record Stream", "",
+                                              "JSON Lines (*.jsonl);;CSV Files (*.csv);;JSON Files (*.json)")
+        if not path: return
+        try:
+            self.recorder = StreamRecorder(path)
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to save GNUplot files: {str(e)}")
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        self.btn_record.setText("⏹️ Stop Recording")
 
+    @Slot()
+    def on_replay_finished(self):
+        if self.sender() is self.replay_worker:
+            self.replay_worker = None
+            self.btn_replay.setText("📼 Replay")
+
+    @Slot(object)
+    def update_live_batch(self, batch):
+        if PROBES.enabled:
+            self.frame_probe.received(PROBES.received("enouse"))
+        # The live stream is muted while a recording is replaying
+        if self.replay_worker is None:
+            self.update_batch(batch)
 
     @Slot(dict)
     def update_graph(self, data):
-        co_val = data.get('co_mics', 0)
-        self.state_label.setText(f"🔄 State: {data.get('state', 'UNKNOWN')} | CO (MiCS): {co_val:.4f}")
-        
-        current_time = datetime.now().timestamp()
-        if not self.timestamps:
-            self.start_time = current_time
-            rel_time = 0
+        self.update_batch(records_to_array([data]))
+
+    @Slot(object)
+    def update_batch(self, batch):
+        if self.recorder is not None:
+            self.recorder.write(batch)
+        # Stamp on arrival; plotting happens once per frame in render_batch
+        self.scheduler.submit((datetime.now().timestamp(), batch), len(batch))
+
+    def render_batch(self, items):
+        arrivals = np.concatenate([np.full(len(batch), t) for t, batch in items])
+        block = np.concatenate([batch for _, batch in items])
+
+        last = block[-1]
+        co_val = last[SENSOR_INDEX['co_mics']]
+        self.state_label.setText(f"🔄 State: {state_name(last[SENSOR_INDEX['state']])} | CO (MiCS): {co_val:.4f}")
+
+        t0 = PROBES.start()
+        if self.chk_device_clock.isChecked():
+            # Uniform grid on the device ts: jitter, repeats and restarts no longer bend the time axis
+            rel_times, block = self.resampler.push(block)
         else:
-            rel_time = current_time - self.start_time
-        
-        self.timestamps.append(rel_time)
-        if len(self.timestamps) > 10000: self.timestamps.pop(0)
-
+            if not len(self.buffer):
+                self.start_time = arrivals[0]
+            rel_times = arrivals - self.start_time
+        values = block[:, self.channel_cols]
+        self.buffer.extend(rel_times, values)
+        self.history.extend(rel_times, values)
+        self.display.extend(rel_times, self.filter_chain.process(values))
+        PROBES.stop("enouse.update_ms", t0)
+
+        if self.live_classifier is not None:
+            scored = self.live_classifier.push(block)
+            if scored is not None:
+                label, confidence, latency_ms = scored
+                self.aroma_label.setText(f"🧠 Aroma: {label} ({confidence:.0%})")
+                if PROBES.enabled:
+                    PROBES.record("enouse.classify_ms", latency_ms)
+
+        t0 = PROBES.start()
+        self.redraw()
+        if self.spectrum_panel.isVisible():
+            self.spectrum_panel.extend(values)
+            self.spectrum_panel.render()
+        PROBES.stop("enouse.render_ms", t0)
+        if PROBES.enabled:
+            self.frame_probe.drawn(last[SENSOR_INDEX['ts']])
+
+    def redraw(self):
         spacing = self.spin_spacing.value()
         gain = self.spin_gain.value()
 
+        # Draw about one min/max pair per screen pixel of the visible range
+        vb = self.plot_widget.getViewBox()
+        if vb.autoRangeEnabled()[0]:
+            t0, t1 = -np.inf, np.inf
+        else:
+            t0, t1 = vb.viewRange()[0]
+        times, values = self.display.query(t0, t1, max(int(vb.width()), 100))
+
         for i, (key, _, _, _) in enumerate(self.channels):
-            val = data.get(key, 0)
-            self.data_buffer[key].append(val)
-            if len(self.data_buffer[key]) > 10000: 
-                self.data_buffer[key].pop(0)
-            
-            if self.data_buffer[key]:
-                baseline = min(self.data_buffer[key])
-            else:
-                baseline = 0
-            
             offset = (len(self.channels) - 1 - i) * spacing
-            display_data = [((v - baseline) * gain) + offset for v in self.data_buffer[key]]
-            self.curves[key].setData(self.timestamps, display_data)
+            self.curves[key].setData(times, values[i] * gain + offset)
+
+    @Slot()
+    def on_view_changed(self):
+        # Zoom/pan by the user: re-query the pyramid at the new resolution
+        if len(self.history) and not self.plot_widget.getViewBox().autoRangeEnabled()[0]:
+            self.redraw()
 
     @Slot()
     def auto_spacing(self):
         max_amplitude = 0
-        for key in self.data_buffer:
-            if self.data_buffer[key]:
-                amp = max(self.data_buffer[key]) - min(self.data_buffer[key])
-                if amp > max_amplitude:
-                    max_amplitude = amp
+        if len(self.display):
+            recent = self.display.values()[:, -MAX_POINTS:]
+            max_amplitude = float(np.max(recent.max(axis=1) - recent.min(axis=1)))
         
         if max_amplitude > 0:
             gain = self.spin_gain.value()
@@ -513,6 +776,18 @@ class SimulationTab(QWidget):
         grp_s2.setLayout(l2)
         ctrl_layout.addWidget(grp_s2)
 
+        # Source: backend stream or the local NumPy engine
+        src_layout = QFormLayout()
+        self.source_combo = QComboBox()
+        self.source_combo.addItems(["Backend", "Local"])
+        self.source_combo.currentIndexChanged.connect(self.change_source)
+        src_layout.addRow("Source:", self.source_combo)
+        self.rate_spin = QDoubleSpinBox(); self.rate_spin.setRange(1, 10000); self.rate_spin.setDecimals(0)
+        self.rate_spin.setValue(DEFAULT_SAMPLE_RATE); self.rate_spin.setSuffix(" Hz")
+        self.rate_spin.valueChanged.connect(self.change_rate)
+        src_layout.addRow("Sample rate:", self.rate_spin)
+        ctrl_layout.addLayout(src_layout)
+
         self.layout.addLayout(ctrl_layout)
 
         # --- Action Buttons ---
@@ -530,6 +805,11 @@ class SimulationTab(QWidget):
         btn_stop.clicked.connect(self.stop_sim)
         btn_stop.setStyleSheet("background: #FF5252; color: white;")
         btn_layout.addWidget(btn_stop)
+
+        self.btn_spectrum = QPushButton("📊 Spectrum")
+        self.btn_spectrum.setCheckable(True)
+        self.btn_spectrum.toggled.connect(self.toggle_spectrum)
+        btn_layout.addWidget(self.btn_spectrum)
         self.layout.addLayout(btn_layout)
 
         # --- Save Buttons ---
@@ -541,6 +821,11 @@ class SimulationTab(QWidget):
         btn_save_json = QPushButton("💾 Save JSON")
         btn_save_json.clicked.connect(self.save_json)
         save_layout.addWidget(btn_save_json)
+
+        self.btn_record = QPushButton("⏺️ Record")
+        self.btn_record.clicked.connect(self.toggle_record)
+        save_layout.addWidget(self.btn_record)
+        self.recorder = None
         
         self.layout.addLayout(save_layout)
 
@@ -549,6 +834,8 @@ class SimulationTab(QWidget):
         self.plot_layout = pg.GraphicsLayoutWidget()
         self.plot_layout.setBackground('#000000')
         self.layout.addWidget(self.plot_layout)
+        # Sim samples carry time in seconds
+        self.frame_probe = FrameProbe("sim", self.plot_layout, ts_scale=1.0)
 
         # Plot 1: Signal 1
         self.p1 = self.plot_layout.addPlot(row=0, col=0, title="Signal 1")
@@ -566,60 +853,100 @@ class SimulationTab(QWidget):
         self.p3.showGrid(x=True, y=True, alpha=0.3)
         self.curve3 = self.p3.plot(pen=pg.mkPen('#E040FB', width=2))
         self.p3.setXLink(self.p1)
-
-        # Data Buffers
-        self.times = []
-        self.data1 = []
-        self.data2 = []
-        self.data3 = []
+        for p in (self.p1, self.p2, self.p3):
+            p.setClipToView(True)
+            p.setDownsampling(auto=True, mode='peak')
+
+        self.spectrum_panel = SpectrumPanel([("Signal 1", '#448AFF'), ("Signal 2", '#69F0AE'), ("Result", '#E040FB')],
+                                            SIM_BACKEND_RATE)
+        self.spectrum_panel.setVisible(False)
+        self.layout.addWidget(self.spectrum_panel)
+
+        # Data Buffers (time + signal1, signal2, result)
+        self.buffer = RingBuffer(SIM_MAX_POINTS, 3)
+        self.scheduler = RenderScheduler(self.render_batch, RENDER_FPS, self)
+
+        # Local engine, advanced by wall clock once per render frame
+        self.engine = SimEngine(DEFAULT_SAMPLE_RATE)
+        self.api = get_client(API_URL)
+        self.local_timer = QTimer(self)
+        self.local_timer.timeout.connect(self.local_tick)
+        self.local_t0 = 0.0
+
+    def is_local(self):
+        return self.source_combo.currentIndex() == 1
+
+    def read_params(self):
+        signal1 = {"amplitude": self.s1_amp.value(), "frequency": self.s1_freq.value(), "phase": self.s1_phase.value()}
+        signal2 = {"amplitude": self.s2_amp.value(), "frequency": self.s2_freq.value(), "phase": self.s2_phase.value()}
+        return signal1, signal2, OPERATIONS[self.op_combo.currentIndex()]
+
+    def local_buffer_size(self):
+        return max(SIM_MAX_POINTS, int(self.rate_spin.value() * SIM_WINDOW_SECONDS))
+
+    def sample_rate(self):
+        return self.rate_spin.value() if self.is_local() else SIM_BACKEND_RATE
+
+    def change_source(self, index):
+        # Switching source stops the other one so the plots never mix streams
+        if self.local_timer.isActive():
+            self.local_timer.stop()
+        self.buffer = RingBuffer(self.local_buffer_size() if self.is_local() else SIM_MAX_POINTS, 3)
+        self.scheduler.clear()
+        self.spectrum_panel.set_sample_rate(self.sample_rate())
+        self.spectrum_panel.reset()
+
+    def change_rate(self, value):
+        self.engine.set_sample_rate(value)
+        if self.is_local():
+            self.buffer = RingBuffer(self.local_buffer_size(), 3)
+            self.spectrum_panel.set_sample_rate(value)
+
+    def toggle_spectrum(self, checked):
+        self.spectrum_panel.setVisible(checked)
+        if checked:
+            self.spectrum_panel.reset()
+            self.spectrum_panel.extend(self.buffer.values().T)
+            self.spectrum_panel.refresh()
 
     def update_params(self):
-        op_map = {0: "Add", 1: "Subtract", 2: "Multiply"}
-        payload = {
-            "signal1": {
-                "amplitude": self.s1_amp.value(),
-                "frequency": self.s1_freq.value(),
-                "phase": self.s1_phase.value()
-            },
-            "signal2": {
-                "amplitude": self.s2_amp.value(),
-                "frequency": self.s2_freq.value(),
-                "phase": self.s2_phase.value()
-            },
-            "operation": op_map[self.op_combo.currentIndex()]
-        }
-        try:
-            requests.post(f"{API_URL}/sim/params", json=payload)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        signal1, signal2, operation = self.read_params()
+        if self.is_local():
+            self.engine.set_params(signal1, signal2, operation)
+            return
+        payload = {"signal1": signal1, "signal2": signal2, "operation": operation}
+        self.api.post("/sim/params", json=payload, on_error=self.show_error)
+
+    def show_error(self, e):
+        QMessageBox.critical(self, "Error", str(e))
 
     def start_sim(self):
-        try:
-            requests.post(f"{API_URL}/sim/start")
-            self.times = []
-            self.data1 = []
-            self.data2 = []
-            self.data3 = []
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        if self.is_local():
+            self.engine.set_params(*self.read_params())
+            self.engine.reset()
+            self.clear_sim()
+            self.local_t0 = time.perf_counter()
+            self.local_timer.start(int(1000 / RENDER_FPS))
+            return
+        self.api.post("/sim/start", on_done=lambda res: self.clear_sim(), on_error=self.show_error)
+
+    def clear_sim(self):
+        self.buffer.clear()
+        self.scheduler.clear()
+        self.spectrum_panel.reset()
 
     def stop_sim(self):
-        try:
-            requests.post(f"{API_URL}/sim/stop")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        if self.is_local():
+            self.local_timer.stop()
+            return
+        self.api.post("/sim/stop", on_error=self.show_error)
 
     def save_csv(self):
         path, _ = QFileDialog.getSaveFileName(self, "Save Simulation CSV", "", "CSV Files (*.csv)")
         if not path: return
         try:
-            import csv
-            with open(path, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Time", "Signal1", "Signal2", "Result"])
-                for i in range(len(self.times)):
-                    writer.writerow([self.times[i], self.data1[i], self.data2[i], self.data3[i]])
-            QMessageBox.information(self, "Success", f"Saved {len(self.times)} points to CSV")
+            self.export_window(path, SIM_CSV_COLUMNS)
+            QMessageBox.information(self, "Success", f"Saved {len(self.buffer)} points to CSV")
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
 
@@ -627,39 +954,237 @@ class SimulationTab(QWidget):
         path, _ = QFileDialog.getSaveFileName(self, "Save Simulation JSON", "", "JSON Files (*.json)")
         if not path: return
         try:
-            data = []
-            for i in range(len(self.times)):
-                data.append({
-                    "time": self.times[i],
-                    "signal1": self.data1[i],
-                    "signal2": self.data2[i],
-                    "result": self.data3[i]
-                })
-            with open(path, 'w') as f:
-                json.dump(data, f, indent=2)
-            QMessageBox.information(self, "Success", f"Saved {len(self.times)} points to JSON")
+            self.export_window(path, SIM_JSON_COLUMNS)
+            QMessageBox.information(self, "Success", f"Saved {len(self.buffer)} points to JSON")
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
 
 
+    def export_window(self, path, columns):
+        recorder = StreamRecorder(path, columns)
+        recorder.write(np.column_stack((self.buffer.times(), self.buffer.values().T)))
+        recorder.close()
+
+    def toggle_record(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            QMessageBox.information(self, "Success", f"Recorded {self.recorder.rows} points to {self.recorder.path}")
+            self.recorder = None
+            self.btn_record.setText("⏺️ Record")
+            return
+
+        path, _ = QFileDialog.getSaveFileName(self, "Record Simulation", "",
+                                              "CSV Files (*.csv);;JSON Lines (*.jsonl);;JSON Files (*.json)")
+        if not path: return
+        columns = SIM_CSV_COLUMNS if path.lower().endswith(".csv") else SIM_JSON_COLUMNS
+        try:
+            self.recorder = StreamRecorder(path, columns)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        self.btn_record.setText("⏹️ Stop Recording")
+
     @Slot(dict)
     def update_graph(self, data):
         # data = {time, x1, x2, y}
-        t = data.get('time', 0)
-        self.times.append(t)
-        self.data1.append(data.get('x1', 0))
-        self.data2.append(data.get('x2', 0))
-        self.data3.append(data.get('y', 0))
+        self.update_batch(records_to_array([data], SIM_FIELDS))
+
+    def local_tick(self):
+        block = self.engine.generate_until(time.perf_counter() - self.local_t0)
+        if len(block):
+            self.update_batch(block)
+
+    @Slot(object)
+    def update_remote_batch(self, batch):
+        if PROBES.enabled:
+            self.frame_probe.received(PROBES.received("sim"))
+        # Backend stream is ignored while the local engine is selected
+        if not self.is_local():
+            self.update_batch(batch)
+
+    @Slot(object)
+    def update_batch(self, batch):
+        if self.recorder is not None:
+            self.recorder.write(batch)
+        self.scheduler.submit(batch, len(batch))
+
+    def render_batch(self, batches):
+        t0 = PROBES.start()
+        block = np.concatenate(batches)
+        self.buffer.extend(block[:, 0], block[:, 1:4])
+        PROBES.stop("sim.update_ms", t0)
+
+        t0 = PROBES.start()
+        times = self.buffer.times()
+        self.curve1.setData(times, self.buffer.channel(0))
+        self.curve2.setData(times, self.buffer.channel(1))
+        self.curve3.setData(times, self.buffer.channel(2))
+        if self.spectrum_panel.isVisible():
+            self.spectrum_panel.extend(block[:, 1:4])
+            self.spectrum_panel.render()
+        PROBES.stop("sim.render_ms", t0)
+        if PROBES.enabled:
+            self.frame_probe.drawn(block[-1, 0])
+
+
+class DevicePlot:
+    """Buffers and curves of one device in DevicesTab."""
+
+    def __init__(self, device_id, plot):
+        self.device_id = device_id
+        self.plot = plot
+        self.curves = [plot.plot(pen=pg.mkPen(color, width=1)) for _, _, _, color in SENSOR_CHANNELS]
+        self.cols = [SENSOR_INDEX[key] for key, _, _, _ in SENSOR_CHANNELS]
+        self.buffer = RingBuffer(DEVICE_MAX_POINTS, len(SENSOR_CHANNELS))
+        self.filter_chain = FILTER_PRESETS[DEFAULT_PRESET](ENOSE_SAMPLE_RATE)
+        self.start_time = None
+        self.samples = 0
+        self.connected = False
+        self.state = "-"
+        self.title = None
+        self.update_title()
+
+    def update_title(self):
+        # Title layout is costly, so it only changes with the state/connection
+        dot = "🟢" if self.connected else "🔴"
+        title = f"{dot} {self.device_id} | {self.state}"
+        if title != self.title:
+            self.title = title
+            self.plot.setTitle(title)
+
+    def extend(self, arrivals, block):
+        if self.start_time is None:
+            self.start_time = arrivals[0]
+        self.buffer.extend(arrivals - self.start_time, self.filter_chain.process(block[:, self.cols]))
+        self.samples += len(block)
+        self.state = state_name(block[-1, SENSOR_INDEX['state']])
+
+    def redraw(self):
+        times = self.buffer.times()
+        for i, curve in enumerate(self.curves):
+            curve.setData(times, self.buffer.channel(i))
+        self.update_title()
+
+
+class DevicesTab(QWidget):
+    """Side-by-side view of several e-nose units, keyed by device id.
+
+    All device sockets share one DeviceHub thread; all plots share one
+    RenderScheduler, so each frame redraws only the devices that received data.
+    """
+    # Connection warnings from the hub, for the backend log panel
+    log_received = Signal(str)
 
-        if len(self.times) > 500:
-            self.times.pop(0)
-            self.data1.pop(0)
-            self.data2.pop(0)
-            self.data3.pop(0)
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.layout = QVBoxLayout(self)
 
-        self.curve1.setData(self.times, self.data1)
-        self.curve2.setData(self.times, self.data2)
-        self.curve3.setData(self.times, self.data3)
+        header = QLabel("🛰️ MULTI-DEVICE VIEW")
+        header.setStyleSheet("font-size: 20px; font-weight: bold; color: #4FC3F7; padding: 10px;")
+        self.layout.addWidget(header)
+
+        ctrl_layout = QHBoxLayout()
+        ctrl_layout.addWidget(QLabel("Device:"))
+        self.device_input = QLineEdit()
+        self.device_input.setPlaceholderText("device id, or ws://host:port/ws for another backend")
+        self.device_input.returnPressed.connect(self.add_from_input)
+        ctrl_layout.addWidget(self.device_input)
+
+        btn_add = QPushButton("➕ Add")
+        btn_add.clicked.connect(self.add_from_input)
+        ctrl_layout.addWidget(btn_add)
+
+        btn_discover = QPushButton("🔎 Discover")
+        btn_discover.clicked.connect(self.discover)
+        ctrl_layout.addWidget(btn_discover)
+
+        self.device_combo = QComboBox()
+        ctrl_layout.addWidget(self.device_combo)
+        btn_remove = QPushButton("➖ Remove")
+        btn_remove.clicked.connect(lambda: self.remove_device(self.device_combo.currentText()))
+        ctrl_layout.addWidget(btn_remove)
+        self.layout.addLayout(ctrl_layout)
+
+        self.plot_layout = pg.GraphicsLayoutWidget()
+        self.plot_layout.setBackground('#000000')
+        self.layout.addWidget(self.plot_layout)
+
+        self.devices = {}
+        self.scheduler = RenderScheduler(self.render_batch, DEVICE_RENDER_FPS, self)
+        self.hub = DeviceHub(SENSOR_FIELDS)
+        self.hub.batch_received.connect(self.update_batch)
+        self.hub.status_changed.connect(self.update_status)
+        self.hub.log_received.connect(self.log_received)
+
+    def add_from_input(self):
+        text = self.device_input.text().strip()
+        if not text: return
+        self.device_input.clear()
+        if text.startswith(("ws://", "wss://")):
+            sep = "&" if "?" in text else "?"
+            url = text if "format=" in text else f"{text}{sep}format={WS_FORMAT}"
+            self.add_device(urlparse(text).netloc, url)
+        else:
+            self.add_device(text)
+
+    def add_device(self, device_id, url=None):
+        if device_id in self.devices: return
+        url = url or f"{WS_URL}?format={WS_FORMAT}&device={quote(device_id)}"
+        n = len(self.devices)
+        plot = self.plot_layout.addPlot(row=n // DEVICE_COLUMNS, col=n % DEVICE_COLUMNS)
+        plot.setClipToView(True)
+        plot.setDownsampling(auto=True, mode='peak')
+        self.devices[device_id] = DevicePlot(device_id, plot)
+        self.device_combo.addItem(device_id)
+        self.hub.add_device(device_id, url)
+        if not self.hub.isRunning():
+            self.hub.start()
+
+    def remove_device(self, device_id):
+        view = self.devices.pop(device_id, None)
+        if view is None: return
+        self.hub.remove_device(device_id)
+        self.device_combo.removeItem(self.device_combo.findText(device_id))
+        # Re-flow the remaining plots into the grid
+        self.plot_layout.clear()
+        for i, view in enumerate(self.devices.values()):
+            self.plot_layout.addItem(view.plot, row=i // DEVICE_COLUMNS, col=i % DEVICE_COLUMNS)
+
+    def discover(self):
+        def done(res):
+            if not res.ok:
+                self.log_received.emit(f"[ERROR] Device discovery failed: HTTP {res.status_code}")
+                return
+            for device_id in res.json():
+                self.add_device(device_id)
+        get_client(API_URL).get("/devices", on_done=done,
+                                on_error=lambda e: QMessageBox.critical(self, "Error", str(e)))
+
+    @Slot(str, bool)
+    def update_status(self, device_id, connected):
+        view = self.devices.get(device_id)
+        if view is not None:
+            view.connected = connected
+            view.update_title()
+
+    @Slot(str, object)
+    def update_batch(self, device_id, batch):
+        self.scheduler.submit((device_id, time.time(), batch), len(batch))
+
+    def render_batch(self, items):
+        grouped = {}
+        for device_id, t, batch in items:
+            grouped.setdefault(device_id, []).append((t, batch))
+        for device_id, parts in grouped.items():
+            view = self.devices.get(device_id)
+            if view is None: continue
+            arrivals = np.concatenate([np.full(len(batch), t) for t, batch in parts])
+            view.extend(arrivals, np.concatenate([batch for _, batch in parts]))
+            view.redraw()
+
+    def stop(self):
+        self.hub.stop()
+        self.hub.wait(2000)
 
 
 class MainWindow(QMainWindow):
@@ -703,26 +1228,65 @@ class MainWindow(QMainWindow):
         # Tabs
         self.enouse_tab = ENouseTab()
         self.sim_tab = SimulationTab()
+        self.devices_tab = DevicesTab()
+        self.devices_tab.log_received.connect(self.enouse_tab.update_log)
         
         self.tabs.addTab(self.enouse_tab, "👃 E-Nouse Visualizer")
         self.tabs.addTab(self.sim_tab, "📈 Signal Simulation")
+        self.tabs.addTab(self.devices_tab, "🛰️ Devices")
+
+        # --- Performance probes (off unless toggled or ENOUSE_PROBES=1) ---
+        self.probe_overlay = ProbeOverlay(self.tabs)
+        perf_corner = QWidget()
+        perf_layout = QHBoxLayout(perf_corner)
+        perf_layout.setContentsMargins(0, 0, 0, 0)
+        self.btn_perf = QPushButton("📊 Perf")
+        self.btn_perf.setCheckable(True)
+        self.btn_perf.setToolTip("Time the live data path and show the results over the plots")
+        self.btn_perf.toggled.connect(self.toggle_probes)
+        perf_layout.addWidget(self.btn_perf)
+        btn_perf_export = QPushButton("💾")
+        btn_perf_export.setToolTip("Export probe histograms (JSON or CSV)")
+        btn_perf_export.clicked.connect(self.export_probes)
+        perf_layout.addWidget(btn_perf_export)
+        self.tabs.setCornerWidget(perf_corner)
+        self.btn_perf.setChecked(PROBES.enabled)
+        self.probe_overlay.set_active(PROBES.enabled)
 
         # Workers
-        self.data_worker = WebSocketWorker(WS_URL, is_log=False)
-        self.data_worker.data_received.connect(self.enouse_tab.update_graph)
+        self.data_worker = WebSocketWorker(self.enouse_tab.stream_url(), fields=SENSOR_FIELDS, probe="enouse")
+        self.data_worker.batch_received.connect(self.enouse_tab.update_live_batch)
+        self.enouse_tab.stream_url_changed.connect(self.data_worker.set_url)
         self.data_worker.start()
 
         self.log_worker = WebSocketWorker(WS_LOG_URL, is_log=True)
         self.log_worker.log_received.connect(self.enouse_tab.update_log)
         self.log_worker.start()
 
-        self.sim_worker = WebSocketWorker(WS_SIM_URL, is_log=False)
-        self.sim_worker.data_received.connect(self.sim_tab.update_graph)
+        self.sim_worker = WebSocketWorker(f"{WS_SIM_URL}?format={WS_FORMAT}", fields=SIM_FIELDS, probe="sim")
+        self.sim_worker.batch_received.connect(self.sim_tab.update_remote_batch)
         self.sim_worker.start()
 
         # Initial refresh
         QTimer.singleShot(1000, self.enouse_tab.refresh_ports)
 
+    def toggle_probes(self, checked):
+        PROBES.set_enabled(checked)
+        self.probe_overlay.set_active(checked)
+
+    def export_probes(self):
+        if not PROBES.hists:
+            QMessageBox.warning(self, "Warning", "No probe data yet. Enable 📊 Perf first.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Probe Data", "enouse_probes.json",
+                                              "JSON Files (*.json);;CSV Files (*.csv)")
+        if not path: return
+        try:
+            PROBES.export(path)
+            QMessageBox.information(self, "Success", f"Saved {path}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export probes: {str(e)}")
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MainWindow()
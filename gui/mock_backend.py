@@ -0,0 +1,124 @@
+import base64
+import hashlib
+import socketserver
+import struct
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+import json
+import numpy as np
+from sensor_frame import SENSOR_INDEX, array_to_records, encode_binary
+
+# Minimal stand-in for the backend's WebSocket streams, for benchmarks and
+# offline testing. Only server -> client frames are implemented.
+
+_WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def ws_frame(payload, opcode=0x2):
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return
+            request += chunk
+        lines = request.decode("latin-1").split("\r\n")
+        path = lines[0].split(" ")[1]
+        headers = {k.strip().lower(): v.strip() for k, v in (l.split(":", 1) for l in lines[1:] if ":" in l)}
+        accept = base64.b64encode(hashlib.sha1(headers["sec-websocket-key"].encode() + _WS_GUID).digest())
+        self.request.sendall(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                             b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+
+        query = parse_qs(urlparse(path).query)
+        device = query.get("device", [""])[0]
+        fmt = query.get("format", ["json"])[0]
+        self.server.stream(self.request, device, fmt)
+
+
+class MockSensorServer(socketserver.ThreadingTCPServer):
+    """Streams `frames` (an (n, 17) sample array, looped) to every /ws client.
+
+    Each connection gets `rate` samples per second, sent `frame_rate` times
+    per second as binary blocks, JSON arrays or (default) one JSON object per
+    sample, following the backend's ?format= parameter. sent[device] counts
+    samples sent per device id. With stamp=True the ts column carries the
+    send time in ms since server.t0 (time.perf_counter() clock), so a client
+    in the same process can measure delivery latency. Setting paused holds
+    every stream without a catch-up burst on resume.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, frames, rate=4.0, frame_rate=20.0, host="127.0.0.1", port=0, stamp=False):
+        super().__init__((host, port), _Handler)
+        self.frames = np.asarray(frames)
+        self.rate = rate
+        self.frame_rate = frame_rate
+        self.stamp = stamp
+        self.t0 = time.perf_counter()
+        self.sent = {}
+        self.lock = threading.Lock()
+        self.running = True
+        self.paused = False
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"ws://{host}:{port}/ws"
+
+    def encode(self, block, fmt):
+        if fmt == "binary":
+            return ws_frame(encode_binary(block))
+        records = array_to_records(block)
+        if fmt == "batch":
+            return ws_frame(json.dumps(records).encode("utf-8"), opcode=0x1)
+        return b"".join(ws_frame(json.dumps(r).encode("utf-8"), opcode=0x1) for r in records)
+
+    def stream(self, sock, device, fmt="json"):
+        pos = 0
+        t0 = time.perf_counter()
+        due = 0
+        try:
+            while self.running:
+                if self.paused:
+                    t0 = time.perf_counter() - due / self.rate
+                    time.sleep(1.0 / self.frame_rate)
+                    continue
+                elapsed = time.perf_counter() - t0
+                target = int(elapsed * self.rate)
+                n = target - due
+                if n > 0:
+                    idx = (pos + np.arange(n)) % len(self.frames)
+                    block = self.frames[idx]
+                    if self.stamp:
+                        block = block.copy()
+                        block[:, SENSOR_INDEX["ts"]] = (time.perf_counter() - self.t0) * 1000
+                    sock.sendall(self.encode(block, fmt))
+                    pos = (pos + n) % len(self.frames)
+                    due = target
+                    with self.lock:
+                        self.sent[device] = self.sent.get(device, 0) + n
+                time.sleep(1.0 / self.frame_rate)
+        except OSError:
+            pass
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,206 @@
+import argparse
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Stand-in for the InfluxDB v2 HTTP API (POST /api/v2/write, GET /api/v2/buckets,
+# GET /health), for measuring backend ingestion without a database.
+
+
+def _split(text, sep, limit=-1):
+    """Split on sep outside double quotes and backslash escapes."""
+    parts, start, quoted, i = [], 0, False, 0
+    while i < len(text):
+        c = text[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == '"':
+            quoted = not quoted
+        elif c == sep and not quoted and limit != 0:
+            parts.append(text[start:i])
+            start = i + 1
+            limit -= 1
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def _unescape(text):
+    return text.replace("\\ ", " ").replace("\\,", ",").replace("\\=", "=").replace('\\"', '"').replace("\\\\", "\\")
+
+
+def _field_value(text):
+    if text.startswith('"'):
+        return _unescape(text[1:-1])
+    if text[-1] in "iu" and text[:-1].lstrip("-").isdigit():
+        return int(text[:-1])
+    if text in ("t", "T", "true", "True", "TRUE"):
+        return True
+    if text in ("f", "F", "false", "False", "FALSE"):
+        return False
+    return float(text)
+
+
+def parse_line(line):
+    """One line-protocol point -> (measurement, tags, fields, timestamp or None)."""
+    parts = _split(line, " ", 2)
+    if len(parts) < 2:
+        raise ValueError(f"no fields in {line!r}")
+    key = _split(parts[0], ",")
+    tags = {}
+    for item in key[1:]:
+        k, v = _split(item, "=", 1)
+        tags[_unescape(k)] = _unescape(v)
+    fields = {}
+    for item in _split(parts[1], ","):
+        k, v = _split(item, "=", 1)
+        fields[_unescape(k)] = _field_value(v)
+    timestamp = int(parts[2]) if len(parts) > 2 and parts[2].strip() else None
+    return _unescape(key[0]), tags, fields, timestamp
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, code, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(code)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def authorized(self):
+        token = self.server.token
+        return not token or self.headers.get("Authorization") == f"Token {token}"
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path in ("/health", "/ping"):
+            return self.reply(200, {"name": "influxdb", "status": "pass", "message": "mock"})
+        if path == "/api/v2/buckets":
+            if not self.authorized():
+                return self.reply(401, {"code": "unauthorized", "message": "unauthorized access"})
+            return self.reply(200, {"buckets": [{"id": "0", "name": b} for b in sorted(self.server.buckets)]})
+        self.reply(404, {"code": "not found", "message": path})
+
+    def do_POST(self):
+        srv = self.server
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if url.path != "/api/v2/write":
+            return self.reply(404, {"code": "not found", "message": url.path})
+        if not self.authorized():
+            return self.reply(401, {"code": "unauthorized", "message": "unauthorized access"})
+        bucket = parse_qs(url.query).get("bucket", [""])[0]
+        if srv.latency:
+            time.sleep(srv.latency)
+        try:
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            points = [parse_line(line) for line in body.decode("utf-8").splitlines() if line.strip()]
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            srv.count("rejected")
+            return self.reply(400, {"code": "invalid", "message": str(e)})
+        srv.record(bucket, points, len(body))
+        self.reply(204)
+
+
+class MockInfluxServer(ThreadingHTTPServer):
+    """Accepts line-protocol writes like InfluxDB v2.
+
+    latency adds a fixed delay per write request (the database round trip
+    the backend waits for). stats counts writes, points, bytes and
+    overwritten points. With keep=True points are stored like the real
+    server does: keyed by (bucket, measurement, tags, timestamp), points
+    without a timestamp all get the request's arrival time, and a point
+    with an existing key overwrites it (fields merged, newest wins). points
+    maps each key to (arrival perf_counter, bucket, measurement, tags,
+    fields, timestamp).
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, token="", latency=0.0, keep=True, host="127.0.0.1", port=0):
+        super().__init__((host, port), _Handler)
+        self.token = token
+        self.latency = latency
+        self.keep = keep
+        self.buckets = set()
+        self.points = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"http://{host}:{port}"
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + n
+
+    def record(self, bucket, points, size):
+        now = time.perf_counter()
+        server_ts = time.time_ns()
+        with self.lock:
+            self.buckets.add(bucket)
+            self.stats["writes"] = self.stats.get("writes", 0) + 1
+            self.stats["points"] = self.stats.get("points", 0) + len(points)
+            self.stats["bytes"] = self.stats.get("bytes", 0) + size
+            if not self.keep:
+                return
+            for measurement, tags, fields, timestamp in points:
+                timestamp = server_ts if timestamp is None else timestamp
+                key = (bucket, measurement, tuple(sorted(tags.items())), timestamp)
+                old = self.points.get(key)
+                if old is not None:
+                    self.stats["overwritten"] = self.stats.get("overwritten", 0) + 1
+                    fields = dict(old[4], **fields)
+                self.points[key] = (now, bucket, measurement, tags, fields, timestamp)
+
+    def reset(self):
+        with self.lock:
+            self.points = {}
+            self.stats = {}
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock InfluxDB v2 write API")
+    parser.add_argument("--port", type=int, default=8086)
+    parser.add_argument("--token", default="")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per write request")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between throughput reports")
+    args = parser.parse_args()
+
+    server = MockInfluxServer(args.token, args.latency, keep=False, host="0.0.0.0", port=args.port).start()
+    print(f"Listening on {server.url}")
+    last = {}
+    try:
+        while True:
+            time.sleep(args.interval)
+            with server.lock:
+                stats = dict(server.stats)
+            points = stats.get("points", 0) - last.get("points", 0)
+            writes = stats.get("writes", 0) - last.get("writes", 0)
+            print(f"{points / args.interval:9.1f} points/s in {writes} writes "
+                  f"({points / max(writes, 1):.1f} points/write), {stats.get('rejected', 0)} rejected")
+            last = stats
+    except KeyboardInterrupt:
+        server.stop()
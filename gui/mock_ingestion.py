@@ -0,0 +1,157 @@
+import argparse
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Stand-in for the Edge Impulse ingestion API (POST /api/training/data), for
+# testing uploader throughput and retry behaviour offline.
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, code, text):
+        body = text.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        srv = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.split("?")[0] != "/api/training/data":
+            return self.reply(404, "not found")
+        if srv.api_key and self.headers.get("x-api-key") != srv.api_key:
+            return self.reply(401, "invalid API key")
+        if srv.latency:
+            time.sleep(srv.latency)
+        if random.random() < srv.fail_rate:
+            srv.count("injected")
+            return self.reply(503, "injected failure")
+        size = len(body)
+        try:
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            payload = json.loads(body)["payload"]
+            n = len(payload["values"])
+            width = len(payload["sensors"])
+            if any(len(row) != width for row in payload["values"]):
+                raise ValueError("row width does not match sensors")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            srv.count("rejected")
+            return self.reply(400, f"invalid payload: {e}")
+
+        name = self.headers.get("x-file-name", "")
+        label = self.headers.get("x-label", "")
+        with srv.lock:
+            duplicate = name in srv.files
+            if not duplicate:
+                srv.files[name] = (label, n)
+        if duplicate:
+            srv.count("duplicates")
+            if self.headers.get("x-disallow-duplicates"):
+                return self.reply(409, "duplicate file")
+        srv.count("accepted")
+        srv.count("samples", n)
+        srv.count("bytes", size)
+        self.reply(200, json.dumps({"success": True, "files": [{"fileName": name, "label": label}]}))
+
+
+class MockIngestionServer(ThreadingHTTPServer):
+    """Accepts Edge Impulse uploads on /api/training/data.
+
+    fail_rate is the probability of answering 503 (before the payload is
+    stored), latency adds a fixed delay per request. files maps every stored
+    x-file-name to (label, sample count); stats counts accepted, duplicate,
+    rejected and injected-failure requests.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, api_key="", fail_rate=0.0, latency=0.0, host="127.0.0.1", port=0):
+        super().__init__((host, port), _Handler)
+        self.api_key = api_key
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.files = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"http://{host}:{port}/api/training/data"
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + n
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def bench(path, workers, fail_rate, latency, window, compress):
+    from dataset import label_from_path
+    from uploader import EdgeImpulseUploader, file_pages
+
+    server = MockIngestionServer("test-key", fail_rate, latency).start()
+    up = EdgeImpulseUploader(server.url, "test-key", label_from_path(path), workers, window, compress, log=lambda m: None)
+    key = f"bench:{os.path.abspath(path)}:{time.time()}"
+    s = up.run(file_pages(path), key)
+    seconds, runs = s["seconds"], 1
+    # Anything that ran out of retries is picked up by resuming with the same key
+    while s["failed"] and runs < 5:
+        s = up.run(file_pages(path), key)
+        seconds += s["seconds"]
+        runs += 1
+    s["seconds"] = seconds
+    server.stop()
+    ok = len(server.files) == s["windows"] and server.stats.get("duplicates", 0) == 0
+    return s, server.stats, runs, ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock Edge Impulse ingestion server")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("serve")
+    p.add_argument("--port", type=int, default=4810)
+    p.add_argument("--api-key", default="")
+    p.add_argument("--fail-rate", type=float, default=0.0)
+    p.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    p = sub.add_parser("bench", help="upload a recording through the mock and report throughput")
+    p.add_argument("session")
+    p.add_argument("-j", "--workers", default="1,2,4,8", help="comma-separated worker counts")
+    p.add_argument("--fail-rate", type=float, default=0.1)
+    p.add_argument("--latency", type=float, default=0.02)
+    p.add_argument("--window", type=int, default=40)
+    p.add_argument("--no-compress", action="store_true")
+    args = parser.parse_args()
+
+    if args.cmd == "serve":
+        server = MockIngestionServer(args.api_key, args.fail_rate, args.latency, port=args.port)
+        print(f"Listening on {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+    else:
+        print(f"{'workers':>7s} {'windows':>8s} {'samples/s':>10s} {'KB':>8s} {'retries':>8s} {'503s':>5s} {'runs':>5s} {'exact':>6s}")
+        for w in (int(x) for x in args.workers.split(",")):
+            s, stats, runs, ok = bench(args.session, w, args.fail_rate, args.latency, args.window, not args.no_compress)
+            print(f"{w:7d} {s['windows']:8d} {stats.get('samples', 0) / max(s['seconds'], 1e-9):10.1f} "
+                  f"{stats.get('bytes', 0) / 1024:8.1f} {s['retries']:8d} {stats.get('injected', 0):5d} {runs:5d} "
+                  f"{'yes' if ok else 'NO':>6s}")
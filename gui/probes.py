@@ -0,0 +1,207 @@
+import json
+import os
+import time
+from collections import deque
+import numpy as np
+from PySide6.QtCore import QEvent, QObject, Qt, QTimer
+from PySide6.QtWidgets import QLabel
+
+# Hot-path timing for the live views. Call sites guard on PROBES.enabled (or
+# use start()/stop(), which return at once when disabled), so a disabled
+# probe costs one attribute check. Set ENOUSE_PROBES=1 to enable at start-up.
+
+HISTORY = 4096  # samples kept per histogram
+HIST_BINS = np.concatenate(([0.0], np.logspace(-2, 4, 25)))  # 0.01 .. 10000 (ms, frames, ...)
+
+
+class RollingHistogram:
+    """The last `size` values of one metric, summarized on demand."""
+
+    def __init__(self, name, unit="ms", size=HISTORY):
+        self.name = name
+        self.unit = unit
+        self.values = np.zeros(size)
+        self.count = 0
+
+    def add(self, value):
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+
+    def recent(self):
+        return self.values[:min(self.count, len(self.values))]
+
+    def summary(self):
+        v = self.recent()
+        if not len(v):
+            return {"unit": self.unit, "count": 0}
+        p50, p95, p99 = np.percentile(v, (50, 95, 99))
+        return {"unit": self.unit, "count": self.count, "mean": float(v.mean()), "p50": float(p50),
+                "p95": float(p95), "p99": float(p99), "max": float(v.max())}
+
+    def histogram(self):
+        counts, edges = np.histogram(self.recent(), bins=HIST_BINS)
+        return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+    def clear(self):
+        self.count = 0
+
+
+class Probes:
+    """Registry of named RollingHistograms, plus per-channel signal queue stamps.
+
+    Names are "<channel>.<metric>", e.g. "enouse.decode_ms". Metrics
+    written from a worker thread are only ever written from that thread.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.hists = {}
+        self.queues = {}
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        # Stamps taken before a toggle no longer line up with queued signals
+        self.queues.clear()
+
+    def hist(self, name, unit="ms"):
+        h = self.hists.get(name)
+        if h is None:
+            h = self.hists[name] = RollingHistogram(name, unit)
+        return h
+
+    def record(self, name, value, unit="ms"):
+        self.hist(name, unit).add(value)
+
+    def start(self):
+        return time.perf_counter() if self.enabled else None
+
+    def stop(self, name, t0):
+        if t0 is not None:
+            self.hist(name).add((time.perf_counter() - t0) * 1000)
+
+    def emitted(self, channel, t_recv):
+        """A worker is about to emit a frame received at t_recv (perf_counter)."""
+        q = self.queues.get(channel)
+        if q is None:
+            q = self.queues[channel] = deque()
+        q.append((t_recv, time.perf_counter()))
+
+    def received(self, channel):
+        """The slot for the oldest emitted frame runs; returns its receive time or None.
+
+        Queued connections deliver in order, so the oldest stamp belongs to
+        this frame; the remaining stamps are the frames still waiting.
+        """
+        q = self.queues.get(channel)
+        if not q:
+            return None
+        t_recv, t_emit = q.popleft()
+        self.hist(f"{channel}.queue_ms").add((time.perf_counter() - t_emit) * 1000)
+        self.hist(f"{channel}.queue_depth", "frames").add(len(q))
+        return t_recv
+
+    def reset(self):
+        for h in self.hists.values():
+            h.clear()
+
+    def snapshot(self):
+        return {name: h.summary() for name, h in sorted(self.hists.items())}
+
+    def export(self, path):
+        """Write summaries and histograms: CSV (one row per metric) or JSON."""
+        if path.lower().endswith(".csv"):
+            keys = ("mean", "p50", "p95", "p99", "max")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("metric,unit,count," + ",".join(keys) + "\n")
+                for name, s in self.snapshot().items():
+                    f.write(f"{name},{s['unit']},{s['count']}," + ",".join(f"{s.get(k, 0):.4f}" for k in keys) + "\n")
+            return
+        report = {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "metrics": {name: dict(h.summary(), histogram=h.histogram()) for name, h in sorted(self.hists.items())},
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+PROBES = Probes(os.environ.get("ENOUSE_PROBES") == "1")
+
+
+class FrameProbe(QObject):
+    """Arrival-to-paint latency of one plot widget.
+
+    received() notes when a frame came off the socket, drawn() the newest
+    sensor timestamp once it has been plotted; the next paint event of the
+    widget then records:
+      <channel>.e2e_ms     oldest receive time -> paint (PC clock)
+      <channel>.ts_lag_ms  sensor ts -> paint, relative to the smallest lag
+                           seen (sensor and PC clocks are not synchronized)
+    """
+
+    def __init__(self, channel, widget, ts_scale=1e-3):
+        super().__init__(widget)
+        self.channel = channel
+        self.ts_scale = ts_scale  # sensor ts units -> seconds
+        self.t_recv = None
+        self.ts = None
+        self.last_ts = None
+        self.min_lag = None
+        target = widget.viewport() if hasattr(widget, "viewport") else widget
+        target.installEventFilter(self)
+
+    def received(self, t_recv):
+        if t_recv is not None and (self.t_recv is None or t_recv < self.t_recv):
+            self.t_recv = t_recv
+
+    def drawn(self, ts):
+        self.ts = ts
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and PROBES.enabled and self.ts is not None:
+            now = time.perf_counter()
+            if self.t_recv is not None:
+                PROBES.record(f"{self.channel}.e2e_ms", (now - self.t_recv) * 1000)
+            lag = now - self.ts * self.ts_scale
+            # A ts that steps back is a new session (or device reboot)
+            if self.min_lag is None or lag < self.min_lag or self.ts < self.last_ts:
+                self.min_lag = lag
+            PROBES.record(f"{self.channel}.ts_lag_ms", (lag - self.min_lag) * 1000)
+            self.last_ts = self.ts
+            self.t_recv = self.ts = None
+        return False
+
+
+class ProbeOverlay(QLabel):
+    """Semi-transparent table of the probe summaries, drawn over `parent`."""
+
+    def __init__(self, parent, refresh_ms=500):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet("background: rgba(10, 10, 20, 200); color: #69F0AE; padding: 8px; "
+                           "font-family: Consolas, monospace; font-size: 11px; border-radius: 6px;")
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.setInterval(refresh_ms)
+        self.hide()
+
+    def set_active(self, active):
+        self.setVisible(active)
+        if active:
+            self.refresh()
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def refresh(self):
+        lines = [f"{'metric':26s} {'n':>7s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s}"]
+        for name, s in PROBES.snapshot().items():
+            if not s["count"]:
+                continue
+            lines.append(f"{name:26s} {s['count']:7d} {s['p50']:8.2f} {s['p95']:8.2f} {s['p99']:8.2f} {s['max']:8.2f}")
+        if len(lines) == 1:
+            lines.append("(waiting for data)")
+        self.setText("<pre>" + "\n".join(lines) + "</pre>")
+        self.adjustSize()
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - 12, 48)
+        self.raise_()
@@ -0,0 +1,116 @@
+import os
+import numpy as np
+from sensor_frame import SENSOR_FIELDS, STATES
+
+# (column name, printf format) in SENSOR_FIELDS order; state is written by name
+SENSOR_COLUMNS = tuple(
+    (name, "%s" if name == "state" else "%.6g" if name.endswith(("_mics", "_gm")) else "%d")
+    for name in SENSOR_FIELDS
+)
+
+# SimulationTab export: CSV header names and JSON keys for (time, x1, x2, y)
+SIM_CSV_COLUMNS = (("Time", "%r"), ("Signal1", "%r"), ("Signal2", "%r"), ("Result", "%r"))
+SIM_JSON_COLUMNS = (("time", "%r"), ("signal1", "%r"), ("signal2", "%r"), ("result", "%r"))
+
+RECORD_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".json": "json"}
+
+_STATE_NAMES = np.array(STATES + ("UNKNOWN",), dtype=object)
+
+
+def _row_template(columns, fmt, missing=()):
+    """printf template for one row; columns in missing are written as null (JSON) or nan (CSV)."""
+    if fmt == "csv":
+        return ",".join("nan" if j in missing else f for j, (_, f) in enumerate(columns)) + "\n"
+    fields = []
+    for j, (name, f) in enumerate(columns):
+        if j in missing:
+            fields.append(f'"{name}": null')
+        else:
+            fields.append(f'"{name}": "{f}"' if f == "%s" else f'"{name}": {f}')
+    return "{" + ", ".join(fields) + "}"
+
+
+class StreamRecorder:
+    """Append-only session writer with bounded memory.
+
+    Samples are buffered in chunks of chunk_rows and written as they arrive:
+    .csv (header + rows), .jsonl (one object per line) or .json (an array
+    whose closing bracket is written by close(), so the file is finalized in
+    place instead of being re-serialized).
+    """
+
+    def __init__(self, path, columns=SENSOR_COLUMNS, chunk_rows=256):
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in RECORD_FORMATS:
+            raise ValueError(f"Unsupported record format: {path} (use .csv, .jsonl or .json)")
+        self.path = path
+        self.format = RECORD_FORMATS[ext]
+        self.columns = columns
+        self.chunk_rows = chunk_rows
+        self.state_col = next((i for i, (name, _) in enumerate(columns) if name == "state"), None)
+        self.template = _row_template(columns, self.format)
+        # Templates for rows with NaN/inf readings, keyed by the non-finite columns
+        self.missing_templates = {}
+        self.rows = 0
+        self.pending = []
+        self.pending_rows = 0
+
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        if self.format == "csv":
+            self.file.write(",".join(name for name, _ in columns) + "\n")
+        elif self.format == "json":
+            self.file.write("[")
+
+    def write(self, block):
+        """Queue an (n, len(columns)) array of samples."""
+        block = np.asarray(block)
+        if not len(block):
+            return
+        self.pending.append(block)
+        self.pending_rows += len(block)
+        if self.pending_rows >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        block = np.concatenate(self.pending)
+        self.pending = []
+        self.pending_rows = 0
+
+        values = block.astype(object)
+        if self.state_col is not None:
+            codes = block[:, self.state_col].astype(np.int64)
+            values[:, self.state_col] = _STATE_NAMES[np.where((codes >= 0) & (codes < len(STATES)), codes, -1)]
+        # Integer columns are stored as floats in the sample arrays
+        for j, (_, f) in enumerate(self.columns):
+            if f == "%d":
+                values[:, j] = block[:, j].astype(np.int64)
+
+        template = self.template
+        lines = [template % tuple(row) for row in values]
+        # NaN/inf is not valid JSON: those cells become null and are left out of the row values
+        numeric = [j for j in range(len(self.columns)) if j != self.state_col]
+        bad = ~np.isfinite(block[:, numeric].astype(np.float64))
+        for i in np.flatnonzero(bad.any(axis=1)):
+            missing = frozenset(numeric[j] for j in np.flatnonzero(bad[i]))
+            if missing not in self.missing_templates:
+                self.missing_templates[missing] = _row_template(self.columns, self.format, missing)
+            lines[i] = self.missing_templates[missing] % tuple(v for j, v in enumerate(values[i]) if j not in missing)
+        if self.format == "csv":
+            self.file.write("".join(lines))
+        elif self.format == "jsonl":
+            self.file.write("\n".join(lines) + "\n")
+        else:
+            sep = ",\n" if self.rows else "\n"
+            self.file.write(sep + ",\n".join(lines))
+        self.rows += len(block)
+        self.file.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        if self.format == "json":
+            self.file.write("\n]\n")
+        self.file.close()
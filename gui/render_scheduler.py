@@ -0,0 +1,73 @@
+import time
+from PySide6.QtCore import QObject, QTimer, Qt
+
+
+class RenderScheduler(QObject):
+    """Collects incoming samples and hands them to a render callback at a capped frame rate.
+
+    Every sample that arrives between two ticks is delivered as one batch, so a
+    burst of queued signals costs a single redraw instead of one per message.
+    """
+
+    def __init__(self, render_fn, fps=30, parent=None):
+        super().__init__(parent)
+        self.render_fn = render_fn
+        self.pending = []
+        self.pending_samples = 0
+        self.frames = 0
+        self.samples = 0
+        self.coalesced_frames = 0
+        self.dropped_frames = 0
+        self.last_tick = None
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+        self.set_fps(fps)
+        self.timer.start()
+
+    def set_fps(self, fps):
+        self.fps = max(1, int(fps))
+        self.interval = 1.0 / self.fps
+        self.timer.setInterval(int(1000 / self.fps))
+
+    def submit(self, item, count=1):
+        # count is the number of samples carried by item (batches count as many)
+        self.pending.append(item)
+        self.samples += count
+        self.pending_samples += count
+
+    def clear(self):
+        self.pending = []
+        self.pending_samples = 0
+
+    def tick(self):
+        now = time.perf_counter()
+        if self.last_tick is not None:
+            gap = now - self.last_tick
+            # Ticks the event loop could not service because a frame ran long
+            if gap > 1.5 * self.interval:
+                self.dropped_frames += int(gap / self.interval) - 1
+        self.last_tick = now
+
+        if not self.pending:
+            return
+        batch = self.pending
+        self.coalesced_frames += self.pending_samples - 1
+        self.pending = []
+        self.pending_samples = 0
+        self.render_fn(batch)
+        self.frames += 1
+
+    def stats(self):
+        return {
+            "fps": self.fps,
+            "frames": self.frames,
+            "samples": self.samples,
+            "pending": self.pending_samples,
+            "coalesced_frames": self.coalesced_frames,
+            "dropped_frames": self.dropped_frames,
+        }
+
+    def stop(self):
+        self.timer.stop()
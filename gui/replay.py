@@ -0,0 +1,66 @@
+import os
+import time
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+from dataset import load_session, session_clock, session_frames
+from sensor_frame import SENSOR_INDEX
+
+# Speed presets offered in the GUI; 0 means as fast as possible
+REPLAY_SPEEDS = (("1×", 1.0), ("10×", 10.0), ("Max", 0.0))
+
+
+class ReplayWorker(QThread):
+    """Streams a recorded session with the same signals as WebSocketWorker."""
+    data_received = Signal(dict)
+    batch_received = Signal(object)
+    log_received = Signal(str)
+
+    def __init__(self, path, speed=1.0, loop=False, tick_ms=20, max_batch=500):
+        super().__init__()
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.tick_ms = tick_ms
+        self.max_batch = max_batch
+        self.running = True
+
+    def run(self):
+        try:
+            frames = session_frames(load_session(self.path))
+        except Exception as e:
+            self.log_received.emit(f"[ERROR] Replay failed to load {self.path}: {e}")
+            return
+        if not len(frames):
+            self.log_received.emit(f"[WARN] Replay: {self.path} is empty")
+            return
+
+        name = os.path.basename(self.path)
+        speed_text = f"{self.speed:g}×" if self.speed > 0 else "max speed"
+        self.log_received.emit(f"[INFO] 📼 Replaying {name} ({len(frames)} samples, {speed_text})")
+
+        clock = session_clock(frames[:, SENSOR_INDEX["ts"]])
+        pos = 0
+        t_start = time.perf_counter()
+        while self.running:
+            if self.speed > 0:
+                elapsed = (time.perf_counter() - t_start) * self.speed
+                end = int(np.searchsorted(clock, elapsed, 'right'))
+            else:
+                end = min(pos + self.max_batch, len(frames))
+
+            if end > pos:
+                self.batch_received.emit(frames[pos:end])
+                pos = end
+
+            if pos >= len(frames):
+                if not self.loop:
+                    break
+                pos = 0
+                t_start = time.perf_counter()
+
+            self.msleep(self.tick_ms if self.speed > 0 else 1)
+
+        self.log_received.emit(f"[INFO] 📼 Replay of {name} finished")
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,199 @@
+import argparse
+import os
+import time
+import numpy as np
+from dataset import NOMINAL_INTERVAL_MS, find_sessions, load_session, session_clock, session_frames, session_kind
+from sensor_frame import SENSOR_FIELDS, SENSOR_INDEX
+
+# Holes in device ts up to this long are interpolated across; longer ones
+# (and ts stepping back, i.e. a device restart) start a new segment
+MAX_GAP_MS = 4 * NOMINAL_INTERVAL_MS
+
+# Discrete columns keep the previous sample's value instead of being interpolated
+HOLD_FIELDS = ("state", "motor_A_duty", "motor_B_duty", "currentLevel")
+
+
+def resample(ts, values, interval_ms=NOMINAL_INTERVAL_MS, max_gap_ms=MAX_GAP_MS, hold=None, start_ts=None):
+    """Interpolate samples onto a uniform device-ts grid.
+
+    ts (ms) and values (n, m) are raw samples in arrival order. Repeated ts
+    are dropped (first copy kept); a step back or a hole longer than
+    max_gap_ms starts a new segment whose grid begins at its first sample,
+    so nothing is invented across it. hold is a boolean mask over the value
+    columns to sample-and-hold rather than interpolate. start_ts moves the
+    first grid point of the first segment (used to continue a stream).
+
+    Returns (grid_ts, grid_values, segment ids, stats).
+    """
+    ts = np.asarray(ts, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64).reshape(len(ts), -1)
+    stats = {"input": len(ts), "duplicates": 0, "gaps": 0, "restarts": 0}
+    if not len(ts):
+        stats["output"] = 0
+        return ts, values, np.empty(0, dtype=np.intp), stats
+
+    keep = np.concatenate(([True], np.diff(ts) != 0))
+    stats["duplicates"] = int(len(ts) - keep.sum())
+    ts, values = ts[keep], values[keep]
+    dt = np.diff(ts)
+    stats["gaps"] = int(np.sum(dt > max_gap_ms))
+    stats["restarts"] = int(np.sum(dt < 0))
+
+    starts = np.concatenate(([0], np.flatnonzero((dt < 0) | (dt > max_gap_ms)) + 1))
+    ends = np.concatenate((starts[1:] - 1, [len(ts) - 1]))
+    first = ts[starts].copy()
+    if start_ts is not None:
+        first[0] = start_ts
+    counts = np.maximum(np.floor((ts[ends] - first) / interval_ms).astype(np.intp) + 1, 0)
+    seg = np.repeat(np.arange(len(starts)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    grid = first[seg] + k * interval_ms
+
+    # ts is only increasing inside a segment: lay the segments end to end on
+    # one monotonic key so a single searchsorted finds every grid point
+    sample_seg = np.repeat(np.arange(len(starts)), ends - starts + 1)
+    span = ts[ends] - ts[starts]
+    base = np.concatenate(([0.0], np.cumsum(span + 1)[:-1]))
+    key = base[sample_seg] + ts - ts[starts][sample_seg]
+    lo = np.searchsorted(key, base[seg] + grid - ts[starts][seg], side="right") - 1
+    lo = np.clip(lo, starts[seg], ends[seg])
+    hi = np.minimum(lo + 1, ends[seg])
+    width = ts[hi] - ts[lo]
+    frac = np.zeros(len(grid))
+    np.divide(grid - ts[lo], width, out=frac, where=width > 0)
+
+    out = values[lo] + frac[:, None] * (values[hi] - values[lo])
+    if hold is not None:
+        out[:, hold] = values[lo][:, hold]
+    stats["output"] = len(grid)
+    return grid, out, seg, stats
+
+
+def hold_mask(names):
+    return np.array([name in HOLD_FIELDS for name in names])
+
+
+def resample_frames(frames, interval_ms=NOMINAL_INTERVAL_MS, max_gap_ms=MAX_GAP_MS):
+    """(n, 17) SensorData frames -> (seconds on the session clock, resampled frames, stats)."""
+    grid, out, _, stats = resample(frames[:, SENSOR_INDEX["ts"]], frames, interval_ms, max_gap_ms,
+                                   hold_mask(SENSOR_FIELDS))
+    out[:, SENSOR_INDEX["ts"]] = grid
+    return session_clock(grid, interval_ms), out, stats
+
+
+def resample_session(data, interval_ms=NOMINAL_INTERVAL_MS, max_gap_ms=MAX_GAP_MS):
+    """Resample a sensor or .dat session; returns (array of the same dtype, stats)."""
+    kind = session_kind(data)
+    if kind == "sim":
+        raise ValueError("simulation recordings have no device ts")
+    clock = "ts" if kind == "sensor" else "time"
+    names = [name for name in data.dtype.names if name != clock]
+    ts = np.asarray(data[clock], dtype=np.float64) * (1 if kind == "sensor" else 1000.0)
+    values = np.column_stack([np.asarray(data[name], dtype=np.float64) for name in names])
+    grid, out, _, stats = resample(ts, values, interval_ms, max_gap_ms, hold_mask(names))
+    res = np.empty(len(grid), dtype=data.dtype)
+    res[clock] = grid if kind == "sensor" else grid / 1000.0
+    for j, name in enumerate(names):
+        res[name] = np.round(out[:, j]) if res.dtype[name].kind in "iu" else out[:, j]
+    return res, stats
+
+
+class StreamResampler:
+    """Incremental resample_frames for live (n, 17) blocks.
+
+    The last raw sample and the next grid ts carry over between pushes, so
+    the output is the same as resampling the whole stream at once. Times
+    follow session_clock: real time across gaps, one interval across a
+    restart.
+    """
+
+    def __init__(self, interval_ms=NOMINAL_INTERVAL_MS, max_gap_ms=MAX_GAP_MS):
+        self.interval_ms = interval_ms
+        self.max_gap_ms = max_gap_ms
+        self.hold = hold_mask(SENSOR_FIELDS)
+        self.reset()
+
+    def reset(self):
+        self.prev = None
+        self.next_ts = None
+        self.last_ts = None
+        self.clock = 0.0
+        self.stats = {"input": 0, "output": 0, "duplicates": 0, "gaps": 0, "restarts": 0}
+
+    def push(self, frames):
+        """Returns (seconds, frames) on the grid; empty until the grid reaches a new sample."""
+        if not len(frames):
+            return np.empty(0), frames[:0]
+        block = frames if self.prev is None else np.vstack((self.prev, frames))
+        grid, out, _, stats = resample(block[:, SENSOR_INDEX["ts"]], block, self.interval_ms,
+                                       self.max_gap_ms, self.hold, self.next_ts)
+        for name in self.stats:
+            self.stats[name] += stats[name]
+        if self.prev is not None:
+            # The carried-over sample was counted by the previous push
+            self.stats["input"] -= 1
+        # Carry the kept (first) copy of the final ts, as resample drops repeats
+        ts = block[:, SENSOR_INDEX["ts"]]
+        last = len(block) - 1
+        while last and ts[last - 1] == ts[last]:
+            last -= 1
+        self.prev = block[last:last + 1].copy()
+        if not len(grid):
+            return np.empty(0), frames[:0]
+
+        out[:, SENSOR_INDEX["ts"]] = grid
+        self.next_ts = grid[-1] + self.interval_ms
+        step = np.diff(grid, prepend=grid[0] if self.last_ts is None else self.last_ts)
+        step[step < 0] = self.interval_ms
+        times = self.clock + np.cumsum(step)
+        self.clock = times[-1]
+        self.last_ts = grid[-1]
+        return times / 1000.0, out
+
+    def pages(self, pages):
+        """Resample an iterator of frame blocks (e.g. SessionClient.pages) lazily."""
+        for block in pages:
+            _, out = self.push(np.asarray(block))
+            if len(out):
+                yield out
+
+
+def check_stream(frames, chunk=8):
+    """Push frames in chunks through a StreamResampler; returns (max abs difference to batch, seconds)."""
+    t_batch, batch, _ = resample_frames(frames)
+    t0 = time.perf_counter()
+    rs = StreamResampler()
+    parts = [rs.push(frames[i:i + chunk]) for i in range(0, len(frames), chunk)]
+    seconds = time.perf_counter() - t0
+    t_stream = np.concatenate([t for t, _ in parts])
+    stream = np.concatenate([f for _, f in parts])
+    if stream.shape != batch.shape:
+        return np.inf, seconds
+    return max(np.abs(stream - batch).max(initial=0), np.abs(t_stream - t_batch).max(initial=0)), seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resample recordings onto the uniform device-ts grid")
+    parser.add_argument("inputs", nargs="*", help="session files or directories (default: gui/*.csv)")
+    parser.add_argument("--interval", type=float, default=NOMINAL_INTERVAL_MS, help="grid step (ms)")
+    parser.add_argument("--max-gap", type=float, default=MAX_GAP_MS, help="longest hole to interpolate (ms)")
+    parser.add_argument("--chunk", type=int, default=8, help="block size for the streaming check")
+    args = parser.parse_args()
+
+    paths = []
+    for target in args.inputs or [os.path.dirname(os.path.abspath(__file__))]:
+        paths.extend(find_sessions(target, (".csv",)) if os.path.isdir(target) else [target])
+
+    print(f"{'file':28s} {'in':>6s} {'out':>6s} {'dups':>5s} {'gaps':>5s} {'rst':>4s} {'batch ms':>9s} "
+          f"{'stream ms':>10s} {'stream=batch':>12s}")
+    for path in paths:
+        data = load_session(path)
+        if session_kind(data) == "sim":
+            continue
+        t0 = time.perf_counter()
+        _, stats = resample_session(data, args.interval, args.max_gap)
+        t_batch = time.perf_counter() - t0
+        err, t_stream = check_stream(session_frames(data), args.chunk)
+        print(f"{os.path.basename(path):28s} {stats['input']:6d} {stats['output']:6d} {stats['duplicates']:5d} "
+              f"{stats['gaps']:5d} {stats['restarts']:4d} {t_batch * 1000:9.2f} {t_stream * 1000:10.2f} "
+              f"{'yes' if err < 1e-6 else f'NO ({err:.3g})':>12s}")
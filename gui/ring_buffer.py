@@ -0,0 +1,118 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Preallocated circular buffer for a time column plus N channels.
+
+    Every sample is written twice (at i and i + capacity) so the live window
+    is always one contiguous slice of the backing array and can be handed to
+    pyqtgraph without copying or reordering.
+    """
+
+    def __init__(self, capacity, n_channels):
+        self.capacity = capacity
+        self.n_channels = n_channels
+        self._times = np.zeros(2 * capacity, dtype=np.float64)
+        self._data = np.zeros((n_channels, 2 * capacity), dtype=np.float64)
+        self._mins = np.full(n_channels, np.inf)
+        self._maxs = np.full(n_channels, -np.inf)
+        self._extrema_dirty = False
+        self._write = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        self._write = 0
+        self._size = 0
+        self._mins.fill(np.inf)
+        self._maxs.fill(-np.inf)
+        self._extrema_dirty = False
+
+    def append(self, t, values):
+        w = self._write
+        values = np.asarray(values, dtype=np.float64)
+
+        # Evicting the current extreme of a channel invalidates the running min/max
+        if self._size == self.capacity and not self._extrema_dirty:
+            old = self._data[:, w]
+            if np.any(old <= self._mins) or np.any(old >= self._maxs):
+                self._extrema_dirty = True
+
+        self._times[w] = t
+        self._times[w + self.capacity] = t
+        self._data[:, w] = values
+        self._data[:, w + self.capacity] = values
+
+        if not self._extrema_dirty:
+            np.minimum(self._mins, values, out=self._mins)
+            np.maximum(self._maxs, values, out=self._maxs)
+
+        self._write = (w + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def extend(self, times, block):
+        """Append k samples at once; block has shape (k, n_channels)."""
+        times = np.asarray(times, dtype=np.float64)
+        block = np.asarray(block, dtype=np.float64).reshape(len(times), self.n_channels)
+        if len(times) > self.capacity:
+            times = times[-self.capacity:]
+            block = block[-self.capacity:]
+        k = len(times)
+        if k == 0:
+            return
+
+        n_evict = self._size + k - self.capacity
+        if n_evict > 0 and not self._extrema_dirty:
+            start = (self._write - self._size) % self.capacity
+            old = self._data[:, (start + np.arange(n_evict)) % self.capacity]
+            if np.any(old <= self._mins[:, None]) or np.any(old >= self._maxs[:, None]):
+                self._extrema_dirty = True
+
+        idx = (self._write + np.arange(k)) % self.capacity
+        self._times[idx] = times
+        self._times[idx + self.capacity] = times
+        self._data[:, idx] = block.T
+        self._data[:, idx + self.capacity] = block.T
+
+        if not self._extrema_dirty:
+            np.minimum(self._mins, block.min(axis=0), out=self._mins)
+            np.maximum(self._maxs, block.max(axis=0), out=self._maxs)
+
+        self._write = (self._write + k) % self.capacity
+        self._size = min(self._size + k, self.capacity)
+
+    def _window(self):
+        start = (self._write - self._size) % self.capacity
+        return start, start + self._size
+
+    def times(self):
+        start, end = self._window()
+        return self._times[start:end]
+
+    def channel(self, index):
+        start, end = self._window()
+        return self._data[index, start:end]
+
+    def values(self):
+        start, end = self._window()
+        return self._data[:, start:end]
+
+    def _refresh_extrema(self):
+        if self._size:
+            window = self.values()
+            window.min(axis=1, out=self._mins)
+            window.max(axis=1, out=self._maxs)
+        self._extrema_dirty = False
+
+    def min(self):
+        if self._extrema_dirty:
+            self._refresh_extrema()
+        return self._mins
+
+    def max(self):
+        if self._extrema_dirty:
+            self._refresh_extrema()
+        return self._maxs
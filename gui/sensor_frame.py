@@ -0,0 +1,102 @@
+import json
+import numpy as np
+
+# Column order of one SensorData sample (matches backend/src/state.rs)
+SENSOR_FIELDS = (
+    "ts", "state", "motor_A_duty", "motor_B_duty",
+    "gmxxx_ch1", "gmxxx_ch2", "gmxxx_ch3", "gmxxx_ch4", "mics5524_raw",
+    "co_mics", "eth_mics", "voc_mics",
+    "no2_gm", "c2h5oh_gm", "voc_gm", "co_gm",
+    "currentLevel",
+)
+SENSOR_INDEX = {name: i for i, name in enumerate(SENSOR_FIELDS)}
+
+# The seven calibrated gas channels plotted by ENouseTab and sent to Edge Impulse
+GAS_CHANNELS = ("co_mics", "eth_mics", "voc_mics", "no2_gm", "c2h5oh_gm", "voc_gm", "co_gm")
+
+# Plotted gas channels (ENouseTab, GNUplot export): (key, label, short label, color)
+SENSOR_CHANNELS = [
+    ("co_mics", "CO (MiCS)", "CO (M)", "#FF5252"),
+    ("eth_mics", "Ethanol (MiCS)", "Eth (M)", "#448AFF"),
+    ("voc_mics", "VOC (MiCS)", "VOC (M)", "#69F0AE"),
+    ("no2_gm", " NO₂ (GM)", "NO₂ (G)", "#FFEB3B"),
+    ("c2h5oh_gm", "Ethanol (GM)", "Eth (G)", "#E040FB"),
+    ("voc_gm", "VOC (GM)", "VOC (G)", "#FFAB40"),
+    ("co_gm", "CO (GM)", "CO (G)", "#FFFFFF")
+]
+
+# Column order of one SimDataPoint (backend/src/sim.rs)
+SIM_FIELDS = ("time", "x1", "x2", "y")
+
+# FSM states in firmware enum order; the state column carries the index
+STATES = ("IDLE", "PRE_COND", "RAMP_UP", "HOLD", "PURGE", "RECOVERY", "DONE")
+STATE_CODES = {name: i for i, name in enumerate(STATES)}
+UNKNOWN_STATE = -1
+
+
+def state_code(name):
+    return STATE_CODES.get(name, UNKNOWN_STATE)
+
+
+def state_name(code):
+    code = int(code)
+    if 0 <= code < len(STATES):
+        return STATES[code]
+    return "UNKNOWN"
+
+
+def records_to_array(records, fields=SENSOR_FIELDS):
+    """Convert a list of sample dicts into an (n, len(fields)) float64 array."""
+    out = np.empty((len(records), len(fields)), dtype=np.float64)
+    for j, field in enumerate(fields):
+        if field == "state":
+            out[:, j] = [state_code(r.get(field)) for r in records]
+        else:
+            out[:, j] = [r.get(field, 0) for r in records]
+    return out
+
+
+def array_to_records(block, fields=SENSOR_FIELDS):
+    """Inverse of records_to_array: sample dicts as the backend sends them."""
+    columns = [np.asarray(block)[:, j].tolist() for j in range(len(fields))]
+    if "state" in fields:
+        j = fields.index("state")
+        columns[j] = [state_name(code) for code in columns[j]]
+    return [dict(zip(fields, row)) for row in zip(*columns)]
+
+
+# Binary frames start with the first column of the first row as a float64;
+# the first column of every row is then sent as a float32 offset from it, so
+# device ts past 2**24 ms (~4.7 h uptime) keeps millisecond resolution
+FRAME_BASE = np.dtype("<f8")
+
+
+def decode_binary(payload, fields=SENSOR_FIELDS):
+    """Decode a base float64 and a packed little-endian float32 block of n * len(fields) values."""
+    if len(payload) < FRAME_BASE.itemsize:
+        raise ValueError(f"binary frame of {len(payload)} bytes has no base")
+    base = np.frombuffer(payload, dtype=FRAME_BASE, count=1)[0]
+    block = np.frombuffer(payload, dtype="<f4", offset=FRAME_BASE.itemsize)
+    if block.size % len(fields):
+        raise ValueError(f"binary frame of {block.size} values is not a multiple of {len(fields)}")
+    block = block.reshape(-1, len(fields)).astype(np.float64)
+    block[:, 0] += base
+    return block
+
+
+def encode_binary(block):
+    block = np.asarray(block, dtype=np.float64)
+    base = block[0, 0] if len(block) else 0.0
+    rows = block.astype("<f4")
+    rows[:, 0] = block[:, 0] - base
+    return np.array(base, dtype=FRAME_BASE).tobytes() + rows.tobytes()
+
+
+def decode_message(message, fields=SENSOR_FIELDS):
+    """Decode one WebSocket frame (JSON object, JSON array or binary block) into a sample array."""
+    if isinstance(message, (bytes, bytearray, memoryview)):
+        return decode_binary(message, fields)
+    data = json.loads(message)
+    if isinstance(data, dict):
+        data = [data]
+    return records_to_array(data, fields)
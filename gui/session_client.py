@@ -0,0 +1,268 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import requests
+from dataset import CACHE_DIR
+from sensor_frame import SENSOR_FIELDS, SENSOR_INDEX, records_to_array
+
+PAGE_SIZE = 1000
+TIMEOUT = (2, 30)
+ROW_DTYPE = np.dtype("<f8")
+
+
+class SessionChanged(RuntimeError):
+    """The backend session was cleared while its pages were being read."""
+
+
+class RangeCache:
+    """Rows of the backend session buffer fetched so far, by buffer index.
+
+    ranges is a sorted list of disjoint [start, end) intervals present in
+    rows. Saved as <CACHE_DIR>/sessions/<sha1(url)>.rows (raw little-endian
+    float64 rows, written in place so a save only costs the rows put since
+    the last one) plus a .meta.json holding the backend session epoch and
+    the ranges. generation counts clears.
+    """
+
+    def __init__(self, key, directory=None, persist=True):
+        directory = directory or os.path.join(os.path.dirname(os.path.abspath(__file__)), CACHE_DIR, "sessions")
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        self.directory = directory
+        self.rows_path = os.path.join(directory, f"{digest}.rows")
+        self.meta_path = os.path.join(directory, f"{digest}.meta.json")
+        self.epoch = None
+        self.ranges = []
+        self.rows = np.empty((0, len(SENSOR_FIELDS)))
+        self.generation = 0
+        # Row intervals put since the last save; truncate: the file no longer matches
+        self.dirty = []
+        self.truncate = True
+        self.persist = persist
+        if not persist:
+            return
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            rows = np.fromfile(self.rows_path, dtype=ROW_DTYPE).reshape(-1, len(SENSOR_FIELDS))
+            if meta.get("fields") == list(SENSOR_FIELDS) and len(rows) >= max((e for _, e in meta["ranges"]), default=0):
+                self.epoch, self.ranges, self.rows = meta["epoch"], [tuple(r) for r in meta["ranges"]], rows
+                self.truncate = False
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def clear(self, epoch=None):
+        self.epoch = epoch
+        self.ranges = []
+        self.rows = self.rows[:0]
+        self.generation += 1
+        self.dirty = []
+        self.truncate = True
+
+    def missing(self, start, stop):
+        """[start, stop) intervals not in the cache."""
+        gaps = []
+        for s, e in self.ranges:
+            if e <= start:
+                continue
+            if s >= stop:
+                break
+            if s > start:
+                gaps.append((start, s))
+            start = max(start, e)
+        if start < stop:
+            gaps.append((start, stop))
+        return gaps
+
+    def covered(self, start=0):
+        """End of the contiguous run of cached rows beginning at start."""
+        for s, e in self.ranges:
+            if s <= start < e:
+                return e
+        return start
+
+    def put(self, start, block):
+        end = start + len(block)
+        if end > len(self.rows):
+            grown = np.zeros((max(end, 2 * len(self.rows)), len(SENSOR_FIELDS)))
+            grown[:len(self.rows)] = self.rows
+            self.rows = grown
+        self.rows[start:end] = block
+        self.dirty.append((start, end))
+        merged = []
+        for s, e in sorted(self.ranges + [(start, end)]):
+            if merged and s <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+            else:
+                merged.append((s, e))
+        self.ranges = merged
+
+    def get(self, start, stop):
+        return self.rows[start:stop]
+
+    def save(self):
+        if not self.persist:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Rows first, then the ranges that vouch for them
+            mode = 'wb' if self.truncate or not os.path.exists(self.rows_path) else 'r+b'
+            with open(self.rows_path, mode) as f:
+                for start, end in self.dirty:
+                    f.seek(start * len(SENSOR_FIELDS) * ROW_DTYPE.itemsize)
+                    f.write(np.ascontiguousarray(self.rows[start:end], dtype=ROW_DTYPE).tobytes())
+            self.dirty = []
+            self.truncate = False
+            tmp = self.meta_path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"epoch": self.epoch, "ranges": self.ranges, "fields": list(SENSOR_FIELDS)}, f)
+            os.replace(tmp, self.meta_path)
+        except OSError:
+            pass
+
+
+class SessionClient:
+    """Incremental reader for the backend's GET /session_data.
+
+    Pages are requested with ?offset=&limit= and kept in a RangeCache, so
+    repeated reads only transfer rows that were not fetched before. The
+    X-Session-Epoch header tells a cleared (restarted) session apart from a
+    grown one; older backends without it are detected by re-reading the last
+    cached row and comparing it. fetched_bytes / fetched_rows count what
+    actually went over the wire.
+    """
+
+    def __init__(self, api_url, page_size=PAGE_SIZE, session=None, use_cache=True, timeout=TIMEOUT):
+        self.api_url = api_url.rstrip("/")
+        self.page_size = page_size
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.cache = RangeCache(self.api_url, persist=use_cache)
+        self.total = None
+        self.fetched_bytes = 0
+        self.fetched_rows = 0
+
+    def _get(self, **params):
+        res = self.session.get(f"{self.api_url}/session_data", params=params, timeout=self.timeout)
+        res.raise_for_status()
+        self.fetched_bytes += len(res.content)
+        records = res.json()
+        self.fetched_rows += len(records)
+        total = res.headers.get("X-Session-Total")
+        epoch = res.headers.get("X-Session-Epoch")
+        return records, (int(total) if total is not None else None), epoch
+
+    def _check_epoch(self, epoch, total):
+        if epoch is not None and epoch != self.cache.epoch:
+            self.cache.clear(epoch)
+        elif total is not None and total < max((e for _, e in self.cache.ranges), default=0):
+            self.cache.clear(epoch)
+
+    def _fetch(self, start, stop):
+        """Fetch [start, stop) into the cache; stop=None reads to the end of the buffer."""
+        offset = start
+        while stop is None or offset < stop:
+            limit = self.page_size if stop is None else min(self.page_size, stop - offset)
+            records, total, epoch = self._get(offset=offset, limit=limit)
+            self._check_epoch(epoch, total)
+            self.total = total if total is not None else self.total
+            if records:
+                self.cache.put(offset, records_to_array(records))
+            # A short page is the last one; a long one means the server ignored limit
+            if len(records) != limit:
+                if total is None and len(records) > limit:
+                    self.total = offset + len(records)
+                return
+            offset += len(records)
+
+    def _validate(self):
+        # Old backends send no epoch: re-read the last cached row and compare
+        end = self.cache.covered(0)
+        if not end:
+            return 0
+        records, total, epoch = self._get(offset=end - 1, limit=1)
+        self._check_epoch(epoch, total)
+        if epoch is None and (not records or not np.array_equal(records_to_array(records)[0], self.cache.rows[end - 1])):
+            self.cache.clear()
+        return self.cache.covered(0)
+
+    def sync(self):
+        """Bring the cache up to date with the whole buffer; returns (n, 17) rows."""
+        start = self._validate()
+        self._fetch(start, None)
+        self.cache.save()
+        return self.cache.get(0, self.cache.covered(0))
+
+    def range(self, start, stop):
+        """Rows [start, stop) of the buffer, fetching only what is not cached."""
+        self._validate()
+        for s, e in self.cache.missing(start, stop):
+            self._fetch(s, e)
+        self.cache.save()
+        return self.cache.get(start, min(stop, self.cache.covered(start)))
+
+    def pages(self):
+        """Yield the whole buffer in blocks of up to page_size rows, cached ones first.
+
+        Raises SessionChanged if the backend session is cleared part way, rather
+        than continuing with rows of the new session.
+        """
+        end = self._validate()
+        generation = self.cache.generation
+        for i in range(0, end, self.page_size):
+            yield self.cache.get(i, min(i + self.page_size, end))
+        offset = end
+        while True:
+            self._fetch(offset, offset + self.page_size)
+            if self.cache.generation != generation:
+                if offset:
+                    raise SessionChanged("backend session was cleared while reading it")
+                # Nothing yielded yet (e.g. the first fetch learned the epoch)
+                generation = self.cache.generation
+            after = self.cache.covered(offset)
+            if after > offset:
+                yield self.cache.get(offset, after)
+            if after - offset < self.page_size:
+                break
+            offset = after
+        self.cache.save()
+
+    def since(self, ts):
+        """Samples from the first one with device ts > ts to the end of the buffer.
+
+        Walks the buffer by offset (through pages(), so cached rows are not
+        re-sent) instead of a ts cursor: rows sharing a ts across a page
+        boundary are all kept, and so is everything after a device restart
+        that reset ts. Raises SessionChanged if the session is cleared part way.
+        """
+        blocks, found = [], False
+        for block in self.pages():
+            if not found:
+                newer = np.flatnonzero(block[:, SENSOR_INDEX["ts"]] > ts)
+                if not len(newer):
+                    continue
+                block, found = block[newer[0]:], True
+            blocks.append(block)
+        return np.concatenate(blocks) if blocks else np.empty((0, len(SENSOR_FIELDS)))
+
+    @property
+    def epoch(self):
+        return self.cache.epoch
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync the backend session buffer into the local cache")
+    parser.add_argument("--api", default="http://localhost:3000")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--repeat", type=int, default=2, help="sync this many times to show the cache at work")
+    args = parser.parse_args()
+
+    client = SessionClient(args.api, args.page_size)
+    for i in range(args.repeat):
+        before = client.fetched_bytes
+        t0 = time.perf_counter()
+        rows = client.sync()
+        print(f"sync {i + 1}: {len(rows)} rows, {(client.fetched_bytes - before) / 1024:.1f} KB transferred "
+              f"in {(time.perf_counter() - t0) * 1000:.1f} ms")
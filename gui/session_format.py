@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import struct
+import time
+import numpy as np
+from dataset import (DAT_DTYPE, SENSOR_DTYPE, SIM_DTYPE, find_sessions, load_session, parse_session,
+                     session_frames, session_kind)
+from recorder import SIM_CSV_COLUMNS, SIM_JSON_COLUMNS, StreamRecorder
+from sensor_frame import GAS_CHANNELS, STATES, UNKNOWN_STATE
+
+# .ens layout: fixed prefix, JSON header, then one fixed-width little-endian
+# array per column, each starting on an ALIGN boundary so memmap views are aligned.
+#   prefix: magic(4s) version(H) reserved(H) header_len(I) data_start(Q)
+ENS_EXTENSION = ".ens"
+MAGIC = b"ENSB"
+VERSION = 1
+ALIGN = 64
+_PREFIX = struct.Struct("<4sHHIQ")
+
+# Dictionary for the encoded state column (code len(STATES) = unknown)
+STATE_DICTIONARY = STATES + ("UNKNOWN",)
+
+COLUMN_UNITS = {
+    "ts": "ms", "time": "s", "state": "", "currentLevel": "level",
+    "motor_A_duty": "pwm", "motor_B_duty": "pwm",
+    "gmxxx_ch1": "adc", "gmxxx_ch2": "adc", "gmxxx_ch3": "adc", "gmxxx_ch4": "adc",
+    "mics5524_raw": "mV",
+}
+COLUMN_UNITS.update({key: "ppm" for key in GAS_CHANNELS})
+
+_KIND_DTYPES = {"sensor": SENSOR_DTYPE, "dat": DAT_DTYPE, "sim": SIM_DTYPE}
+
+
+def _align(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+def _narrow(arr):
+    # Integer columns are stored in the smallest width that holds their range
+    if arr.dtype.kind not in "iu" or not len(arr):
+        return arr
+    lo, hi = int(arr.min()), int(arr.max())
+    for dtype in (np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return arr.astype(dtype)
+    return arr
+
+
+def write_session(path, data, source=None):
+    """Write a structured session array (any load_session kind) as a .ens file."""
+    kind = session_kind(data)
+    arrays = []
+    columns = []
+    offset = 0
+    for name in data.dtype.names:
+        arr = np.asarray(data[name])
+        if name == "state":
+            arr = np.where(arr == UNKNOWN_STATE, len(STATES), arr).astype(np.uint8)
+        arr = _narrow(arr)
+        arr = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder("<"))
+        columns.append({"name": name, "dtype": arr.dtype.str, "offset": offset,
+                        "units": COLUMN_UNITS.get(name, "")})
+        arrays.append(arr)
+        offset = _align(offset + arr.nbytes)
+
+    header = {"kind": kind, "rows": len(data), "columns": columns, "states": list(STATE_DICTIONARY)}
+    if source:
+        header["source"] = os.path.basename(source)
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _align(_PREFIX.size + len(header_bytes))
+
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, VERSION, 0, len(header_bytes), data_start))
+        f.write(header_bytes)
+        for col, arr in zip(columns, arrays):
+            f.seek(data_start + col["offset"])
+            f.write(arr.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+
+
+def open_session(path):
+    """Memory-map a .ens file: returns (header, {column: read-only array view}).
+
+    The views share one mapping of the file, so slicing never copies. The
+    state column holds codes into header["states"].
+    """
+    with open(path, 'rb') as f:
+        magic, version, _, header_len, data_start = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not an .ens session file")
+        if version > VERSION:
+            raise ValueError(f"{path}: unsupported .ens version {version}")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+
+    rows = header["rows"]
+    buf = np.memmap(path, dtype=np.uint8, mode='r') if rows else np.empty(0, dtype=np.uint8)
+    columns = {}
+    for col in header["columns"]:
+        dtype = np.dtype(col["dtype"])
+        start = data_start + col["offset"]
+        columns[col["name"]] = buf[start:start + rows * dtype.itemsize].view(dtype)
+    return header, columns
+
+
+def read_session(path):
+    """Load a .ens file as the same structured array dataset.load_session returns."""
+    header, columns = open_session(path)
+    out = np.empty(header["rows"], dtype=_KIND_DTYPES[header["kind"]])
+    for name in out.dtype.names:
+        col = columns[name]
+        if name == "state":
+            col = np.where(col >= len(STATES), UNKNOWN_STATE, col)
+        out[name] = col
+    return out
+
+
+def export_session(data, path):
+    """Write a session array to .ens, .csv, .json, .jsonl or .dat by extension."""
+    ext = os.path.splitext(path)[1].lower()
+    kind = session_kind(data)
+    if ext == ENS_EXTENSION:
+        write_session(path, data)
+        return
+    if ext == ".dat":
+        from gnuplot_export import session_table, write_dat
+        write_dat(path, session_table(data))
+        return
+    if kind == "sim":
+        columns = SIM_CSV_COLUMNS if ext == ".csv" else SIM_JSON_COLUMNS
+        recorder = StreamRecorder(path, columns)
+        recorder.write(np.column_stack([data[name] for name in SIM_DTYPE.names]))
+    else:
+        recorder = StreamRecorder(path)
+        recorder.write(session_frames(data))
+    recorder.close()
+
+
+def convert(src, dst):
+    data = load_session(src, use_cache=False)
+    if os.path.splitext(dst)[1].lower() == ENS_EXTENSION:
+        write_session(dst, data, source=src)
+    else:
+        export_session(data, dst)
+    return len(data)
+
+
+def benchmark(directory, out_dir=None, repeat=3):
+    """Compare size and load time of the text recordings against their .ens conversion."""
+    out_dir = out_dir or os.path.join(directory, ".enouse_cache", "ens")
+    os.makedirs(out_dir, exist_ok=True)
+    rows = []
+    for path in find_sessions(directory, (".csv", ".json")):
+        data = parse_session(path)
+        ens_path = os.path.join(out_dir, os.path.basename(path) + ENS_EXTENSION)
+        write_session(ens_path, data, source=path)
+
+        def best(fn):
+            times = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - t0)
+            return min(times) * 1000
+
+        text_ms = best(lambda: parse_session(path))
+        ens_ms = best(lambda: read_session(ens_path))
+        rows.append((os.path.basename(path), len(data), os.path.getsize(path),
+                     os.path.getsize(ens_path), text_ms, ens_ms))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert and benchmark .ens binary session files")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_conv = sub.add_parser("convert", help="convert between .csv/.json/.jsonl/.dat/.ens")
+    p_conv.add_argument("src")
+    p_conv.add_argument("dst")
+    p_bench = sub.add_parser("bench", help="size and load-time comparison on a corpus")
+    p_bench.add_argument("directory", nargs="?", default=os.path.dirname(os.path.abspath(__file__)))
+    args = parser.parse_args()
+
+    if args.cmd == "convert":
+        n = convert(args.src, args.dst)
+        print(f"Converted {n} rows: {args.src} -> {args.dst}")
+    else:
+        rows = benchmark(args.directory)
+        print(f"{'file':28s} {'rows':>6s} {'text KB':>9s} {'ens KB':>8s} {'ratio':>6s} {'parse ms':>9s} {'ens ms':>7s}")
+        for name, n, text_size, ens_size, text_ms, ens_ms in rows:
+            print(f"{name:28s} {n:6d} {text_size / 1024:9.1f} {ens_size / 1024:8.1f} "
+                  f"{text_size / ens_size:6.1f} {text_ms:9.2f} {ens_ms:7.2f}")
+        text_total = sum(r[2] for r in rows)
+        ens_total = sum(r[3] for r in rows)
+        print(f"{'TOTAL':28s} {sum(r[1] for r in rows):6d} {text_total / 1024:9.1f} {ens_total / 1024:8.1f} "
+              f"{text_total / ens_total:6.1f} {sum(r[4] for r in rows):9.2f} {sum(r[5] for r in rows):7.2f}")
@@ -0,0 +1,270 @@
+import argparse
+import os
+import sqlite3
+import time
+import numpy as np
+from dataset import (CACHE_DIR, SESSION_EXTENSIONS, find_sessions, label_from_path, load_session, session_clock,
+                     session_kind)
+from features import phase_segments
+from sensor_frame import GAS_CHANNELS, UNKNOWN_STATE, state_name
+
+# SQLite summary of a recording corpus: one row per session and one per span
+# (a run of constant FSM state and currentLevel), each with gas-channel
+# stats and row offsets into the file, so "all HOLD spans at level 3 for
+# teh_hijau" is an indexed query and its slices load from the mmap cache.
+
+INDEX_FILE = "sessions.sqlite"
+# Bump when the schema or the stats change; older indexes are rebuilt
+INDEX_VERSION = 2
+
+STAT_COLUMNS = [f"{ch}_{stat}" for ch in GAS_CHANNELS for stat in ("min", "max", "mean")]
+_STATS_SQL = ", ".join(f"{c} REAL" for c in STAT_COLUMNS)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    label TEXT NOT NULL,
+    format TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    duration_s REAL,
+    motor_a_min INTEGER, motor_a_max INTEGER, motor_b_min INTEGER, motor_b_max INTEGER,
+    {_STATS_SQL}
+);
+CREATE TABLE IF NOT EXISTS spans (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    state TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    row_start INTEGER NOT NULL,
+    row_end INTEGER NOT NULL,
+    t_start_s REAL,
+    duration_s REAL,
+    motor_a_min INTEGER, motor_a_max INTEGER, motor_b_min INTEGER, motor_b_max INTEGER,
+    {_STATS_SQL}
+);
+-- Files that were seen but not indexed (simulation, empty, unreadable), so
+-- they are only read again once they change
+CREATE TABLE IF NOT EXISTS ignored (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_label ON sessions(label);
+CREATE INDEX IF NOT EXISTS spans_state_level ON spans(state, level);
+CREATE INDEX IF NOT EXISTS spans_session ON spans(session_id);
+"""
+
+
+def default_path():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), CACHE_DIR, INDEX_FILE)
+
+
+def _stats(x, starts):
+    """Per-run min/max/mean of x (n, channels), interleaved like STAT_COLUMNS."""
+    lengths = np.diff(np.append(starts, len(x)))[:, None]
+    stats = np.stack((np.minimum.reduceat(x, starts, axis=0), np.maximum.reduceat(x, starts, axis=0),
+                      np.add.reduceat(x, starts, axis=0) / lengths), axis=-1)
+    return stats.reshape(len(starts), -1)
+
+
+def session_summary(data):
+    """(session row, span rows) for a sensor or .dat session, as dicts of column values."""
+    kind = session_kind(data)
+    x = np.column_stack([np.asarray(data[ch], dtype=np.float64) for ch in GAS_CHANNELS])
+    if kind == "sensor":
+        t = session_clock(data["ts"])
+        state = np.asarray(data["state"], dtype=np.int64)
+        level = np.asarray(data["currentLevel"], dtype=np.int64)
+        motors = np.column_stack((data["motor_A_duty"], data["motor_B_duty"])).astype(np.int64)
+    else:
+        t = np.asarray(data["time"], dtype=np.float64) - data["time"][0]
+        state = np.full(len(data), UNKNOWN_STATE)
+        level = np.zeros(len(data), dtype=np.int64)
+        motors = None
+
+    # A span ends where the state or the level changes
+    starts, ends, _ = phase_segments(state * 256 + level)
+    span_stats = _stats(x, starts)
+    session = dict(zip(STAT_COLUMNS, _stats(x, np.array([0]))[0]), kind=kind, rows=len(data),
+                   duration_s=float(t[-1] - t[0]))
+    spans = []
+    # Span duration runs to the next span's first sample (or the last sample)
+    t_end = t[np.minimum(ends, len(t) - 1)]
+    for i, (s, e) in enumerate(zip(starts, ends)):
+        spans.append(dict(zip(STAT_COLUMNS, span_stats[i]), state=state_name(state[s]), level=int(level[s]),
+                          row_start=int(s), row_end=int(e), t_start_s=float(t[s]), duration_s=float(t_end[i] - t[s])))
+    if motors is not None:
+        for row, a, b in [(session, 0, len(data))] + [(sp, sp["row_start"], sp["row_end"]) for sp in spans]:
+            m = motors[a:b]
+            row.update(motor_a_min=int(m[:, 0].min()), motor_a_max=int(m[:, 0].max()),
+                       motor_b_min=int(m[:, 1].min()), motor_b_max=int(m[:, 1].max()))
+    return session, spans
+
+
+class SessionIndex:
+    """Incrementally maintained SQLite index of the recordings in one or more folders."""
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self.db.executescript("DROP TABLE IF EXISTS spans; DROP TABLE IF EXISTS sessions; "
+                                  "DROP TABLE IF EXISTS ignored;")
+            self.db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _insert(self, table, row):
+        cols = ", ".join(row)
+        marks = ", ".join("?" * len(row))
+        return self.db.execute(f"INSERT INTO {table} ({cols}) VALUES ({marks})",
+                               [v.item() if isinstance(v, np.generic) else v for v in row.values()]).lastrowid
+
+    def update(self, directories, extensions=SESSION_EXTENSIONS, log=print):
+        """Index new and changed recordings, drop vanished ones; returns counters.
+
+        A file is re-read only when its size or mtime changed since it was
+        indexed, or since it was skipped or failed to load.
+        """
+        counts = {"indexed": 0, "unchanged": 0, "removed": 0, "skipped": 0, "failed": 0}
+        t0 = time.perf_counter()
+        known = {r["path"]: (r["size"], r["mtime_ns"]) for r in self.db.execute("SELECT path, size, mtime_ns FROM sessions")}
+        ignored = {r["path"]: (r["size"], r["mtime_ns"], r["status"])
+                   for r in self.db.execute("SELECT path, size, mtime_ns, status FROM ignored")}
+        seen = set()
+        for directory in directories:
+            for path in find_sessions(directory, extensions):
+                path = os.path.abspath(path)
+                seen.add(path)
+                st = os.stat(path)
+                if known.get(path) == (st.st_size, st.st_mtime_ns):
+                    counts["unchanged"] += 1
+                    continue
+                if ignored.get(path, ())[:2] == (st.st_size, st.st_mtime_ns):
+                    counts[ignored[path][2]] += 1
+                    continue
+                try:
+                    data = load_session(path)
+                    if session_kind(data) == "sim" or not len(data):
+                        self._ignore(path, st, "skipped", "simulation" if len(data) else "empty")
+                        counts["skipped"] += 1
+                        continue
+                    session, spans = session_summary(data)
+                except Exception as e:
+                    self._ignore(path, st, "failed", str(e))
+                    counts["failed"] += 1
+                    log(f"[ERROR] {os.path.basename(path)}: {e}")
+                    continue
+                with self.db:
+                    self.db.execute("DELETE FROM ignored WHERE path = ?", (path,))
+                    self.db.execute("DELETE FROM sessions WHERE path = ?", (path,))
+                    session.update(path=path, label=label_from_path(path), format=os.path.splitext(path)[1].lower(),
+                                   size=st.st_size, mtime_ns=st.st_mtime_ns)
+                    sid = self._insert("sessions", session)
+                    for span in spans:
+                        self._insert("spans", dict(span, session_id=sid))
+                counts["indexed"] += 1
+                log(f"indexed {os.path.basename(path)}: {len(spans)} spans")
+        roots = [os.path.abspath(d) + os.sep for d in directories]
+        gone = [p for p in known if p not in seen and any(p.startswith(r) for r in roots)]
+        with self.db:
+            self.db.executemany("DELETE FROM sessions WHERE path = ?", [(p,) for p in gone])
+            self.db.executemany("DELETE FROM ignored WHERE path = ?",
+                                [(p,) for p in ignored if p not in seen and any(p.startswith(r) for r in roots)])
+        counts["removed"] = len(gone)
+        counts["seconds"] = time.perf_counter() - t0
+        return counts
+
+    def _ignore(self, path, st, status, reason):
+        with self.db:
+            self.db.execute("DELETE FROM sessions WHERE path = ?", (path,))
+            self.db.execute("INSERT OR REPLACE INTO ignored (path, size, mtime_ns, status, reason) VALUES (?, ?, ?, ?, ?)",
+                            (path, st.st_size, st.st_mtime_ns, status, reason))
+
+    def spans(self, label=None, state=None, level=None, min_duration=None, fmt=None, where=None, params=()):
+        """Matching spans joined with their session's path and label, by file path and row.
+
+        where/params add a raw SQL condition, e.g. where="spans.co_mics_max > ?", params=(40,).
+        """
+        conds, args = [], []
+        for sql, value in (("sessions.label = ?", label), ("spans.state = ?", state), ("spans.level = ?", level),
+                           ("spans.duration_s >= ?", min_duration), ("sessions.format = ?", fmt)):
+            if value is not None:
+                conds.append(sql)
+                args.append(value)
+        if where:
+            conds.append(f"({where})")
+            args.extend(params)
+        sql = ("SELECT spans.*, sessions.path, sessions.label, sessions.format FROM spans "
+               "JOIN sessions ON sessions.id = spans.session_id")
+        if conds:
+            sql += " WHERE " + " AND ".join(conds)
+        sql += " ORDER BY sessions.path, spans.row_start"
+        return [dict(r) for r in self.db.execute(sql, args)]
+
+    def sessions(self, label=None):
+        if label is None:
+            return [dict(r) for r in self.db.execute("SELECT * FROM sessions ORDER BY path")]
+        return [dict(r) for r in self.db.execute("SELECT * FROM sessions WHERE label = ? ORDER BY path", (label,))]
+
+    def labels(self):
+        return [r[0] for r in self.db.execute("SELECT DISTINCT label FROM sessions ORDER BY label")]
+
+
+def load_span(span):
+    """Rows [row_start, row_end) of the span's file, from the load_session cache (memory-mapped)."""
+    return load_session(span["path"])[span["row_start"]:span["row_end"]]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index recordings in SQLite and query phase spans")
+    parser.add_argument("--db", help=f"index file (default: gui/{CACHE_DIR}/{INDEX_FILE})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("update", help="index new and changed recordings")
+    p.add_argument("dirs", nargs="*", help="folders to index (default: gui/)")
+    p = sub.add_parser("query", help="list matching spans")
+    p.add_argument("--label")
+    p.add_argument("--state", type=str.upper)
+    p.add_argument("--level", type=int)
+    p.add_argument("--min-duration", type=float, help="seconds")
+    p.add_argument("--format", dest="fmt", help="only one file format, e.g. .csv")
+    p.add_argument("--where", help="extra SQL condition on spans/sessions columns")
+    p.add_argument("--load", action="store_true", help="also load every matching slice and time it")
+    sub.add_parser("labels", help="list indexed labels with session counts")
+    args = parser.parse_args()
+
+    index = SessionIndex(args.db)
+    if args.cmd == "update":
+        c = index.update(args.dirs or [os.path.dirname(os.path.abspath(__file__))])
+        print(f"{c['indexed']} indexed, {c['unchanged']} unchanged, {c['removed']} removed, "
+              f"{c['skipped']} skipped, {c['failed']} failed in {c['seconds'] * 1000:.1f} ms")
+    elif args.cmd == "labels":
+        for label in index.labels():
+            rows = index.sessions(label)
+            print(f"{label:16s} {len(rows):3d} sessions, {sum(r['rows'] for r in rows):7d} rows")
+    else:
+        t0 = time.perf_counter()
+        spans = index.spans(args.label, args.state, args.level, args.min_duration, args.fmt, args.where)
+        t_query = time.perf_counter() - t0
+        for s in spans:
+            print(f"{os.path.basename(s['path']):28s} {s['label']:12s} {s['state']:8s} L{s['level']} "
+                  f"rows {s['row_start']:5d}-{s['row_end']:5d} {s['duration_s']:7.1f} s  "
+                  f"CO(M) {s['co_mics_mean']:8.3f}  motors A {s['motor_a_min']}-{s['motor_a_max']} "
+                  f"B {s['motor_b_min']}-{s['motor_b_max']}")
+        print(f"{len(spans)} spans in {t_query * 1000:.2f} ms")
+        if args.load:
+            t0 = time.perf_counter()
+            rows = sum(len(load_span(s)) for s in spans)
+            print(f"loaded {rows} rows in {(time.perf_counter() - t0) * 1000:.2f} ms")
+    index.close()
@@ -0,0 +1,104 @@
+import numpy as np
+
+# Same combinations as the backend's sim::Operation
+OPERATIONS = ("Add", "Subtract", "Multiply")
+
+DEFAULT_SAMPLE_RATE = 100.0
+
+
+def default_signal():
+    return {"amplitude": 1.0, "frequency": 1.0, "phase": 0.0}
+
+
+def combine(x1, x2, operation):
+    if operation == "Add":
+        return x1 + x2
+    if operation == "Subtract":
+        return x1 - x2
+    if operation == "Multiply":
+        return x1 * x2
+    raise ValueError(f"Unknown operation: {operation}")
+
+
+def evaluate(t, signal1, signal2, operation="Add"):
+    """Closed-form x(t) = A·sin(2πft + φ) for both signals, as backend sim.rs computes it.
+
+    Returns an (n, 4) array of (time, x1, x2, y).
+    """
+    t = np.asarray(t, dtype=np.float64)
+    x1 = signal1["amplitude"] * np.sin(2 * np.pi * signal1["frequency"] * t + np.radians(signal1["phase"]))
+    x2 = signal2["amplitude"] * np.sin(2 * np.pi * signal2["frequency"] * t + np.radians(signal2["phase"]))
+    return np.column_stack((t, x1, x2, combine(x1, x2, operation)))
+
+
+class SimEngine:
+    """Block-wise NumPy version of the backend SimEngine.
+
+    Samples are produced on a fixed grid (sample_rate) and whole blocks are
+    computed at once. Each signal keeps a running cycle count, so changing
+    frequency continues the waveform from its current phase instead of
+    jumping to where the new frequency would have been since t = 0; a phase
+    change shifts the waveform by exactly the phase difference. With constant
+    parameters the output equals evaluate(), i.e. the backend formula.
+    """
+
+    def __init__(self, sample_rate=DEFAULT_SAMPLE_RATE, signal1=None, signal2=None, operation="Add"):
+        self.sample_rate = float(sample_rate)
+        self.signal1 = dict(signal1 or default_signal())
+        self.signal2 = dict(signal2 or default_signal())
+        self.operation = operation
+        self.reset()
+
+    def reset(self):
+        # Sample index of the next block, and per-signal cycle count at the last parameter change
+        self.index = 0
+        self.anchor = 0
+        self.cycles = np.zeros(2)
+
+    @property
+    def time(self):
+        return self.index / self.sample_rate
+
+    def set_sample_rate(self, sample_rate):
+        """Change the grid spacing; time and phase continue from the current sample."""
+        t = self.time
+        self._rebase()
+        self.sample_rate = float(sample_rate)
+        self.index = self.anchor = int(round(t * self.sample_rate))
+
+    def set_params(self, signal1=None, signal2=None, operation=None):
+        self._rebase()
+        if signal1 is not None:
+            self.signal1 = dict(signal1)
+        if signal2 is not None:
+            self.signal2 = dict(signal2)
+        if operation is not None:
+            if operation not in OPERATIONS:
+                raise ValueError(f"Unknown operation: {operation}")
+            self.operation = operation
+
+    def _rebase(self):
+        # Fold the cycles elapsed since the anchor into the running count
+        elapsed = (self.index - self.anchor) / self.sample_rate
+        freqs = np.array([self.signal1["frequency"], self.signal2["frequency"]])
+        self.cycles = np.mod(self.cycles + freqs * elapsed, 1.0)
+        self.anchor = self.index
+
+    def generate(self, n):
+        """Next n samples as an (n, 4) array of (time, x1, x2, y)."""
+        k = np.arange(self.index, self.index + n)
+        t = k / self.sample_rate
+        since = (k - self.anchor) / self.sample_rate
+        out = np.empty((n, 4))
+        out[:, 0] = t
+        for j, sig in enumerate((self.signal1, self.signal2)):
+            theta = 2 * np.pi * (self.cycles[j] + sig["frequency"] * since) + np.radians(sig["phase"])
+            out[:, 1 + j] = sig["amplitude"] * np.sin(theta)
+        out[:, 3] = combine(out[:, 1], out[:, 2], self.operation)
+        self.index += n
+        return out
+
+    def generate_until(self, t):
+        """All samples with time < t that have not been generated yet."""
+        n = max(int(np.ceil(t * self.sample_rate - 1e-9)) - self.index, 0)
+        return self.generate(n)
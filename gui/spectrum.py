@@ -0,0 +1,120 @@
+from functools import lru_cache
+import numpy as np
+
+WINDOWS = ("hann", "hamming", "blackman", "rect")
+
+
+@lru_cache(maxsize=32)
+def window_table(name, n):
+    """Window samples and their power normalization, cached per (name, n)."""
+    if name == "hann":
+        w = np.hanning(n)
+    elif name == "hamming":
+        w = np.hamming(n)
+    elif name == "blackman":
+        w = np.blackman(n)
+    elif name == "rect":
+        w = np.ones(n)
+    else:
+        raise ValueError(f"Unknown window: {name}")
+    w.setflags(write=False)
+    return w, 1.0 / np.sum(w * w)
+
+
+@lru_cache(maxsize=32)
+def frequency_axis(n, sample_rate):
+    f = np.fft.rfftfreq(n, 1.0 / sample_rate)
+    f.setflags(write=False)
+    return f
+
+
+class StreamingSpectrum:
+    """Overlapping-window power spectra computed incrementally from a sample stream.
+
+    extend() only transforms the frames completed by the new samples (hop =
+    nfft - overlap samples apart); earlier frames are kept in a fixed-size
+    spectrogram ring, so the cost per call is proportional to the new data,
+    not to the history. Each frame is mean-detrended so the large DC offset of
+    the gas channels does not swamp the low bins.
+    """
+
+    def __init__(self, n_channels, sample_rate, nfft=256, overlap=0.5, history=200, window="hann"):
+        self.n_channels = n_channels
+        self.sample_rate = float(sample_rate)
+        self.nfft = int(nfft)
+        self.hop = max(1, int(round(self.nfft * (1 - overlap))))
+        self.history = history
+        self.window = window
+        self.n_bins = self.nfft // 2 + 1
+        # Spectrogram ring: (history, n_channels, n_bins) power, newest frame at head - 1
+        self.frames = np.zeros((history, n_channels, self.n_bins))
+        self.reset()
+
+    def reset(self):
+        self.frames.fill(0.0)
+        self.head = 0
+        self.count = 0
+        self.tail = np.empty((0, self.n_channels))
+
+    def configure(self, sample_rate=None, nfft=None, overlap=None, window=None):
+        """Change the analysis parameters; the spectrogram starts over."""
+        if sample_rate is not None:
+            self.sample_rate = float(sample_rate)
+        if window is not None:
+            window_table(window, 1)
+            self.window = window
+        if nfft is not None or overlap is not None:
+            overlap = 1 - self.hop / self.nfft if overlap is None else overlap
+            self.nfft = int(nfft or self.nfft)
+            self.hop = max(1, int(round(self.nfft * (1 - overlap))))
+            self.n_bins = self.nfft // 2 + 1
+            self.frames = np.zeros((self.history, self.n_channels, self.n_bins))
+        self.reset()
+
+    @property
+    def freqs(self):
+        return frequency_axis(self.nfft, self.sample_rate)
+
+    def extend(self, block):
+        """Feed an (n, n_channels) block; returns the number of new frames."""
+        block = np.asarray(block, dtype=np.float64).reshape(-1, self.n_channels)
+        data = np.concatenate((self.tail, block)) if len(self.tail) else block
+        n_new = (len(data) - self.nfft) // self.hop + 1 if len(data) >= self.nfft else 0
+        if n_new <= 0:
+            self.tail = data
+            return 0
+
+        # Only the newest `history` frames can survive in the ring
+        skip = max(n_new - self.history, 0)
+        starts = np.arange(skip, n_new) * self.hop
+        segs = np.lib.stride_tricks.sliding_window_view(data, self.nfft, axis=0)[starts]
+        # segs: (frames, n_channels, nfft)
+        segs = segs - segs.mean(axis=2, keepdims=True)
+        w, norm = window_table(self.window, self.nfft)
+        spec = np.fft.rfft(segs * w, axis=2)
+        power = (spec.real ** 2 + spec.imag ** 2) * (norm / self.sample_rate)
+        power[:, :, 1:-1 if self.nfft % 2 == 0 else None] *= 2  # one-sided
+
+        idx = (self.head + np.arange(len(power))) % self.history
+        self.frames[idx] = power
+        self.head = (self.head + len(power)) % self.history
+        self.count = min(self.count + len(power), self.history)
+        self.tail = data[n_new * self.hop:].copy()
+        return n_new
+
+    def spectrogram(self, channel):
+        """(count, n_bins) power of one channel, oldest frame first."""
+        idx = (self.head - self.count + np.arange(self.count)) % self.history
+        return self.frames[idx, channel]
+
+    def spectrum(self, average=4):
+        """(n_channels, n_bins) PSD averaged over the newest `average` frames (Welch)."""
+        n = min(average, self.count)
+        if not n:
+            return np.zeros((self.n_channels, self.n_bins))
+        idx = (self.head - n + np.arange(n)) % self.history
+        return self.frames[idx].mean(axis=0)
+
+
+def to_db(power, floor=1e-12):
+    return 10 * np.log10(np.maximum(power, floor))
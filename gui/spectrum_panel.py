@@ -0,0 +1,116 @@
+import numpy as np
+import pyqtgraph as pg
+from PySide6.QtCore import QRectF
+from PySide6.QtWidgets import QComboBox, QHBoxLayout, QLabel, QVBoxLayout, QWidget
+from spectrum import WINDOWS, StreamingSpectrum, to_db
+
+NFFT_CHOICES = (32, 64, 128, 256, 512, 1024)
+
+
+class SpectrumPanel(QWidget):
+    """Live PSD of every channel plus a scrolling spectrogram of one channel.
+
+    The owning tab feeds new samples with extend() and calls render() once
+    per render frame; only the frames completed since the last call are
+    transformed (see StreamingSpectrum).
+    """
+
+    def __init__(self, channels, sample_rate, nfft=256, parent=None):
+        super().__init__(parent)
+        # channels: [(label, color)]
+        self.channels = channels
+        self.spectrum = StreamingSpectrum(len(channels), sample_rate, nfft)
+        self.dirty = False
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        ctrl = QHBoxLayout()
+        ctrl.addWidget(QLabel("📊 Spectrogram:"))
+        self.channel_combo = QComboBox()
+        self.channel_combo.addItems([label for label, _ in channels])
+        self.channel_combo.currentIndexChanged.connect(self.refresh)
+        ctrl.addWidget(self.channel_combo)
+
+        ctrl.addWidget(QLabel("FFT:"))
+        self.nfft_combo = QComboBox()
+        self.nfft_combo.addItems([str(n) for n in NFFT_CHOICES])
+        self.nfft_combo.setCurrentText(str(nfft))
+        self.nfft_combo.currentTextChanged.connect(lambda text: self.configure(nfft=int(text)))
+        ctrl.addWidget(self.nfft_combo)
+
+        ctrl.addWidget(QLabel("Window:"))
+        self.window_combo = QComboBox()
+        self.window_combo.addItems(WINDOWS)
+        self.window_combo.currentTextChanged.connect(lambda text: self.configure(window=text))
+        ctrl.addWidget(self.window_combo)
+
+        self.rate_label = QLabel()
+        ctrl.addWidget(self.rate_label)
+        ctrl.addStretch()
+        layout.addLayout(ctrl)
+
+        plots = pg.GraphicsLayoutWidget()
+        plots.setBackground('#000000')
+        layout.addWidget(plots)
+
+        self.psd_plot = plots.addPlot(row=0, col=0, title="Power Spectrum")
+        self.psd_plot.showGrid(x=True, y=True, alpha=0.3)
+        self.psd_plot.setLabel('bottom', "Frequency", units="Hz")
+        self.psd_plot.setLabel('left', "PSD (dB)")
+        self.psd_curves = [self.psd_plot.plot(pen=pg.mkPen(color, width=1)) for _, color in channels]
+
+        self.sgram_plot = plots.addPlot(row=0, col=1, title="Spectrogram")
+        self.sgram_plot.setLabel('bottom', "Time", units="s")
+        self.sgram_plot.setLabel('left', "Frequency", units="Hz")
+        self.image = pg.ImageItem()
+        self.image.setColorMap(pg.colormap.get('inferno'))
+        self.sgram_plot.addItem(self.image)
+
+        self.update_rate_label()
+
+    def update_rate_label(self):
+        s = self.spectrum
+        self.rate_label.setText(f"fs {s.sample_rate:g} Hz | Δf {s.sample_rate / s.nfft:.3g} Hz | hop {s.hop}")
+
+    def configure(self, **kwargs):
+        self.spectrum.configure(**kwargs)
+        self.update_rate_label()
+        self.dirty = True
+        self.refresh()
+
+    def set_sample_rate(self, sample_rate):
+        if sample_rate != self.spectrum.sample_rate:
+            self.configure(sample_rate=sample_rate)
+
+    def reset(self):
+        self.spectrum.reset()
+        self.dirty = True
+        self.refresh()
+
+    def extend(self, block):
+        if self.spectrum.extend(block):
+            self.dirty = True
+
+    def render(self):
+        if self.dirty:
+            self.refresh()
+
+    def refresh(self, *_):
+        if not self.isVisible():
+            return
+        self.dirty = False
+        s = self.spectrum
+        freqs = s.freqs
+        psd = to_db(s.spectrum())
+        for curve, row in zip(self.psd_curves, psd):
+            curve.setData(freqs, row)
+
+        sgram = s.spectrogram(max(self.channel_combo.currentIndex(), 0))
+        if not len(sgram):
+            self.image.clear()
+            return
+        sgram = to_db(sgram)
+        self.image.setImage(sgram, autoLevels=False, levels=(np.percentile(sgram, 5), sgram.max()))
+        frame_dt = s.hop / s.sample_rate
+        self.image.setRect(QRectF(-len(sgram) * frame_dt, 0, len(sgram) * frame_dt, freqs[-1] + freqs[1]))
@@ -0,0 +1,280 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from PySide6.QtCore import QThread, Signal
+from dataset import CACHE_DIR, NOMINAL_INTERVAL_MS, load_session, session_frames
+from sensor_frame import GAS_CHANNELS, SENSOR_INDEX
+from resample import StreamResampler
+from session_client import PAGE_SIZE, SessionClient
+
+# Edge Impulse data acquisition format: one file per window of samples
+EI_SENSORS = [{"name": ch, "units": "ppm"} for ch in GAS_CHANNELS]
+WINDOW_SAMPLES = 240   # 60 s at the nominal 4 Hz
+WORKERS = 4
+RETRIES = 4
+BACKOFF_S = 0.5
+BACKOFF_MAX_S = 8.0
+
+_GAS_COLS = [SENSOR_INDEX[ch] for ch in GAS_CHANNELS]
+
+
+def file_pages(path, page_size=PAGE_SIZE):
+    """Yield a recorded session as (n, 17) blocks, like SessionClient.pages."""
+    frames = session_frames(load_session(path))
+    for i in range(0, len(frames), page_size):
+        yield frames[i:i + page_size]
+
+
+def windows(pages, size=WINDOW_SAMPLES, min_size=None):
+    """Re-chunk pages into (index, (size, 7) gas values) windows as they fill up.
+
+    The trailing partial window is kept when it has at least min_size samples
+    (default: half a window); it is the only one shorter than size.
+    """
+    min_size = size // 2 if min_size is None else min_size
+    pending = np.empty((0, len(GAS_CHANNELS)))
+    index = 0
+    for block in pages:
+        pending = np.concatenate((pending, np.asarray(block)[:, _GAS_COLS]))
+        while len(pending) >= size:
+            yield index, pending[:size]
+            pending = pending[size:]
+            index += 1
+    if len(pending) and len(pending) >= min_size:
+        yield index, pending
+
+
+def build_payload(values, interval_ms=NOMINAL_INTERVAL_MS, device_name="e-nouse", compress=True):
+    """Serialized (body, headers) for one window in the Edge Impulse JSON format."""
+    payload = {
+        "protected": {"ver": "v1", "alg": "none", "iat": int(time.time())},
+        "signature": "0" * 64,
+        "payload": {
+            "device_name": device_name,
+            "device_type": "ENOSE",
+            "interval_ms": interval_ms,
+            "sensors": EI_SENSORS,
+            "values": np.round(values, 4).tolist(),
+        },
+    }
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if compress:
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+class Manifest:
+    """Upload progress on disk, so an interrupted upload resumes where it stopped."""
+
+    def __init__(self, key, label, directory=None):
+        directory = directory or os.path.join(os.path.dirname(os.path.abspath(__file__)), CACHE_DIR, "uploads")
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha1(f"{key}|{label}".encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(directory, f"{digest}.json")
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {"prefix": f"{label}.{int(time.time())}", "done": []}
+        self.prefix = state["prefix"]
+        self.done = set(state["done"])
+
+    def file_name(self, index, samples=None):
+        # A partial window gets its own name: once the session grows, the full window replaces it
+        if samples is not None:
+            return f"{self.prefix}.{index:04d}.part{samples:04d}.json"
+        return f"{self.prefix}.{index:04d}.json"
+
+    def mark_done(self, name):
+        with self.lock:
+            self.done.add(name)
+            tmp = self.path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"prefix": self.prefix, "done": sorted(self.done)}, f)
+            os.replace(tmp, self.path)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class EdgeImpulseUploader:
+    """Uploads windows to the ingestion API with bounded concurrency and retries.
+
+    With resample (the default) pages are first put on the uniform device-ts
+    grid, so the fixed interval_ms in every payload matches the data.
+
+    Windows are produced lazily from the page iterator; at most 2 * workers
+    encoded payloads are held in memory. A full window counts as done on 2xx, or
+    on 409 (already present, when resuming with x-disallow-duplicates). 429,
+    5xx and connection errors are retried with jittered exponential backoff;
+    anything else fails that window and leaves it for the next resume. A
+    trailing partial window is sent under its own name and never marked done,
+    so a resume after the session grew still uploads the full window.
+    """
+
+    def __init__(self, url, api_key, label, workers=WORKERS, window=WINDOW_SAMPLES, compress=True,
+                 retries=RETRIES, log=print, progress=None, resample=True):
+        self.url = url
+        self.api_key = api_key
+        self.label = label
+        self.workers = workers
+        self.window = window
+        self.compress = compress
+        self.retries = retries
+        self.resample = resample
+        self.log = log
+        self.progress = progress
+        self.cancelled = threading.Event()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _post(self, name, body, headers):
+        headers = dict(headers, **{"x-api-key": self.api_key, "x-file-name": name, "x-label": self.label,
+                                   "x-disallow-duplicates": "1"})
+        attempt = 0
+        while True:
+            try:
+                res = self.session.post(self.url, data=body, headers=headers, timeout=(5, 60))
+                if res.status_code < 300 or res.status_code == 409:
+                    return attempt
+                if res.status_code != 429 and res.status_code < 500:
+                    raise RuntimeError(f"{name}: HTTP {res.status_code} {res.text[:200]}")
+                error = RuntimeError(f"{name}: HTTP {res.status_code}")
+            except requests.RequestException as e:
+                error = e
+            if attempt >= self.retries or self.cancelled.is_set():
+                raise error
+            attempt += 1
+            time.sleep(min(BACKOFF_S * 2 ** (attempt - 1), BACKOFF_MAX_S) * random.uniform(0.5, 1.0))
+
+    def run(self, pages, key):
+        """Upload every window of `pages`; key identifies the source for resuming."""
+        if self.resample:
+            # Resampled windows differ from raw ones: keep their resume state apart
+            pages = StreamResampler().pages(pages)
+            key = f"{key}|resampled"
+        manifest = Manifest(key, self.label)
+        stats = {"windows": 0, "uploaded": 0, "skipped": 0, "failed": 0, "retries": 0,
+                 "samples": 0, "bytes": 0, "seconds": 0.0}
+        lock = threading.Lock()
+        slots = threading.BoundedSemaphore(self.workers * 2)
+        t0 = time.perf_counter()
+
+        def task(name, body, headers, n, complete):
+            try:
+                retries = self._post(name, body, headers)
+                if complete:
+                    manifest.mark_done(name)
+                with lock:
+                    stats["uploaded"] += 1
+                    stats["retries"] += retries
+                    stats["samples"] += n
+                    stats["bytes"] += len(body)
+            except Exception as e:
+                with lock:
+                    stats["failed"] += 1
+                self.log(f"[ERROR] Upload failed: {e}")
+            finally:
+                slots.release()
+                if self.progress:
+                    self.progress(dict(stats))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for index, values in windows(pages, self.window):
+                if self.cancelled.is_set():
+                    break
+                stats["windows"] += 1
+                complete = len(values) == self.window
+                name = manifest.file_name(index, None if complete else len(values))
+                if name in manifest.done:
+                    stats["skipped"] += 1
+                    continue
+                body, headers = build_payload(values, compress=self.compress)
+                slots.acquire()
+                pool.submit(task, name, body, headers, len(values), complete)
+
+        stats["seconds"] = time.perf_counter() - t0
+        if not stats["failed"] and not self.cancelled.is_set():
+            manifest.remove()
+        return stats
+
+
+class UploadWorker(QThread):
+    """Runs an EdgeImpulseUploader over the backend session (or a file) off the UI thread."""
+    progress = Signal(object)
+    log_received = Signal(str)
+    upload_finished = Signal(object)
+
+    def __init__(self, api_url, url, api_key, label, path=None, workers=WORKERS):
+        super().__init__()
+        self.api_url = api_url
+        self.path = path
+        self.uploader = EdgeImpulseUploader(url, api_key, label, workers,
+                                            log=self.log_received.emit, progress=self.progress.emit)
+
+    def run(self):
+        try:
+            if self.path:
+                pages, key = file_pages(self.path), os.path.abspath(self.path)
+            else:
+                client = SessionClient(self.api_url, session=self.uploader.session)
+                pages = client.pages()
+                first = next(pages, None)
+                if first is None:
+                    self.upload_finished.emit({"windows": 0})
+                    return
+                # Same session -> same key, so a retried upload resumes
+                key = f"backend:{client.epoch}:{int(first[0, SENSOR_INDEX['ts']])}"
+                pages = _chain(first, pages)
+            stats = self.uploader.run(pages, key)
+        except Exception as e:
+            stats = {"error": str(e)}
+        self.upload_finished.emit(stats)
+
+    def cancel(self):
+        self.uploader.cancel()
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upload recorded sessions to Edge Impulse (or the mock)")
+    parser.add_argument("inputs", nargs="+")
+    parser.add_argument("--url", default="https://ingestion.edgeimpulse.com/api/training/data")
+    parser.add_argument("--api-key", default=os.environ.get("EI_API_KEY", ""))
+    parser.add_argument("--label", help="default: derived from the file name")
+    parser.add_argument("-j", "--workers", type=int, default=WORKERS)
+    parser.add_argument("--window", type=int, default=WINDOW_SAMPLES)
+    parser.add_argument("--no-compress", action="store_true")
+    args = parser.parse_args()
+
+    from dataset import label_from_path
+    for path in args.inputs:
+        label = args.label or label_from_path(path)
+        up = EdgeImpulseUploader(args.url, args.api_key, label, args.workers, args.window, not args.no_compress)
+        s = up.run(file_pages(path), os.path.abspath(path))
+        print(f"{path}: {s['uploaded']}/{s['windows']} windows uploaded ({s['skipped']} resumed, "
+              f"{s['failed']} failed, {s['retries']} retries), {s['bytes'] / 1024:.1f} KB in {s['seconds']:.2f} s")
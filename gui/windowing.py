@@ -0,0 +1,124 @@
+import argparse
+import os
+import time
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from dataset import NOMINAL_INTERVAL_MS, find_sessions, label_from_path, load_session, session_kind
+from resample import resample_session
+from sensor_frame import GAS_CHANNELS, STATE_CODES, UNKNOWN_STATE, state_name
+
+# Fixed-length windows over the seven gas channels at the firmware's 250 ms
+# cadence. The defaults match an Edge Impulse sample (uploader.WINDOW_SAMPLES).
+WINDOW = 240
+STRIDE = 240
+
+
+def gas_view(data, channels=GAS_CHANNELS):
+    """(n, len(channels)) gas values of a sensor or .dat session.
+
+    The channels are adjacent fields of one type in both record layouts, so
+    this is a strided view into data (a memory-mapped cache stays on disk);
+    other layouts fall back to a copy.
+    """
+    if session_kind(data) == "sim":
+        raise ValueError("simulation recordings have no gas channels")
+    fields = data.dtype.fields
+    dtype, offset = fields[channels[0]][:2]
+    adjacent = all(fields[ch][0] == dtype and fields[ch][1] == offset + i * dtype.itemsize
+                   for i, ch in enumerate(channels))
+    if not adjacent:
+        return np.column_stack([np.asarray(data[ch]) for ch in channels])
+    first = data[channels[0]]
+    return as_strided(first, shape=(len(data), len(channels)), strides=(first.strides[0], dtype.itemsize),
+                      writeable=False)
+
+
+def window_starts(n, window=WINDOW, stride=STRIDE):
+    return np.arange(0, max(n - window + 1, 0), stride)
+
+
+def session_windows(data, window=WINDOW, stride=STRIDE, channels=GAS_CHANNELS):
+    """All full windows of one session: returns (windows, phases).
+
+    windows has shape (n_windows, window, len(channels)) and shares memory
+    with data, so even stride 1 costs nothing until values are read. phases
+    holds the FSM state code at each window's last sample (UNKNOWN_STATE for
+    .dat exports, which carry no state).
+    """
+    x = gas_view(data, channels)
+    starts = window_starts(len(x), window, stride)
+    views = as_strided(x, shape=(len(starts), window, x.shape[1]),
+                       strides=(stride * x.strides[0], x.strides[0], x.strides[1]), writeable=False)
+    if "state" in data.dtype.names:
+        phases = np.asarray(data["state"])[starts + window - 1] if len(starts) else np.empty(0, dtype=np.int8)
+    else:
+        phases = np.full(len(starts), UNKNOWN_STATE, dtype=np.int8)
+    return views, phases
+
+
+def inside_states(data, states, window=WINDOW, stride=STRIDE):
+    """Boolean mask over session_windows: True where every sample is in one of states."""
+    starts = window_starts(len(data), window, stride)
+    if "state" not in data.dtype.names:
+        return np.zeros(len(starts), dtype=bool)
+    inside = np.isin(np.asarray(data["state"]), [STATE_CODES[s] for s in states])
+    count = np.concatenate(([0], np.cumsum(inside)))
+    return count[starts + window] - count[starts] == window
+
+
+def iter_windows(paths, window=WINDOW, stride=STRIDE, states=None, label=label_from_path, channels=GAS_CHANNELS,
+                 resample=False):
+    """Yield (window, label, phase name) for every window of every session, lazily.
+
+    Files are loaded one at a time as the iteration reaches them (through
+    the load_session cache, memory-mapped), and each window is a view of
+    shape (window, len(channels)): memory stays at one session no matter how
+    many windows are drawn. Simulation recordings are skipped. With states
+    set, only windows lying entirely inside those FSM states are yielded.
+    With resample, each session is first put on the uniform device-ts grid
+    (an in-memory copy of that one session). Copy a window (np.array) to
+    keep it beyond the iteration.
+    """
+    for path in paths:
+        data = load_session(path)
+        if session_kind(data) == "sim":
+            continue
+        if resample:
+            data, _ = resample_session(data)
+        views, phases = session_windows(data, window, stride, channels)
+        keep = inside_states(data, states, window, stride) if states else np.ones(len(views), dtype=bool)
+        name = label(path)
+        names = {code: state_name(code) for code in np.unique(phases)}
+        for i in np.flatnonzero(keep):
+            yield views[i], name, names[phases[i]]
+
+
+def count_windows(paths, window=WINDOW, stride=STRIDE, states=None, resample=False):
+    """Walk iter_windows; returns (windows, samples covered, seconds)."""
+    t0 = time.perf_counter()
+    n = samples = 0
+    for w, _, _ in iter_windows(paths, window, stride, states, resample=resample):
+        n += 1
+        samples += len(w)
+    return n, samples, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count fixed-length gas-channel windows over recorded sessions")
+    parser.add_argument("inputs", nargs="*", help="session files or directories (default: gui/*.csv)")
+    parser.add_argument("-w", "--window", type=int, default=WINDOW, help="samples per window")
+    parser.add_argument("-s", "--stride", type=int, default=STRIDE, help="samples between window starts")
+    parser.add_argument("--state", action="append", help="only windows entirely in these FSM states")
+    parser.add_argument("--resample", action="store_true", help="put sessions on the device-ts grid first")
+    parser.add_argument("--repeat", type=int, default=1, help="walk the corpus this many times (scale test)")
+    args = parser.parse_args()
+
+    paths = []
+    for target in args.inputs or [os.path.dirname(os.path.abspath(__file__))]:
+        paths.extend(find_sessions(target, (".csv",)) if os.path.isdir(target) else [target])
+
+    n, samples, seconds = count_windows(paths * args.repeat, args.window, args.stride, args.state, args.resample)
+    copied = samples * len(GAS_CHANNELS) * 4
+    print(f"{n} windows of {args.window} samples ({args.window * NOMINAL_INTERVAL_MS / 1000:.0f} s), "
+          f"stride {args.stride}, from {len(paths) * args.repeat} sessions in {seconds:.2f} s "
+          f"({n / max(seconds, 1e-9):,.0f} windows/s); as copies they would take {copied / 2**20:,.0f} MB")
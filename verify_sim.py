@@ -3,6 +3,12 @@ import time
 import websocket
 import json
 import threading
+import sys
+import os
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "gui"))
+from sim_engine import SimEngine, evaluate
 
 API_URL = "http://localhost:3000"
 WS_SIM_URL = "ws://localhost:3000/sim/ws"
@@ -48,10 +54,46 @@ def test_ws():
     
     requests.post(f"{API_URL}/sim/stop")
 
+CROSSCHECK_PARAMS = {
+    "signal1": {"amplitude": 5.0, "frequency": 2.0, "phase": 0.0},
+    "signal2": {"amplitude": 2.0, "frequency": 5.0, "phase": 90.0},
+    "operation": "Multiply"
+}
+
+def test_local_engine():
+    print("Testing local engine...")
+    p = CROSSCHECK_PARAMS
+    engine = SimEngine(200.0, p["signal1"], p["signal2"], p["operation"])
+    block = np.vstack([engine.generate(n) for n in (1, 17, 250, 64)])
+    expected = evaluate(block[:, 0], p["signal1"], p["signal2"], p["operation"])
+    err = np.abs(block - expected).max()
+    print(f"Local engine vs closed form: {len(block)} samples, max error {err:.3g}")
+    assert err < 1e-9
+
+def test_crosscheck(n=40):
+    print("Cross-checking local engine against backend...")
+    requests.post(f"{API_URL}/sim/start")
+    requests.post(f"{API_URL}/sim/params", json=CROSSCHECK_PARAMS)
+    time.sleep(0.2) # let points computed with the old params drain
+
+    ws = websocket.create_connection(WS_SIM_URL)
+    points = [json.loads(ws.recv()) for _ in range(n)]
+    ws.close()
+    requests.post(f"{API_URL}/sim/stop")
+
+    backend = np.array([[d["time"], d["x1"], d["x2"], d["y"]] for d in points])
+    p = CROSSCHECK_PARAMS
+    local = evaluate(backend[:, 0], p["signal1"], p["signal2"], p["operation"])
+    err = np.abs(backend - local).max()
+    print(f"Backend vs local engine: {n} samples, max error {err:.3g}")
+    assert err < 1e-6
+
 if __name__ == "__main__":
     try:
+        test_local_engine()
         test_api()
         test_ws()
+        test_crosscheck()
         print("[SUCCESS] Verification Successful!")
     except Exception as e:
         print(f"[FAILED] Verification Failed: {e}")